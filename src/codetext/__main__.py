@@ -1,17 +1,31 @@
 import os
 import sys
 import argparse
+import importlib
 import pkg_resources
 
 import json
-from .codetext_cli import parse_file, print_result, PL_MATCHING
+from .codetext_cli import parse_file, parse_source, print_result, print_profile, \
+    get_file_language, PL_MATCHING
+from .pipeline.dataset import iter_sources
+from .utils.profiler import PROFILER
+
+
+# `codetext <command> ...`, every module implements `main(argv)`
+COMMANDS = {
+    'bench': '.bench.cli',
+    'build-dataset': '.pipeline.dataset',
+    'history': '.pipeline.history',
+    'incremental': '.pipeline.incremental',
+    'watch': '.pipeline.watch',
+}
 
 
 def get_args():
     parser = argparse.ArgumentParser(description=f"codetext parser {20*'='}")
     
     parser.add_argument('paths', nargs='*', default=['.'],
-                        help='list of the filename/paths.')
+                        help='list of the filename/paths, tar and zip archives are streamed.')
     parser.add_argument("--version", action="version",
                         version=pkg_resources.get_distribution("codetext").version)
     parser.add_argument("-l", "--language",
@@ -25,14 +39,27 @@ def get_args():
                         help='''Generate json output as a transform of the
                         default output''',
                         action="store_true")
+    parser.add_argument("--code_spans",
+                        help='''Store the source of each file once and byte
+                        spans (`code_span`) instead of the code of classes
+                        and methods''',
+                        action="store_true")
     parser.add_argument("--verbose",
                         help='''Print progress bar''',
                         action="store_true")
+    parser.add_argument("--profile-stages", dest="profile_stages",
+                        help='''Time each extraction stage and print a per
+                        language summary at the end of the run''',
+                        action="store_true")
     
     return parser.parse_args()
 
 
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        command = importlib.import_module(COMMANDS[sys.argv[1]], __package__)
+        return command.main(sys.argv[2:])
+
     opt = get_args()
     
     # check args
@@ -46,39 +73,28 @@ def main():
                 .format(language=opt.language, 
                         sp_language=list(PL_MATCHING.keys())))
     
+    if opt.profile_stages:
+        PROFILER.enable()
+
     # check path
+    files = []
     for path in opt.paths:
         assert os.path.exists(path) == True, "paths is not valid"
         
         if os.path.isdir(path):
-            files = [os.path.join(path, f) for f in os.listdir(path) \
-                    if os.path.isfile(os.path.join(path, f))]
+            files.extend(os.path.join(path, f) for f in os.listdir(path) \
+                         if os.path.isfile(os.path.join(path, f)))
         elif os.path.isfile(path):
-            files = [path]
-            
-        if opt.language:
-            for file in files[:]:
-                filename, file_extension = os.path.splitext(file)
-                if file_extension not in PL_MATCHING[opt.language]:
-                    files.remove(file)
+            files.append(path)
 
     output_metadata = {}
-    for file in files:
-        filename, file_extension = os.path.splitext(file)
-        
-        if opt.language == None:
-            for lang, ext_list in PL_MATCHING.items():
-                if file_extension in ext_list:
-                    language = lang
-                    break
+    # archive members are streamed with their content
+    for file, language, content in iter_sources(files, opt.language):
+        if content is None:
+            output = parse_file(file, language=language, code_spans=opt.code_spans)
         else:
-            language = opt.language
-
-        output = parse_file(file, language=language)
-        print_result(
-            output, 
-            file_name=str(filename).split(os.sep)[-1]+file_extension
-        )
+            output = parse_source(content, language, code_spans=opt.code_spans)
+        print_result(output, file_name=os.path.basename(file))
         output_metadata[file] = output
     
     if opt.json:
@@ -88,6 +104,9 @@ def main():
             print(50*'=')
             print("Save report to {path}".format(path=save_path))
 
+    if opt.profile_stages:
+        print_profile(PROFILER.summary())
+
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,24 @@
+"""Codetext benchmarks
+
+Every module in this package measures one part of the extraction pipeline. It
+exposes a `run(...)` function returning machine-readable results (a `dict`)
+and can be executed directly, e.g. `python -m codetext.bench.language_id`.
+"""
+
+# Registered benchmarks, run with `codetext bench <name>`
+BENCHMARKS = [
+    'blacklist',
+    'code_spans',
+    'error_filter',
+    'extraction',
+    'headers',
+    'history',
+    'language_id',
+    'minified',
+    'node_text',
+    'projection',
+    'return_search',
+    'schedule',
+    'warm_start',
+    'watch',
+]
@@ -0,0 +1,153 @@
+"""Early black list filtering on test-heavy files
+
+Generates files where most functions are tests (`test_*`) or accessors, the
+shape of a test suite, and times the function filtering step two ways:
+    - legacy: full `get_function_metadata`, then the keyword list scan of the
+      previous `check_is_black_node`
+    - early: identifier only metadata and the precompiled black list regex,
+      full metadata only for the surviving functions
+`extract_records` (which uses the early filter) is timed end to end as well.
+"""
+import argparse
+from typing import Dict, List
+
+from ..utils import parse_code
+from ..codetext_cli import get_language_parser
+from ..clean.noise_removal import get_black_list_filter
+from ..pipeline.extract import extract_records, IDENTIFIER_FIELDS
+from .utils import Timer, rate, report
+
+
+TEMPLATES = {
+    'python': ('def {name}(self, value, expected=None):\n'
+               '    """Check that {name} returns the expected value"""\n'
+               '    result = compute(value)\n'
+               '    assert result == expected\n'
+               '    return result\n'),
+    'java': ('public class Suite{index} {{\n'
+             '    /**\n'
+             '     * Check that {name} returns the expected value\n'
+             '     */\n'
+             '    public int {name}(int value, int expected) {{\n'
+             '        int result = compute(value);\n'
+             '        assertEquals(expected, result);\n'
+             '        return result;\n'
+             '    }}\n'
+             '}}\n'),
+    'javascript': ('/**\n'
+                   ' * Check that {name} returns the expected value\n'
+                   ' */\n'
+                   'function {name}(value, expected) {{\n'
+                   '    const result = compute(value);\n'
+                   '    expect(result).toBe(expected);\n'
+                   '    return result;\n'
+                   '}}\n'),
+}
+
+
+def _legacy_is_black(node_name: str, exclude_list: List) -> bool:
+    black_keywords = ['test_', 'Test_', '_test', 'toString', 'constructor', 'Constructor']
+    black_keywords.extend(exclude_list)
+    if node_name.startswith('__') and node_name.endswith('__'):
+        return True
+    if node_name.startswith('set') or node_name.startswith('get'):
+        return True
+    return any(keyword in node_name for keyword in black_keywords)
+
+
+def generate_file(language: str, num_functions: int, test_ratio: float) -> str:
+    """Source with `num_functions` functions, `test_ratio` of them black listed"""
+    template = TEMPLATES[language]
+    num_black = int(num_functions * test_ratio)
+    chunks = []
+    for index in range(num_functions):
+        if index < num_black:
+            name = f'test_case_{index}' if index % 2 else f'getValue{index}'
+        else:
+            name = f'compute_value_{index}'
+        chunks.append(template.format(name=name, index=index))
+    return '\n'.join(chunks)
+
+
+def bench_language(language: str, content: str, repeat: int) -> Dict:
+    parser = get_language_parser(language)
+    exclude_list = parser.BLACKLISTED_FUNCTION_NAMES
+    black_list = get_black_list_filter(exclude_list)
+    timers = {name: Timer() for name in ['legacy', 'early', 'extract_records']}
+    num_functions = 0
+    num_kept = 0
+    for _ in range(repeat):
+        functions = parser.get_function_list(parse_code(content, language).root_node)
+        with timers['legacy']:
+            for function in functions:
+                metadata = parser.get_function_metadata(function)
+                _legacy_is_black(metadata['identifier'], exclude_list)
+
+        functions = parser.get_function_list(parse_code(content, language).root_node)
+        with timers['early']:
+            for function in functions:
+                identifier = parser.get_function_metadata(function, fields=IDENTIFIER_FIELDS)['identifier']
+                if black_list.search(identifier) is None:
+                    parser.get_function_metadata(function)
+                    num_kept += 1
+
+        with timers['extract_records']:
+            extract_records(content, language)
+        num_functions += len(functions)
+
+    seconds = {name: timer.elapsed for name, timer in timers.items()}
+    return {
+        'functions': num_functions,
+        'kept': num_kept,
+        'seconds': seconds,
+        'speedup': rate(seconds['legacy'], seconds['early']),
+        'early_functions_per_sec': rate(num_functions, seconds['early']),
+    }
+
+
+def run(num_functions: int = 500, test_ratio: float = 0.9, repeat: int = 4) -> Dict:
+    """
+    Args:
+        num_functions (int): functions per generated file
+        test_ratio (float): share of black listed (test and accessor) functions
+        repeat (int): number of measurements per language
+    Return:
+        Dict: per language and total, seconds and speedup of the early filter
+    """
+    result = {
+        'benchmark': 'blacklist',
+        'num_functions': num_functions,
+        'test_ratio': test_ratio,
+        'repeat': repeat,
+        'languages': {
+            language: bench_language(language, generate_file(language, num_functions, test_ratio), repeat)
+            for language in TEMPLATES
+        },
+    }
+    seconds = {
+        name: sum(item['seconds'][name] for item in result['languages'].values())
+        for name in ['legacy', 'early', 'extract_records']
+    }
+    result['total'] = {
+        'seconds': seconds,
+        'speedup': rate(seconds['legacy'], seconds['early']),
+    }
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--num_functions', type=int, default=500,
+                        help='Number of functions per generated file')
+    parser.add_argument('--test_ratio', type=float, default=0.9,
+                        help='Share of black listed (test and accessor) functions')
+    parser.add_argument('--repeat', type=int, default=4,
+                        help='Number of measurements per language')
+    parser.add_argument('-o', '--output_file', type=str,
+                        help='Save JSON result to this file')
+    opt = parser.parse_args(argv)
+    report(run(opt.num_functions, opt.test_ratio, opt.repeat), opt.output_file)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,26 @@
+"""`codetext bench <benchmark> [options]`"""
+import sys
+import importlib
+
+from . import BENCHMARKS
+
+
+USAGE = 'usage: codetext bench [{}] [options]'.format('|'.join(BENCHMARKS))
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] in ['-h', '--help']:
+        print(USAGE)
+        return
+    if not argv or argv[0].startswith('-'):
+        # options of the default benchmark
+        argv = ['extraction'] + argv
+    elif argv[0] not in BENCHMARKS:
+        print(USAGE, file=sys.stderr)
+        print("codetext bench: unknown benchmark {!r}, choose from {}".format(argv[0], ', '.join(BENCHMARKS)),
+              file=sys.stderr)
+        sys.exit(2)
+
+    benchmark = importlib.import_module('.' + argv[0], __package__)
+    return benchmark.main(argv[1:])
@@ -0,0 +1,119 @@
+"""JSON report size and write throughput of `code_spans` versus `code`
+
+Runs `parse_file` on class-heavy Java files and on the test samples, with the
+code of classes and methods inlined (current format) and with
+`code_spans=True` (source stored once per file, byte spans in the records),
+and writes the reports with `json.dump` as `codetext --json` does. Output size,
+write throughput and the time to `materialize_code` on read are reported.
+"""
+import os
+import json
+import shutil
+import tempfile
+import argparse
+from typing import Dict, List
+
+from ..codetext_cli import parse_file, materialize_code, get_file_language
+from .corpus import DEFAULT_SAMPLE_DIR, add_sample_dir_argument, load_samples, generate_corpus, write_corpus
+from .node_text import generate_file
+from .utils import Timer, rate, report
+
+
+def bench_files(paths: List[str], repeat: int) -> Dict:
+    timers = {name: Timer() for name in ['write_code', 'write_spans', 'materialize']}
+    sizes = {}
+    source_mb = sum(os.path.getsize(path) for path in paths) / 1024 / 1024
+    with tempfile.TemporaryDirectory() as output_dir:
+        for mode in ['code', 'spans']:
+            outputs = {path: parse_file(path, get_file_language(path), code_spans=(mode == 'spans'))
+                       for path in paths}
+            report_path = os.path.join(output_dir, f'{mode}.json')
+            for _ in range(repeat):
+                with timers['write_' + mode]:
+                    with open(report_path, 'w') as f:
+                        json.dump(outputs, f, sort_keys=True, indent=4)
+            sizes[mode] = os.path.getsize(report_path) / 1024 / 1024
+
+        for _ in range(repeat):
+            with open(report_path) as f:
+                outputs = json.load(f)
+            with timers['materialize']:
+                for output in outputs.values():
+                    materialize_code(output)
+
+    seconds = {name: timer.elapsed for name, timer in timers.items()}
+    return {
+        'files': len(paths),
+        'source_mb': source_mb,
+        'output_mb': sizes,
+        'size_ratio': rate(sizes['code'], sizes['spans']),
+        'seconds': seconds,
+        'write_mb_per_sec': {
+            mode: rate(source_mb * repeat, seconds['write_' + mode]) for mode in ['code', 'spans']
+        },
+        'write_speedup': rate(seconds['write_code'], seconds['write_spans']),
+    }
+
+
+def run(sample_dir: str = DEFAULT_SAMPLE_DIR, num_files: int = 10, num_classes: int = 20,
+        num_methods: int = 20, repeat: int = 3) -> Dict:
+    """
+    Args:
+        sample_dir (str): test sample directory
+        num_files (int): number of generated files (per language for samples)
+        num_classes (int): classes per generated Java file
+        num_methods (int): methods per class
+        repeat (int): number of report writes
+    Return:
+        Dict: for class-heavy Java files and the samples, output sizes,
+            write throughput and materialize time
+    """
+    work_dir = tempfile.mkdtemp(prefix='codetext-bench-')
+    try:
+        java_dir = os.path.join(work_dir, 'java')
+        os.makedirs(java_dir)
+        java_paths = []
+        content = generate_file(num_classes, num_methods, body_lines=10)
+        for index in range(num_files):
+            path = os.path.join(java_dir, f'{index}.java')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            java_paths.append(path)
+        corpus = generate_corpus(load_samples(sample_dir), num_files=num_files)
+        sample_paths = write_corpus(corpus, os.path.join(work_dir, 'samples'))
+
+        return {
+            'benchmark': 'code_spans',
+            'num_files': num_files,
+            'num_classes': num_classes,
+            'num_methods': num_methods,
+            'repeat': repeat,
+            'corpora': {
+                'java_classes': bench_files(java_paths, repeat),
+                'samples': bench_files(sample_paths, repeat),
+            },
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_sample_dir_argument(parser)
+    parser.add_argument('--num_files', type=int, default=10,
+                        help='Number of generated files (per language for the samples)')
+    parser.add_argument('--num_classes', type=int, default=20,
+                        help='Number of classes per generated Java file')
+    parser.add_argument('--num_methods', type=int, default=20,
+                        help='Number of methods per class')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Number of report writes')
+    parser.add_argument('-o', '--output_file', type=str,
+                        help='Save JSON result to this file')
+    opt = parser.parse_args(argv)
+    report(run(opt.sample_dir, opt.num_files, opt.num_classes, opt.num_methods, opt.repeat),
+           opt.output_file)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Synthetic corpus generated from the parser test samples"""
+import os
+import argparse
+from typing import Dict, List
+
+from ..codetext_cli import get_file_language, PL_MATCHING
+
+
+# Parser test samples of the source checkout (`src/codetext/bench` -> repo root),
+# independent of the working directory. None when installed without them,
+# then the sample directory must be given
+_CHECKOUT_SAMPLE_DIR = os.path.normpath(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, os.pardir, 'tests', 'test_parser', 'test_sample'))
+DEFAULT_SAMPLE_DIR = _CHECKOUT_SAMPLE_DIR if os.path.isdir(_CHECKOUT_SAMPLE_DIR) else None
+
+
+def add_sample_dir_argument(parser: argparse.ArgumentParser):
+    """`--sample_dir` option of the benchmarks, required without `DEFAULT_SAMPLE_DIR`"""
+    parser.add_argument('--sample_dir', default=DEFAULT_SAMPLE_DIR, required=DEFAULT_SAMPLE_DIR is None,
+                        help='Directory of the test samples (default the parser test samples '
+                             'of a source checkout)')
+
+
+def load_samples(sample_dir: str = DEFAULT_SAMPLE_DIR) -> Dict[str, str]:
+    """
+    Load one sample source per language
+
+    Args:
+        sample_dir (str): directory of `<language>_test_sample.<ext>` files
+    Return:
+        Dict[str, str]: language (key of `PL_MATCHING`) -> source code
+    """
+    if sample_dir is None:
+        raise ValueError("No sample directory: the parser test samples are only in a source "
+                         "checkout, set it with `--sample_dir`")
+    assert os.path.isdir(sample_dir), f"Sample directory {sample_dir} not found"
+    samples = {}
+    for name in sorted(os.listdir(sample_dir)):
+        path = os.path.join(sample_dir, name)
+        language = get_file_language(path)
+        if language is None or not os.path.isfile(path):
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            samples[language] = f.read()
+    return samples
+
+
+def generate_corpus(samples: Dict[str, str], num_files: int = 100,
+                    repeat: int = 1) -> Dict[str, List[str]]:
+    """
+    Scale the samples into a synthetic corpus
+
+    Args:
+        samples (Dict[str, str]): language -> sample source (see `load_samples`)
+        num_files (int): number of files per language
+        repeat (int): number of sample copies concatenated into each file,
+            use it to grow file size instead of file count
+    Return:
+        Dict[str, List[str]]: language -> list of file contents
+    """
+    corpus = {}
+    for language, source in samples.items():
+        content = '\n'.join([source] * repeat)
+        corpus[language] = [content] * num_files
+    return corpus
+
+
+def write_corpus(corpus: Dict[str, List[str]], output_dir: str) -> List[str]:
+    """
+    Write a generated corpus to `output_dir/<language>/<index><ext>`
+
+    Return:
+        List[str]: written file paths
+    """
+    paths = []
+    for language, contents in corpus.items():
+        extension = PL_MATCHING[language][0]
+        language_dir = os.path.join(output_dir, extension.lstrip('.'))
+        os.makedirs(language_dir, exist_ok=True)
+        for index, content in enumerate(contents):
+            path = os.path.join(language_dir, f'{index}{extension}')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            paths.append(path)
+    return paths
@@ -0,0 +1,151 @@
+"""`check_function` node checks on error-heavy files
+
+Generates files of long functions, a share of them with a syntax error, and
+times the node level checks of `check_function` (ERROR node and length) two
+ways:
+    - legacy: `get_node_by_kind(node, ['ERROR'])` over the whole function
+      subtree, then the line span
+    - native: `filter_function_nodes`, line span from the node points and
+      `has_error` flags, only the flagged subtrees are searched
+"""
+import argparse
+from typing import Dict, List
+
+from ..utils import parse_code
+from ..codetext_cli import get_language_parser
+from ..parser import get_node_by_kind
+from ..clean.noise_removal import filter_function_nodes
+from .utils import Timer, rate, report
+
+
+TEMPLATES = {
+    'python': ('def compute_{index}(value, expected=None):\n'
+               '    result = value\n'
+               '{body}'
+               '    return result{error}\n'),
+    'java': ('class Suite{index} {{\n'
+             '    int compute(int value) {{\n'
+             '        int result = value;\n'
+             '{body}'
+             '        return result{error};\n'
+             '    }}\n'
+             '}}\n'),
+    'javascript': ('function compute_{index}(value) {{\n'
+                   '    let result = value;\n'
+                   '{body}'
+                   '    return result{error};\n'
+                   '}}\n'),
+}
+
+BODY_LINES = {
+    'python': '    result = result * {line} + (value - {line})\n',
+    'java': '        result = result * {line} + (value - {line});\n',
+    'javascript': '    result = result * {line} + (value - {line});\n',
+}
+
+# a dangling operator, the function is still recognised with an ERROR node inside
+ERROR_TOKEN = ' +* ]'
+
+
+def _legacy_filter(nodes: List) -> List:
+    res = []
+    for node in nodes:
+        if len(get_node_by_kind(node, ['ERROR'])) > 0:
+            continue
+        if node.end_point[0] - node.start_point[0] <= 3:
+            continue
+        res.append(node)
+    return res
+
+
+def generate_file(language: str, num_functions: int, body_lines: int, error_ratio: float) -> str:
+    """Source with `num_functions` functions, `error_ratio` of them with a syntax error"""
+    body = ''.join(BODY_LINES[language].format(line=line) for line in range(body_lines))
+    num_error = int(num_functions * error_ratio)
+    chunks = []
+    for index in range(num_functions):
+        error = ERROR_TOKEN if index < num_error else ''
+        chunks.append(TEMPLATES[language].format(index=index, body=body, error=error))
+    return '\n'.join(chunks)
+
+
+def bench_language(language: str, content: str, repeat: int) -> Dict:
+    parser = get_language_parser(language)
+    timers = {name: Timer() for name in ['legacy', 'native']}
+    num_functions = 0
+    num_kept = 0
+    for _ in range(repeat):
+        # fresh trees, tree-sitter caches children on first access
+        functions = parser.get_function_list(parse_code(content, language).root_node)
+        with timers['legacy']:
+            legacy = _legacy_filter(functions)
+
+        functions = parser.get_function_list(parse_code(content, language).root_node)
+        with timers['native']:
+            kept = filter_function_nodes(functions)
+        assert len(kept) == len(legacy), "Native filter disagrees with the legacy checks"
+        num_functions += len(functions)
+        num_kept += len(kept)
+
+    seconds = {name: timer.elapsed for name, timer in timers.items()}
+    return {
+        'functions': num_functions,
+        'kept': num_kept,
+        'seconds': seconds,
+        'speedup': rate(seconds['legacy'], seconds['native']),
+        'native_functions_per_sec': rate(num_functions, seconds['native']),
+    }
+
+
+def run(num_functions: int = 200, body_lines: int = 50, error_ratio: float = 0.5,
+        repeat: int = 4) -> Dict:
+    """
+    Args:
+        num_functions (int): functions per generated file
+        body_lines (int): statements per function body
+        error_ratio (float): share of functions with a syntax error
+        repeat (int): number of measurements per language
+    Return:
+        Dict: per language and total, seconds and speedup of the native checks
+    """
+    result = {
+        'benchmark': 'error_filter',
+        'num_functions': num_functions,
+        'body_lines': body_lines,
+        'error_ratio': error_ratio,
+        'repeat': repeat,
+        'languages': {
+            language: bench_language(
+                language, generate_file(language, num_functions, body_lines, error_ratio), repeat)
+            for language in TEMPLATES
+        },
+    }
+    seconds = {
+        name: sum(item['seconds'][name] for item in result['languages'].values())
+        for name in ['legacy', 'native']
+    }
+    result['total'] = {
+        'seconds': seconds,
+        'speedup': rate(seconds['legacy'], seconds['native']),
+    }
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--num_functions', type=int, default=200,
+                        help='Number of functions per generated file')
+    parser.add_argument('--body_lines', type=int, default=50,
+                        help='Number of statements per function body')
+    parser.add_argument('--error_ratio', type=float, default=0.5,
+                        help='Share of functions with a syntax error')
+    parser.add_argument('--repeat', type=int, default=4,
+                        help='Number of measurements per language')
+    parser.add_argument('-o', '--output_file', type=str,
+                        help='Save JSON result to this file')
+    opt = parser.parse_args(argv)
+    report(run(opt.num_functions, opt.body_lines, opt.error_ratio, opt.repeat), opt.output_file)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""Per-language parse, extraction and cleaning throughput"""
+import argparse
+from typing import Dict, List
+
+from ..utils import parse_code
+from ..codetext_cli import get_language_parser
+from ..clean.noise_removal import clean_docstring
+from ..clean.language_id import detect_language
+from ..clean.filter_stats import FilterStats
+from .corpus import DEFAULT_SAMPLE_DIR, add_sample_dir_argument, load_samples, generate_corpus
+from .utils import Timer, peak_rss_mb, rate, report
+
+
+STAGES = ['parse', 'get_function_list', 'get_function_metadata', 'get_docstring', 'clean_docstring']
+
+
+def bench_language(language: str, contents: List[str], filter_stats: bool = False) -> Dict:
+    """
+    Run parse -> extraction -> cleaning over `contents` and time each stage
+
+    Args:
+        language (str): language name (key of `PL_MATCHING`)
+        contents (List[str]): source files
+        filter_stats (bool): also report per-rule docstring filter statistics
+    Return:
+        Dict: counters, per-stage seconds and throughput
+    """
+    parser = get_language_parser(language)
+    timers = {stage: Timer() for stage in STAGES}
+    num_bytes = num_functions = num_docstrings = 0
+    stats = FilterStats() if filter_stats else None
+    # docstrings repeat across copies of the sample, do not let the cache hide it
+    detect_language.cache_clear()
+
+    for content in contents:
+        num_bytes += len(content.encode('utf-8'))
+        with timers['parse']:
+            root = parse_code(content, language).root_node
+        with timers['get_function_list']:
+            functions = parser.get_function_list(root)
+        with timers['get_function_metadata']:
+            for function in functions:
+                parser.get_function_metadata(function)
+        with timers['get_docstring']:
+            docstrings = [parser.get_docstring(function) for function in functions]
+        with timers['clean_docstring']:
+            for docstring in docstrings:
+                if docstring:
+                    clean_docstring(docstring, stats=stats)
+        num_functions += len(functions)
+        num_docstrings += sum(1 for docstring in docstrings if docstring)
+
+    seconds = {stage: timer.elapsed for stage, timer in timers.items()}
+    total = sum(seconds.values())
+    extraction = total - seconds['parse'] - seconds['clean_docstring']
+    result = {
+        'files': len(contents),
+        'bytes': num_bytes,
+        'functions': num_functions,
+        'docstrings': num_docstrings,
+        'seconds': seconds,
+        'total_seconds': total,
+        'files_per_sec': rate(len(contents), total),
+        'mb_per_sec': rate(num_bytes / (1 << 20), total),
+        'functions_per_sec': rate(num_functions, total),
+        'parse_mb_per_sec': rate(num_bytes / (1 << 20), seconds['parse']),
+        'extraction_functions_per_sec': rate(num_functions, extraction),
+        'clean_docstrings_per_sec': rate(num_docstrings, seconds['clean_docstring']),
+        # process high-water mark once this language is done
+        'peak_rss_mb': peak_rss_mb(),
+    }
+    if stats is not None:
+        result['filter_rules'] = stats.to_dict()
+    return result
+
+
+def run(sample_dir: str = DEFAULT_SAMPLE_DIR, num_files: int = 100,
+        repeat: int = 1, languages: List[str] = None, filter_stats: bool = False) -> Dict:
+    """
+    Benchmark every language found in `sample_dir`
+
+    Args:
+        sample_dir (str): test sample directory
+        num_files (int): number of generated files per language
+        repeat (int): sample copies per generated file
+        languages (List[str]): restrict to these languages (case insensitive)
+        filter_stats (bool): also report per-rule docstring filter statistics
+    Return:
+        Dict: machine-readable result
+    """
+    samples = load_samples(sample_dir)
+    if languages:
+        wanted = [language.lower() for language in languages]
+        samples = {k: v for k, v in samples.items() if k.lower() in wanted}
+    corpus = generate_corpus(samples, num_files=num_files, repeat=repeat)
+
+    result = {
+        'benchmark': 'extraction',
+        'num_files': num_files,
+        'repeat': repeat,
+        'languages': {},
+    }
+    for language, contents in corpus.items():
+        result['languages'][language] = bench_language(language, contents, filter_stats)
+
+    stats = result['languages'].values()
+    total = sum(item['total_seconds'] for item in stats)
+    result['total'] = {
+        'files': sum(item['files'] for item in stats),
+        'bytes': sum(item['bytes'] for item in stats),
+        'functions': sum(item['functions'] for item in stats),
+        'total_seconds': total,
+        'files_per_sec': rate(sum(item['files'] for item in stats), total),
+        'mb_per_sec': rate(sum(item['bytes'] for item in stats) / (1 << 20), total),
+        'functions_per_sec': rate(sum(item['functions'] for item in stats), total),
+        'peak_rss_mb': peak_rss_mb(),
+    }
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_sample_dir_argument(parser)
+    parser.add_argument('--num_files', type=int, default=100,
+                        help='Number of generated files per language')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='Number of sample copies in each generated file')
+    parser.add_argument('-l', '--language', nargs='*',
+                        help='Languages to benchmark (default all)')
+    parser.add_argument('--filter_stats', action='store_true',
+                        help='Report per-rule docstring filter statistics')
+    parser.add_argument('-o', '--output_file', type=str,
+                        help='Save JSON result to this file')
+    opt = parser.parse_args(argv)
+    report(run(opt.sample_dir, opt.num_files, opt.repeat, opt.language, opt.filter_stats),
+           opt.output_file)
+
+
+if __name__ == '__main__':
+    main()
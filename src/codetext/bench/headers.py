@@ -0,0 +1,116 @@
+"""Headers only extraction versus full extraction
+
+Scale the parser test samples to `--target_mb` (1 GB by default) and compare
+full extraction (the metadata step of `parse_file`) with the headers only walk
+(`LanguageParser.iter_headers` and `HEADER_FIELDS` metadata). Each mode gets
+freshly parsed trees, parsing is timed separately.
+"""
+import math
+import argparse
+from typing import Dict, List
+
+from ..utils import parse_code
+from ..codetext_cli import get_language_parser, _get_file_metadata, HEADER_FIELDS
+from .corpus import DEFAULT_SAMPLE_DIR, add_sample_dir_argument, load_samples, generate_corpus
+from .utils import Timer, rate, report
+
+
+def _headers(parser, root, max_depth: int) -> int:
+    count = 0
+    for kind, node, _ in parser.iter_headers(root, max_depth):
+        if kind == 'class':
+            parser.get_class_metadata(node, fields=HEADER_FIELDS)
+        else:
+            parser.get_function_metadata(node, fields=HEADER_FIELDS)
+        count += 1
+    return count
+
+
+def bench_language(language: str, contents: List[str], max_depth: int = 0) -> Dict:
+    parser = get_language_parser(language)
+    timers = {name: Timer() for name in ['parse', 'full', 'headers']}
+    num_bytes = num_full = num_headers = 0
+    for content in contents:
+        num_bytes += len(content.encode('utf-8'))
+        with timers['parse']:
+            root = parse_code(content, language).root_node
+        with timers['full']:
+            metadata = _get_file_metadata(parser, root)
+        num_full += len(metadata['class']) + len(metadata['function']) \
+            + sum(len(c['method']) for c in metadata['class'])
+
+        root = parse_code(content, language).root_node
+        with timers['headers']:
+            num_headers += _headers(parser, root, max_depth)
+
+    seconds = {name: timer.elapsed for name, timer in timers.items()}
+    megabytes = num_bytes / (1 << 20)
+    return {
+        'files': len(contents),
+        'bytes': num_bytes,
+        'full_definitions': num_full,
+        'header_definitions': num_headers,
+        'seconds': seconds,
+        'full_mb_per_sec': rate(megabytes, seconds['parse'] + seconds['full']),
+        'headers_mb_per_sec': rate(megabytes, seconds['parse'] + seconds['headers']),
+        'extraction_speedup': rate(seconds['full'], seconds['headers']),
+    }
+
+
+def run(sample_dir: str = DEFAULT_SAMPLE_DIR, target_mb: float = 1024,
+        repeat: int = 20, max_depth: int = 0) -> Dict:
+    """
+    Args:
+        sample_dir (str): test sample directory
+        target_mb (float): total corpus size, split evenly between languages
+        repeat (int): sample copies per generated file
+        max_depth (int): see `LanguageParser.iter_headers`
+    Return:
+        Dict: per language and total, MB/s of both modes and extraction speedup
+    """
+    samples = load_samples(sample_dir)
+    per_language = target_mb * (1 << 20) / len(samples)
+    result = {
+        'benchmark': 'headers',
+        'target_mb': target_mb,
+        'repeat': repeat,
+        'max_depth': max_depth,
+        'languages': {},
+    }
+    for language, source in samples.items():
+        file_size = len(('\n'.join([source] * repeat)).encode('utf-8'))
+        num_files = max(1, math.ceil(per_language / file_size))
+        contents = generate_corpus({language: source}, num_files=num_files, repeat=repeat)[language]
+        result['languages'][language] = bench_language(language, contents, max_depth)
+
+    stats = result['languages'].values()
+    seconds = {name: sum(item['seconds'][name] for item in stats)
+               for name in ['parse', 'full', 'headers']}
+    megabytes = sum(item['bytes'] for item in stats) / (1 << 20)
+    result['total'] = {
+        'mb': megabytes,
+        'seconds': seconds,
+        'full_mb_per_sec': rate(megabytes, seconds['parse'] + seconds['full']),
+        'headers_mb_per_sec': rate(megabytes, seconds['parse'] + seconds['headers']),
+        'extraction_speedup': rate(seconds['full'], seconds['headers']),
+    }
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_sample_dir_argument(parser)
+    parser.add_argument('--target_mb', type=float, default=1024,
+                        help='Size of the generated corpus in MB')
+    parser.add_argument('--repeat', type=int, default=20,
+                        help='Number of sample copies in each generated file')
+    parser.add_argument('--max_depth', type=int, default=0,
+                        help='Search functions nested up to this depth')
+    parser.add_argument('-o', '--output_file', type=str,
+                        help='Save JSON result to this file')
+    opt = parser.parse_args(argv)
+    report(run(opt.sample_dir, opt.target_mb, opt.repeat, opt.max_depth), opt.output_file)
+
+
+if __name__ == '__main__':
+    main()
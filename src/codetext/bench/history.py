@@ -0,0 +1,150 @@
+"""Throughput of the history walker with incremental and full reparsing
+
+A local repository with thousands of commits is generated with
+`git fast-import`: `num_files` Python files of `num_functions` functions (a
+third of them methods), then every commit edits one file, changing the body
+of a function (most commits), adding a function or deleting one. The history
+is walked with `HistoryWalker`, once reusing the previous tree of each file
+(incremental reparse of the edited ranges) and once re-parsing and
+re-extracting the whole file at every change. Both walks must give the same
+change records.
+"""
+import os
+import random
+import tempfile
+import argparse
+import subprocess
+from typing import Dict, List
+
+from ..pipeline.history import HistoryWalker
+from .utils import Timer, rate, report
+
+
+FUNCTION_TEMPLATE = '''{indent}def {name}(a, b):
+{indent}    """Compute {name} from a and b"""
+{indent}    total = a + b
+{indent}    for i in range({value}):
+{indent}        total += i * b
+{indent}    return total
+'''
+
+
+def render(functions: List[Dict]) -> str:
+    """Source of a generated file: stand-alone functions then a class of methods"""
+    parts = [FUNCTION_TEMPLATE.format(indent='', **f) for f in functions if not f['method']]
+    methods = [FUNCTION_TEMPLATE.format(indent='    ', **f) for f in functions if f['method']]
+    if methods:
+        parts.append('class Model:\n' + '\n'.join(methods))
+    return '\n\n'.join(parts)
+
+
+def _data(content: str) -> bytes:
+    data = content.encode('utf-8')
+    return b'data %d\n%s\n' % (len(data), data)
+
+
+def generate_repo(path: str, num_files: int = 20, num_functions: int = 30,
+                  num_commits: int = 2000, seed: int = 0) -> int:
+    """
+    Create a git repository at `path` with a generated history
+
+    Return:
+        int: number of commits
+    """
+    rng = random.Random(seed)
+    files = {}
+    counter = 0
+    for index in range(num_files):
+        functions = []
+        for _ in range(num_functions):
+            counter += 1
+            functions.append({'name': f'func_{counter}', 'value': rng.randint(1, 99),
+                              'method': rng.random() < 1 / 3})
+        files[f'src/module_{index}.py'] = functions
+
+    stream = []
+    for commit in range(num_commits):
+        if commit == 0:
+            changed = list(files)
+        else:
+            path_name = rng.choice(sorted(files))
+            functions = files[path_name]
+            operation = rng.random()
+            if operation < 0.1:
+                counter += 1
+                functions.insert(rng.randrange(len(functions) + 1),
+                                 {'name': f'func_{counter}', 'value': rng.randint(1, 99),
+                                  'method': rng.random() < 1 / 3})
+            elif operation < 0.2 and len(functions) > 1:
+                functions.pop(rng.randrange(len(functions)))
+            else:
+                rng.choice(functions)['value'] += 1
+            changed = [path_name]
+        stream.append(b'commit refs/heads/main\nmark :%d\n' % (commit + 1))
+        stream.append(b'committer Bench <bench@example.com> %d +0000\n' % (1600000000 + commit))
+        stream.append(_data(f'commit {commit}'))
+        if commit:
+            stream.append(b'from :%d\n' % commit)
+        for path_name in changed:
+            stream.append(b'M 100644 inline %s\n' % path_name.encode())
+            stream.append(_data(render(files[path_name])))
+    subprocess.run(['git', 'init', '-q', path], check=True)
+    subprocess.run(['git', '-C', path, 'fast-import', '--quiet'], input=b''.join(stream), check=True)
+    subprocess.run(['git', '-C', path, 'symbolic-ref', 'HEAD', 'refs/heads/main'], check=True)
+    return num_commits
+
+
+def _walk(repo: str, incremental: bool) -> Dict:
+    walker = HistoryWalker(repo, incremental=incremental)
+    timer = Timer()
+    with timer:
+        records = [(r['commit'], r['path'], r['change'], r['kind'], r['class'], r['identifier'],
+                    r['rank'], r['old_span'], r['new_span'], r['sha1']) for r in walker.walk()]
+    return dict(walker.stats, seconds=timer.elapsed,
+                commits_per_second=rate(walker.stats['commits'], timer.elapsed),
+                records_list=records)
+
+
+def run(num_files: int = 20, num_functions: int = 30, num_commits: int = 2000, seed: int = 0) -> Dict:
+    """
+    Args:
+        num_files (int): number of generated files
+        num_functions (int): initial number of functions per file
+        num_commits (int): number of commits
+        seed (int): seed of the generated history
+    Return:
+        Dict: per mode (`incremental`, `full`) walker stats, seconds and
+            commits/s, the `speedup` and whether both gave the same records
+    """
+    result = {'benchmark': 'history', 'num_files': num_files, 'num_functions': num_functions,
+              'num_commits': num_commits, 'modes': {}}
+    with tempfile.TemporaryDirectory() as repo:
+        generate_repo(repo, num_files, num_functions, num_commits, seed)
+        records = {}
+        for name, incremental in (('incremental', True), ('full', False)):
+            stats = _walk(repo, incremental)
+            records[name] = stats.pop('records_list')
+            result['modes'][name] = stats
+    result['same_records'] = records['incremental'] == records['full']
+    result['speedup'] = rate(result['modes']['full']['seconds'], result['modes']['incremental']['seconds'])
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--num_files', type=int, default=20,
+                        help='Number of generated files')
+    parser.add_argument('--num_functions', type=int, default=30,
+                        help='Initial number of functions per file')
+    parser.add_argument('--num_commits', type=int, default=2000,
+                        help='Number of commits')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Seed of the generated history')
+    parser.add_argument('-o', '--output_file', type=str,
+                        help='Save JSON result to this file')
+    opt = parser.parse_args(argv)
+    report(run(opt.num_files, opt.num_functions, opt.num_commits, opt.seed), opt.output_file)
+
+
+if __name__ == '__main__':
+    main()
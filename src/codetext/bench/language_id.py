@@ -0,0 +1,98 @@
+"""Benchmark docstring language identification against raw `langdetect`"""
+import time
+import argparse
+from typing import Dict, List
+
+from langdetect import DetectorFactory, detect
+from langdetect.lang_detect_exception import LangDetectException
+
+from ..clean.language_id import detect_language
+from .utils import rate, report
+
+
+SAMPLE_DOCSTRINGS = [
+    'Returns the message Id to use as heading text, depending on what types of usage are present',
+    'Convert java.util.regex.Matcher groups to JavaScript groups',
+    'Find 2 sum of the given list of number',
+    'Calculates checksum',
+    'Handles incoming websocket messages and dispatches them to the registered listeners',
+    'Taking in a sequence string, return the canonical form of the sequence',
+    'Retourne la valeur associée à la clé donnée',
+    'Gibt den Wert zurück, wenn der Schlüssel existiert',
+    'Devuelve el valor asociado con la clave',
+    '将JSONArray转换为Bean的List, 默认为ArrayList',
+    'Получить значение по ключу',
+    'Lấy giá trị của khóa',
+]
+
+
+def make_docstrings(size: int) -> List[str]:
+    """Make `size` distinct docstrings, so the cache can not serve them"""
+    return [
+        '{} ({})'.format(SAMPLE_DOCSTRINGS[i % len(SAMPLE_DOCSTRINGS)], i)
+        for i in range(size)
+    ]
+
+
+def _throughput(func, docstrings: List[str]) -> float:
+    start = time.perf_counter()
+    for docstring in docstrings:
+        func(docstring)
+    return rate(len(docstrings), time.perf_counter() - start)
+
+
+def _langdetect(docstring: str) -> str:
+    try:
+        return detect(docstring)
+    except LangDetectException:
+        return 'unknown'
+
+
+def run(size: int = 20000, langdetect_size: int = 1000) -> Dict:
+    """
+    Measure docstrings/s of `detect_language` (cold and cached) and `langdetect`
+
+    Args:
+        size (int): number of docstrings for `detect_language`
+        langdetect_size (int): number of docstrings for `langdetect` (slow)
+    Return:
+        Dict: docstrings per second for each method
+    """
+    DetectorFactory.seed = 0
+    docstrings = make_docstrings(size)
+
+    detect_language.cache_clear()
+    cold = _throughput(detect_language, docstrings)
+    warm = _throughput(detect_language, docstrings)
+    raw = _throughput(_langdetect, docstrings[:langdetect_size])
+
+    agreement = sum(
+        detect_language(docstring) == _langdetect(docstring)
+        for docstring in SAMPLE_DOCSTRINGS
+    ) / len(SAMPLE_DOCSTRINGS)
+
+    return {
+        'benchmark': 'language_id',
+        'num_docstrings': size,
+        'langdetect_docstrings_per_sec': raw,
+        'fast_cold_docstrings_per_sec': cold,
+        'fast_cached_docstrings_per_sec': warm,
+        'speedup_cold': cold / raw,
+        'agreement_with_langdetect': agreement,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size', type=int, default=20000,
+                        help='Number of docstrings for the fast path')
+    parser.add_argument('--langdetect_size', type=int, default=1000,
+                        help='Number of docstrings for raw langdetect')
+    parser.add_argument('-o', '--output_file', type=str,
+                        help='Save JSON result to this file')
+    opt = parser.parse_args(argv)
+    report(run(opt.size, opt.langdetect_size), opt.output_file)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""Function and class listing on a minified JavaScript bundle
+
+Minified bundles put tens of thousands of arrow functions and classes on a
+single line. Listing them must stay linear in the number of nodes; the former
+`res[:]` / `res.remove(node)` filtering is kept here as a quadratic reference.
+"""
+import argparse
+from typing import Dict, List
+
+from ..utils import parse_code
+from ..parser import JavascriptParser
+from ..parser.language_parser import get_node_by_kind
+from ..codetext_cli import _get_file_metadata
+from .utils import Timer, rate, report
+
+
+def generate_bundle(num_functions: int) -> str:
+    """
+    Generate a one-line bundle with `num_functions` functions: function
+    expressions (their `function` keyword token shares the node type),
+    arrow functions and class methods
+    """
+    parts = []
+    for i in range(0, num_functions, 4):
+        parts.append('var f%d=function(a){return a*%d}' % (i, i))
+        parts.append('g%d=(a,b)=>a+b' % i)
+        parts.append('class C%d{m%d(a){return a}n%d(b){return b}}' % (i, i, i))
+    return ';'.join(parts)
+
+
+def _legacy_function_list(node) -> List:
+    """Previous `JavascriptParser.get_function_list` (O(n^2) removal)"""
+    res = get_node_by_kind(node, ['function_declaration', 'function', 'method_definition',
+                                  'generator_function_declaration', 'arrow_function',
+                                  'generator_function'])
+    for item in res[:]:
+        if not item.children:
+            res.remove(item)
+    return res
+
+
+def bench_size(num_functions: int, legacy: bool) -> Dict:
+    code = generate_bundle(num_functions)
+    # tree-sitter caches children on first access, time each walk on a fresh tree
+
+    function_list, file_metadata = Timer(), Timer()
+    root = parse_code(code, 'javascript').root_node
+    with function_list:
+        functions = JavascriptParser.get_function_list(root)
+    root = parse_code(code, 'javascript').root_node
+    with file_metadata:
+        metadata = _get_file_metadata(JavascriptParser, root)
+    result = {
+        'bytes': len(code),
+        'functions': len(functions),
+        'classes': len(metadata['class']),
+        'get_function_list_seconds': function_list.elapsed,
+        'file_metadata_seconds': file_metadata.elapsed,
+        'functions_per_sec': rate(len(functions), function_list.elapsed),
+    }
+    if legacy:
+        legacy_timer = Timer()
+        root = parse_code(code, 'javascript').root_node
+        with legacy_timer:
+            _legacy_function_list(root)
+        result['legacy_get_function_list_seconds'] = legacy_timer.elapsed
+        result['speedup'] = rate(legacy_timer.elapsed, function_list.elapsed)
+    return result
+
+
+def run(sizes: List[int] = (1000, 5000, 20000), legacy_max: int = 20000) -> Dict:
+    """
+    Args:
+        sizes (List[int]): number of arrow functions in each bundle
+        legacy_max (int): also time the quadratic reference up to this size
+    Return:
+        Dict: per bundle size, counts, seconds and throughput
+    """
+    return {
+        'benchmark': 'minified',
+        'sizes': {
+            str(size): bench_size(size, legacy=size <= legacy_max)
+            for size in sizes
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 5000, 20000],
+                        help='Number of arrow functions in each bundle')
+    parser.add_argument('--legacy_max', type=int, default=20000,
+                        help='Time the quadratic reference up to this size')
+    parser.add_argument('-o', '--output_file', type=str,
+                        help='Save JSON result to this file')
+    opt = parser.parse_args(argv)
+    report(run(opt.sizes, opt.legacy_max), opt.output_file)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""Node text of class-heavy Java files: `get_node_text` versus `SourceText`
+
+Generates Java files of large classes and reads the code of every class and
+method (what `parse_file` stores), with `get_node_text` (a copy and a decode
+of the node bytes per call) and with one `SourceText` per file. Sources with
+non-ASCII comments go through the `memoryview` path of `SourceText`, ASCII
+sources slice the decoded file. Time and peak traced memory of the text step, and
+the time of the whole metadata step of `parse_file`, are reported.
+"""
+import argparse
+import tracemalloc
+from typing import Dict
+
+from ..utils import parse_code
+from ..parser import JavaParser, SourceText, get_node_text
+from ..codetext_cli import _get_file_metadata
+from .utils import Timer, rate, report
+
+
+METHOD_TEMPLATE = ('    /**\n'
+                   '     * Compute step {method} of the pipeline{comment}\n'
+                   '     */\n'
+                   '    public int step{method}(int value, int scale) {{\n'
+                   '{body}'
+                   '        return value;\n'
+                   '    }}\n')
+BODY_LINE = '        value = value * scale + {line};\n'
+
+
+def generate_file(num_classes: int, num_methods: int, body_lines: int, ascii: bool = True) -> str:
+    """Java source of `num_classes` classes with `num_methods` methods each"""
+    body = ''.join(BODY_LINE.format(line=line) for line in range(body_lines))
+    comment = '' if ascii else ' (étape → résultat)'
+    classes = []
+    for index in range(num_classes):
+        methods = ''.join(METHOD_TEMPLATE.format(method=method, body=body, comment=comment)
+                          for method in range(num_methods))
+        classes.append(f'class Pipeline{index} {{\n{methods}}}\n')
+    return '\n'.join(classes)
+
+
+def _list_nodes(content: str):
+    root = parse_code(content, 'java').root_node
+    nodes = []
+    for _cls in JavaParser.get_class_list(root):
+        nodes.append(_cls)
+        nodes.extend(JavaParser.get_function_list(_cls))
+    return nodes
+
+
+def _legacy_text(source: SourceText, nodes):
+    return [get_node_text(node) for node in nodes]
+
+
+def _source_text(source: SourceText, nodes):
+    return [source.get_node_text(node) for node in nodes]
+
+
+def _peak_mb(function, *args) -> float:
+    tracemalloc.start()
+    try:
+        result = function(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak / 1024 / 1024
+
+
+def bench_source(content: str, repeat: int) -> Dict:
+    modes = {'legacy': _legacy_text, 'source_text': _source_text}
+    timers = {name: Timer() for name in ['legacy', 'source_text', 'file_legacy', 'file_source_text']}
+    peak_mb = {}
+    chars = 0
+    for _ in range(repeat):
+        for mode, read_text in modes.items():
+            # fresh trees, tree-sitter caches children on first access
+            # `parse_file` builds the `SourceText` to parse, it is not timed
+            nodes = _list_nodes(content)
+            source = SourceText(content)
+            with timers[mode]:
+                texts = read_text(source, nodes)
+            chars = sum(len(text) for text in texts)
+
+            root = parse_code(content, 'java').root_node
+            source = SourceText(content) if mode == 'source_text' else None
+            with timers['file_' + mode]:
+                _get_file_metadata(JavaParser, root, None, source)
+    for mode, read_text in modes.items():
+        # code text kept alive, as in the `parse_file` output
+        peak_mb[mode] = _peak_mb(read_text, SourceText(content), _list_nodes(content))
+
+    seconds = {name: timer.elapsed for name, timer in timers.items()}
+    size_mb = len(content.encode('utf-8')) / 1024 / 1024
+    return {
+        'size_mb': size_mb,
+        'code_chars': chars,
+        'seconds': seconds,
+        'peak_mb': peak_mb,
+        'text_speedup': rate(seconds['legacy'], seconds['source_text']),
+        'file_speedup': rate(seconds['file_legacy'], seconds['file_source_text']),
+        'source_text_mb_per_sec': rate(size_mb * repeat, seconds['source_text']),
+    }
+
+
+def run(num_classes: int = 50, num_methods: int = 20, body_lines: int = 20, repeat: int = 3) -> Dict:
+    """
+    Args:
+        num_classes (int): classes per generated file
+        num_methods (int): methods per class
+        body_lines (int): statements per method body
+        repeat (int): number of measurements
+    Return:
+        Dict: ASCII and non-ASCII sources, seconds, peak traced memory and speedups
+    """
+    return {
+        'benchmark': 'node_text',
+        'num_classes': num_classes,
+        'num_methods': num_methods,
+        'body_lines': body_lines,
+        'repeat': repeat,
+        'sources': {
+            name: bench_source(generate_file(num_classes, num_methods, body_lines, ascii), repeat)
+            for name, ascii in [('ascii', True), ('non_ascii', False)]
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--num_classes', type=int, default=50,
+                        help='Number of classes per generated file')
+    parser.add_argument('--num_methods', type=int, default=20,
+                        help='Number of methods per class')
+    parser.add_argument('--body_lines', type=int, default=20,
+                        help='Number of statements per method body')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Number of measurements')
+    parser.add_argument('-o', '--output_file', type=str,
+                        help='Save JSON result to this file')
+    opt = parser.parse_args(argv)
+    report(run(opt.num_classes, opt.num_methods, opt.body_lines, opt.repeat), opt.output_file)
+
+
+if __name__ == '__main__':
+    main()
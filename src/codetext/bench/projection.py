@@ -0,0 +1,111 @@
+"""Name-only indexing with the `fields` projection versus full metadata
+
+Times `get_*_metadata`, and the whole metadata step of `parse_file` (node
+listing included), with all fields and with `{"identifier", "span"}` on a
+synthetic corpus generated from the parser test samples. Parsing is excluded,
+trees are parsed fresh for each mode because tree-sitter caches children on
+first access.
+"""
+import argparse
+from typing import Dict, List
+
+from ..utils import parse_code
+from ..codetext_cli import get_language_parser, _get_file_metadata
+from .corpus import DEFAULT_SAMPLE_DIR, add_sample_dir_argument, load_samples, generate_corpus
+from .utils import Timer, rate, report
+
+
+INDEX_FIELDS = {'identifier', 'span'}
+
+
+def _metadata(parser, classes: List, functions: List, fields) -> None:
+    for node in classes:
+        parser.get_class_metadata(node, fields=fields)
+    for node in functions:
+        parser.get_function_metadata(node, fields=fields)
+
+
+def bench_language(language: str, contents: List[str], fields=INDEX_FIELDS) -> Dict:
+    """
+    Time `get_*_metadata` alone (nodes are listed beforehand) and the whole
+    metadata step of `parse_file` (listing included), with and without `fields`
+    """
+    parser = get_language_parser(language)
+    timers = {name: Timer() for name in ['full', 'projection', 'file_full', 'file_projection']}
+    num_functions = 0
+    for content in contents:
+        for mode, mode_fields in [('full', None), ('projection', fields)]:
+            root = parse_code(content, language).root_node
+            classes = parser.get_class_list(root)
+            functions = parser.get_function_list(root)
+            with timers[mode]:
+                _metadata(parser, classes, functions, mode_fields)
+
+            root = parse_code(content, language).root_node
+            with timers['file_' + mode]:
+                _get_file_metadata(parser, root, mode_fields)
+        num_functions += len(functions)
+
+    seconds = {name: timer.elapsed for name, timer in timers.items()}
+    return {
+        'files': len(contents),
+        'functions': num_functions,
+        'seconds': seconds,
+        'metadata_speedup': rate(seconds['full'], seconds['projection']),
+        'file_speedup': rate(seconds['file_full'], seconds['file_projection']),
+        'projection_functions_per_sec': rate(num_functions, seconds['projection']),
+    }
+
+
+def run(sample_dir: str = DEFAULT_SAMPLE_DIR, num_files: int = 50, repeat: int = 4,
+        fields: List[str] = None) -> Dict:
+    """
+    Args:
+        sample_dir (str): test sample directory
+        num_files (int): number of generated files per language
+        repeat (int): sample copies per generated file
+        fields (List[str]): projected fields (default identifier and span)
+    Return:
+        Dict: per language and total, seconds and speedups of the projection
+    """
+    fields = set(fields) if fields else INDEX_FIELDS
+    corpus = generate_corpus(load_samples(sample_dir), num_files=num_files, repeat=repeat)
+    result = {
+        'benchmark': 'projection',
+        'fields': sorted(fields),
+        'num_files': num_files,
+        'repeat': repeat,
+        'languages': {
+            language: bench_language(language, contents, fields)
+            for language, contents in corpus.items()
+        },
+    }
+    seconds = {
+        name: sum(item['seconds'][name] for item in result['languages'].values())
+        for name in ['full', 'projection', 'file_full', 'file_projection']
+    }
+    result['total'] = {
+        'seconds': seconds,
+        'metadata_speedup': rate(seconds['full'], seconds['projection']),
+        'file_speedup': rate(seconds['file_full'], seconds['file_projection']),
+    }
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_sample_dir_argument(parser)
+    parser.add_argument('--num_files', type=int, default=50,
+                        help='Number of generated files per language')
+    parser.add_argument('--repeat', type=int, default=4,
+                        help='Number of sample copies in each generated file')
+    parser.add_argument('--fields', nargs='+',
+                        help='Projected fields (default identifier span)')
+    parser.add_argument('-o', '--output_file', type=str,
+                        help='Save JSON result to this file')
+    opt = parser.parse_args(argv)
+    report(run(opt.sample_dir, opt.num_files, opt.repeat, opt.fields), opt.output_file)
+
+
+if __name__ == '__main__':
+    main()
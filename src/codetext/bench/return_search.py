@@ -0,0 +1,122 @@
+"""Return statement search on large generated functions
+
+Compare the full-subtree walk (`get_node_by_kind`) with the scope-bounded,
+early-exit search (`find_node_by_kind`) used by `get_function_metadata`.
+Generated functions contain many nested callbacks with their own returns, and
+the outer function has no return (its whole scope is searched), a leading
+return or a trailing return (the common case).
+"""
+import argparse
+from typing import Dict
+
+from ..utils import parse_code
+from ..codetext_cli import get_language_parser
+from ..parser.language_parser import get_node_by_kind, find_node_by_kind
+from .utils import Timer, rate, report
+
+
+# language: (function template, statement template, nested function template, return, return kind)
+TEMPLATES = {
+    'python': (
+        'def generated(value):\n{body}',
+        '    value = value + {i}\n',
+        '    def nested_{i}(x):\n        return x + {i}\n',
+        '    return value\n',
+        'return_statement',
+    ),
+    'javascript': (
+        'function generated(value) {{\n{body}}}\n',
+        '    value = value + {i};\n',
+        '    const nested_{i} = (x) => {{ return x + {i}; }};\n',
+        '    return value;\n',
+        'return_statement',
+    ),
+    'rust': (
+        'fn generated(mut value: i32) {{\n{body}}}\n',
+        '    value = value + {i};\n',
+        '    let nested_{i} = |x: i32| {{ return x + {i}; }};\n',
+        '    return;\n',
+        'return_expression',
+    ),
+}
+
+
+CASES = ['no_return', 'leading_return', 'trailing_return']
+
+
+def generate_function(language: str, num_statements: int, nested_every: int = 10,
+                      case: str = 'no_return') -> str:
+    """
+    Generate one function with `num_statements` statements, a nested function
+    every `nested_every` statements and a return depending on `case`
+    """
+    template, statement, nested, return_line, _ = TEMPLATES[language]
+    lines = []
+    for i in range(num_statements):
+        lines.append((nested if i % nested_every == 0 else statement).format(i=i))
+    if case == 'leading_return':
+        lines.insert(0, return_line)
+    elif case == 'trailing_return':
+        lines.append(return_line)
+    return template.format(body=''.join(lines))
+
+
+def bench_language(language: str, num_statements: int, repeat: int) -> Dict:
+    parser = get_language_parser(language)
+    return_kind = TEMPLATES[language][-1]
+    result = {}
+    for case in CASES:
+        code = generate_function(language, num_statements, case=case)
+        function = parser.get_function_list(parse_code(code, language).root_node)[0]
+
+        full, bounded, metadata = Timer(), Timer(), Timer()
+        for _ in range(repeat):
+            with full:
+                get_node_by_kind(function, [return_kind])
+            with bounded:
+                find_node_by_kind(function, [return_kind], parser.RETURN_SCOPE_TYPES)
+            with metadata:
+                parser.get_function_metadata(function)
+        result[case] = {
+            'return_type': parser.get_function_metadata(function)['return_type'],
+            'full_walk_ms': 1000 * full.elapsed / repeat,
+            'scoped_search_ms': 1000 * bounded.elapsed / repeat,
+            'get_function_metadata_ms': 1000 * metadata.elapsed / repeat,
+            'speedup': rate(full.elapsed, bounded.elapsed),
+        }
+    return result
+
+
+def run(num_statements: int = 2000, repeat: int = 20) -> Dict:
+    """
+    Args:
+        num_statements (int): statements in each generated function
+        repeat (int): searches per measurement
+    Return:
+        Dict: per language and case, milliseconds per search and speedup
+    """
+    return {
+        'benchmark': 'return_search',
+        'num_statements': num_statements,
+        'repeat': repeat,
+        'languages': {
+            language: bench_language(language, num_statements, repeat)
+            for language in TEMPLATES
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--num_statements', type=int, default=2000,
+                        help='Number of statements in each generated function')
+    parser.add_argument('--repeat', type=int, default=20,
+                        help='Number of searches per measurement')
+    parser.add_argument('-o', '--output_file', type=str,
+                        help='Save JSON result to this file')
+    opt = parser.parse_args(argv)
+    report(run(opt.num_statements, opt.repeat), opt.output_file)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""Makespan of `build_dataset` with stream and size-aware scheduling
+
+The corpus is skewed: many small files generated from the parser test
+samples, then a few large files (the samples repeated `large_repeat` times),
+listed last as in a walk that reaches a vendored bundle at the end. Every file
+is first processed serially to measure its cost, then the makespan of each
+schedule on `workers` workers is simulated by greedy list scheduling (every
+task goes to the first idle worker), which does not depend on the cores of the
+benchmark machine. Both schedules are also run for real with `build_dataset`,
+with the per-worker utilisation.
+"""
+import os
+import heapq
+import tempfile
+import argparse
+from typing import Dict, List
+
+from ..pipeline import build_dataset, iter_sources, schedule_by_size
+from ..pipeline.dataset import _Worker
+from .corpus import DEFAULT_SAMPLE_DIR, add_sample_dir_argument, load_samples, generate_corpus, write_corpus
+from .utils import Timer, report
+
+
+def simulate(costs: List[float], num_workers: int) -> Dict:
+    """
+    Greedy list scheduling of tasks in the given order
+
+    Args:
+        costs (List[float]): seconds of each task, in dispatch order
+        num_workers (int): number of workers
+    Return:
+        Dict: `makespan` and mean `utilisation` of the workers
+    """
+    idle = [0.0] * num_workers
+    for cost in costs:
+        heapq.heappush(idle, heapq.heappop(idle) + cost)
+    makespan = max(idle)
+    return {'makespan': makespan,
+            'utilisation': sum(costs) / (makespan * num_workers) if makespan else 0.0}
+
+
+def _run_schedule(paths: List[str], num_workers: int, schedule: str, batch_bytes: int) -> Dict:
+    with tempfile.TemporaryDirectory() as output_dir:
+        summary = build_dataset(paths, output_dir, num_workers=num_workers,
+                                schedule=schedule, batch_bytes=batch_bytes)
+    utilisation = [worker['utilisation'] for worker in summary['workers']]
+    return {
+        'seconds': summary['seconds'],
+        'tasks': sum(worker['tasks'] for worker in summary['workers']),
+        'min_utilisation': min(utilisation),
+        'mean_utilisation': sum(utilisation) / len(utilisation),
+    }
+
+
+def run(sample_dir: str = DEFAULT_SAMPLE_DIR, num_small: int = 50, num_large: int = 4,
+        large_repeat: int = 40, workers: int = 4, batch_bytes: int = 64 * 1024) -> Dict:
+    """
+    Args:
+        sample_dir (str): test sample directory
+        num_small (int): number of small files per language
+        num_large (int): number of large files
+        large_repeat (int): sample copies concatenated into each large file
+        workers (int): number of workers
+        batch_bytes (int): batch size of the `size` schedule
+    Return:
+        Dict: simulated makespan and utilisation per schedule, and the
+            seconds, number of tasks and utilisation of the real runs
+    """
+    samples = load_samples(sample_dir)
+    result = {'benchmark': 'schedule', 'num_small': num_small, 'num_large': num_large,
+              'large_repeat': large_repeat, 'workers': workers, 'batch_bytes': batch_bytes}
+    with tempfile.TemporaryDirectory() as input_dir:
+        small_dir = os.path.join(input_dir, 'small')
+        large_dir = os.path.join(input_dir, 'large')
+        write_corpus(generate_corpus(samples, num_files=num_small), small_dir)
+        large = {language: [] for language in samples}
+        languages = sorted(samples, key=lambda language: len(samples[language]), reverse=True)
+        for index in range(num_large):
+            language = languages[index % len(languages)]
+            large[language].append('\n'.join([samples[language]] * large_repeat))
+        write_corpus(large, large_dir)
+        paths = [small_dir, large_dir]
+
+        # cost of every file, measured serially
+        worker = _Worker(loosen_filter=False, filter_stats=False, profile=False)
+        costs = {}
+        for task in iter_sources(paths):
+            timer = Timer()
+            with timer:
+                list(worker.run(task))
+            costs[task[0]] = timer.elapsed
+
+        stream = [costs[task[0]] for task in iter_sources(paths)]
+        size = [
+            sum(costs[item[0]] for item in task) if isinstance(task, list) else costs[task[0]]
+            for task in schedule_by_size(iter_sources(paths), batch_bytes)
+        ]
+        result['files'] = len(stream)
+        result['simulated'] = {
+            'stream': dict(simulate(stream, workers), tasks=len(stream)),
+            'size': dict(simulate(size, workers), tasks=len(size)),
+            'lower_bound': max(sum(stream) / workers, max(stream)),
+        }
+        result['speedup'] = result['simulated']['stream']['makespan'] / result['simulated']['size']['makespan']
+        result['runs'] = {
+            schedule: _run_schedule(paths, workers, schedule, batch_bytes)
+            for schedule in ('stream', 'size')
+        }
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_sample_dir_argument(parser)
+    parser.add_argument('--num_small', type=int, default=50,
+                        help='Number of small files per language')
+    parser.add_argument('--num_large', type=int, default=4,
+                        help='Number of large files')
+    parser.add_argument('--large_repeat', type=int, default=40,
+                        help='Number of sample copies in each large file')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Number of workers')
+    parser.add_argument('--batch_bytes', type=int, default=64 * 1024,
+                        help='Batch size of the size schedule')
+    parser.add_argument('-o', '--output_file', type=str,
+                        help='Save JSON result to this file')
+    opt = parser.parse_args(argv)
+    report(run(opt.sample_dir, opt.num_small, opt.num_large, opt.large_repeat,
+               opt.workers, opt.batch_bytes), opt.output_file)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Benchmark utilities"""
+import sys
+import json
+import time
+from typing import Dict
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class Timer:
+    """
+    Accumulating wall-clock timer
+
+    .. code-block:: python
+
+        timer = Timer()
+        with timer:
+            parse_code(code, 'python')
+        print(timer.elapsed)
+    """
+    def __init__(self):
+        self.elapsed = 0.0
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed += time.perf_counter() - self._start
+        self._start = None
+
+
+def peak_rss_mb() -> float:
+    """
+    Peak resident set size of the current process in MB (None if unknown)
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':  # bytes on macOS, KB on Linux
+        return peak / (1 << 20)
+    return peak / (1 << 10)
+
+
+def rate(count: float, seconds: float) -> float:
+    """`count` per second, guarded against zero duration"""
+    return count / seconds if seconds > 0 else 0.0
+
+
+def report(result: Dict, output_file: str = None):
+    """Print a benchmark result as JSON and optionally save it to `output_file`"""
+    text = json.dumps(result, indent=4)
+    print(text)
+    if output_file:
+        with open(output_file, 'w') as f:
+            f.write(text)
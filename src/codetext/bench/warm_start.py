@@ -0,0 +1,99 @@
+"""Time to first result of `build_dataset` with cold and warm workers
+
+Every configuration runs in a fresh interpreter (the fork server is started
+once per process), on a small corpus generated from the parser test samples:
+    - spawn: workers start a new interpreter and import everything (cold)
+    - fork / forkserver, with and without `preload` (see
+      `codetext.pipeline.bootstrap`)
+The time to the first written result and the total time are reported for
+each number of workers.
+"""
+import os
+import sys
+import json
+import tempfile
+import argparse
+import subprocess
+from typing import Dict, List
+
+from .corpus import DEFAULT_SAMPLE_DIR, add_sample_dir_argument, load_samples, generate_corpus, write_corpus
+from .utils import report
+
+
+MODES = [
+    ('spawn', False),
+    ('fork', False),
+    ('fork', True),
+    ('forkserver', False),
+    ('forkserver', True),
+]
+
+CHILD_CODE = '''
+import json, sys, tempfile
+from {package}.pipeline import build_dataset
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as output_dir:
+        summary = build_dataset([{input_dir!r}], output_dir, num_workers={num_workers},
+                                start_method={start_method!r}, preload={preload})
+    print(json.dumps({{'first_result_seconds': summary['first_result_seconds'],
+                      'seconds': summary['seconds'], 'files': summary['counters']['files']}}))
+'''
+
+
+def run_child(input_dir: str, num_workers: int, start_method: str, preload: bool) -> Dict:
+    """Run `build_dataset` in a fresh interpreter and return its timings"""
+    package = __package__.rsplit('.', 1)[0]
+    code = CHILD_CODE.format(package=package, input_dir=input_dir, num_workers=num_workers,
+                             start_method=start_method, preload=preload)
+    with tempfile.NamedTemporaryFile('w', suffix='.py', delete=False) as f:
+        # `spawn` workers re-import the main script, it has to be a file
+        f.write(code)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(os.path.abspath(p) for p in sys.path))
+    try:
+        output = subprocess.run([sys.executable, f.name], env=env, check=True,
+                                stdout=subprocess.PIPE).stdout
+    finally:
+        os.remove(f.name)
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def run(sample_dir: str = DEFAULT_SAMPLE_DIR, num_files: int = 2,
+        workers: List[int] = None) -> Dict:
+    """
+    Args:
+        sample_dir (str): test sample directory
+        num_files (int): number of generated files per language
+        workers (List[int]): numbers of workers (default 1, 8 and 32)
+    Return:
+        Dict: per mode (`<start method>` or `<start method>+preload`) and
+            number of workers, time to first result and total seconds
+    """
+    workers = workers or [1, 8, 32]
+    result = {'benchmark': 'warm_start', 'num_files': num_files, 'workers': workers, 'modes': {}}
+    with tempfile.TemporaryDirectory() as input_dir:
+        corpus = generate_corpus(load_samples(sample_dir), num_files=num_files)
+        write_corpus(corpus, input_dir)
+        for start_method, preload in MODES:
+            name = start_method + ('+preload' if preload else '')
+            result['modes'][name] = {
+                str(num_workers): run_child(input_dir, num_workers, start_method, preload)
+                for num_workers in workers
+            }
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_sample_dir_argument(parser)
+    parser.add_argument('--num_files', type=int, default=2,
+                        help='Number of generated files per language')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 8, 32],
+                        help='Numbers of workers')
+    parser.add_argument('-o', '--output_file', type=str,
+                        help='Save JSON result to this file')
+    opt = parser.parse_args(argv)
+    report(run(opt.sample_dir, opt.num_files, opt.workers), opt.output_file)
+
+
+if __name__ == '__main__':
+    main()
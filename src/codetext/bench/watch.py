@@ -0,0 +1,89 @@
+"""Update latency of `codetext watch` with incremental and full reparsing
+
+A working tree of `num_files` generated Python files (see
+`codetext.bench.history`) is watched by a `WatchDaemon`; then `num_edits`
+times, a function of the largest file is edited, the file is written and the
+daemon polls the tree once. The processing time of each update (read,
+reparse, extract and publish) is reported, with the file either reparsed
+incrementally from its previous tree or re-parsed and re-extracted whole.
+"""
+import os
+import random
+import tempfile
+import argparse
+from typing import Dict, List
+
+from ..pipeline.watch import WatchDaemon
+from .history import render
+from .utils import report
+
+
+def _write(path: str, functions: List[Dict], mtime_ns: int):
+    with open(path, 'w') as f:
+        f.write(render(functions))
+    # distinct modification times, even on coarse grained file systems
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def run(num_files: int = 10, num_functions: int = 1000, num_edits: int = 50, seed: int = 0) -> Dict:
+    """
+    Args:
+        num_files (int): number of files in the watched tree
+        num_functions (int): number of functions of the edited (largest)
+            file, the other files have a tenth of them
+        num_edits (int): number of edits
+        seed (int): seed of the edits
+    Return:
+        Dict: per mode (`incremental`, `full`) median, 95th percentile and
+            maximum latency in ms, records and extracted units
+    """
+    result = {'benchmark': 'watch', 'num_files': num_files, 'num_functions': num_functions,
+              'num_edits': num_edits, 'modes': {}}
+    for name, incremental in (('incremental', True), ('full', False)):
+        rng = random.Random(seed)
+        with tempfile.TemporaryDirectory() as root:
+            files = {}
+            for index in range(num_files):
+                count = num_functions if index == 0 else max(1, num_functions // 10)
+                files[f'module_{index}.py'] = [
+                    {'name': f'func_{index}_{i}', 'value': rng.randint(1, 99), 'method': i % 3 == 0}
+                    for i in range(count)]
+            mtime_ns = 1600000000 * 10 ** 9
+            for path, functions in files.items():
+                _write(os.path.join(root, path), functions, mtime_ns)
+
+            daemon = WatchDaemon(root, incremental=incremental)
+            daemon.poll()
+            extracted = daemon.stats['extracted_units']
+            records = 0
+            for edit in range(num_edits):
+                rng.choice(files['module_0.py'])['value'] += 1
+                _write(os.path.join(root, 'module_0.py'), files['module_0.py'], mtime_ns + edit + 1)
+                records += len(daemon.poll())
+            summary = daemon.latency_summary()
+            result['modes'][name] = {
+                'updates': summary['updates'], 'p50_ms': summary['p50_ms'], 'p95_ms': summary['p95_ms'],
+                'max_ms': summary['max_ms'], 'records': records,
+                'extracted_units': daemon.stats['extracted_units'] - extracted,
+            }
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--num_files', type=int, default=10,
+                        help='Number of files in the watched tree')
+    parser.add_argument('--num_functions', type=int, default=1000,
+                        help='Number of functions of the edited file')
+    parser.add_argument('--num_edits', type=int, default=50,
+                        help='Number of edits')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Seed of the edits')
+    parser.add_argument('-o', '--output_file', type=str,
+                        help='Save JSON result to this file')
+    opt = parser.parse_args(argv)
+    report(run(opt.num_files, opt.num_functions, opt.num_edits, opt.seed), opt.output_file)
+
+
+if __name__ == '__main__':
+    main()
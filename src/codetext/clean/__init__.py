@@ -1,8 +1,11 @@
 """Clean utilities"""
 
 from .noise_removal import remove_comment_delimiters, remove_special_tag, remove_special_character
+from .filter_stats import FilterStats
+from .prefilter import classify_source
 
 
 __all__ = [
-    'remove_comment_delimiters', 'remove_special_tag', 'remove_special_character'
+    'remove_comment_delimiters', 'remove_special_tag', 'remove_special_character',
+    'FilterStats', 'classify_source'
 ]
\ No newline at end of file
@@ -0,0 +1,55 @@
+"""Per-rule statistics of the docstring/code filters"""
+from typing import Dict, Union
+
+
+class FilterStats:
+    """
+    Record, per filter rule, the number of calls, the number of rejections
+    and the cumulative time. Rules are applied in order and stop at the first
+    rejection, so later rules are called less often.
+
+    Stats are plain data: they can be pickled, sent back from worker processes
+    and merged.
+
+    .. code-block:: python
+
+        stats = FilterStats()
+        for docstring in docstrings:
+            clean_docstring(docstring, stats=stats)
+        print(stats.to_dict())
+    """
+    def __init__(self):
+        self.rules = {}  # rule -> [calls, rejections, seconds]
+
+    def record(self, rule: str, rejected: bool, seconds: float = 0.0):
+        record = self.rules.get(rule)
+        if record is None:
+            self.rules[rule] = [1, int(bool(rejected)), seconds]
+        else:
+            record[0] += 1
+            record[1] += bool(rejected)
+            record[2] += seconds
+
+    def merge(self, other: Union['FilterStats', Dict]) -> 'FilterStats':
+        """Merge another `FilterStats` (or its `to_dict()`) into this one"""
+        if isinstance(other, FilterStats):
+            other = other.to_dict()
+        for rule, item in other.items():
+            record = self.rules.setdefault(rule, [0, 0, 0.0])
+            record[0] += item['calls']
+            record[1] += item['rejections']
+            record[2] += item['seconds']
+        return self
+
+    def to_dict(self) -> Dict[str, Dict]:
+        return {
+            rule: {'calls': calls, 'rejections': rejections, 'seconds': seconds}
+            for rule, (calls, rejections, seconds) in self.rules.items()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'FilterStats':
+        return cls().merge(data)
+
+    def __len__(self):
+        return len(self.rules)
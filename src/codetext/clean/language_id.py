@@ -0,0 +1,273 @@
+"""Fast natural language identification for docstrings
+
+`langdetect` runs a randomised multi-trial estimation for every call (~ms per
+docstring), which is too slow to run over millions of docstrings. This module
+scores character n-grams against profiles that are precomputed once at import
+(from the profile files shipped with `langdetect`), short-circuits on ASCII
+and non-Latin scripts, caches the results and only falls back to `langdetect`
+for short, ambiguous strings. `is_english`, the docstring filter, only
+rejects Latin script text when it is long and confidently not English.
+"""
+import os
+import re
+import json
+import math
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+import langdetect
+from langdetect import DetectorFactory
+from langdetect.lang_detect_exception import LangDetectException
+
+
+UNKNOWN_LANGUAGE = 'unknown'
+
+# Latin script languages supported by `langdetect`. Other scripts are
+# resolved by `_detect_script` without n-gram scoring.
+PROFILE_LANGUAGES = [
+    'af', 'ca', 'cs', 'cy', 'da', 'de', 'en', 'es', 'et', 'fi', 'fr', 'hr',
+    'hu', 'id', 'it', 'lt', 'lv', 'nl', 'no', 'pl', 'pt', 'ro', 'sk', 'sl',
+    'so', 'sq', 'sv', 'sw', 'tl', 'tr', 'vi',
+]
+
+# Short function words, enough to accept most plain ASCII English docstrings
+# before doing any n-gram work
+ENGLISH_FUNCTION_WORDS = frozenset([
+    'a', 'an', 'the', 'of', 'to', 'in', 'on', 'for', 'from', 'with', 'by',
+    'is', 'are', 'be', 'was', 'if', 'or', 'and', 'not', 'this', 'that', 'it',
+    'its', 'as', 'at', 'into', 'should', 'will', 'can', 'which', 'when',
+    'returns', 'return', 'given', 'otherwise', 'whether', 'used', 'use',
+])
+
+# (first code point, last code point, language)
+SCRIPT_RANGES = [
+    (0x0370, 0x03FF, 'el'),     # Greek
+    (0x0400, 0x052F, 'ru'),     # Cyrillic
+    (0x0590, 0x05FF, 'he'),     # Hebrew
+    (0x0600, 0x06FF, 'ar'),     # Arabic
+    (0x0900, 0x097F, 'hi'),     # Devanagari
+    (0x0E00, 0x0E7F, 'th'),     # Thai
+    (0x1100, 0x11FF, 'ko'),     # Hangul Jamo
+    (0x3040, 0x30FF, 'ja'),     # Hiragana, Katakana
+    (0x3400, 0x9FFF, 'zh-cn'),  # CJK Unified Ideographs
+    (0xAC00, 0xD7AF, 'ko'),     # Hangul Syllables
+]
+
+MAX_NGRAM = 3
+# Average log-likelihood gap (per n-gram) between the best language and
+# English. Below `ENGLISH_MARGIN` the text is accepted as English (technical
+# English is full of rare n-grams), above `CONFIDENT_MARGIN` the best language
+# is trusted, in between short texts are sent to `langdetect`.
+ENGLISH_MARGIN = 0.13
+CONFIDENT_MARGIN = 0.2
+# A non-Latin script wins if it covers this ratio of the letters
+SCRIPT_RATIO = 0.2
+# Texts with fewer (Latin script) words than this are considered "short"
+SHORT_TEXT_WORDS = 8
+CACHE_SIZE = 1 << 16
+
+NON_LETTER_REGEX = re.compile(r'[^\w]+|[\d_]+')
+CAMEL_CASE_REGEX = re.compile(r'(?<=[a-z])(?=[A-Z])')
+
+
+def _load_profiles(languages: List[str]):
+    """
+    Load `langdetect` profiles into a sparse log probability table
+
+    Args:
+        languages (List[str]): language codes, must exist in `langdetect/profiles`
+
+    Return:
+        Tuple: loaded languages, per-language log probability floor for each
+            n-gram size, and a mapping `ngram -> [(language index, log
+            probability above the floor)]`
+    """
+    profile_dir = os.path.join(os.path.dirname(langdetect.__file__), 'profiles')
+    loaded, floors = [], []
+    table = {}
+    for language in languages:
+        path = os.path.join(profile_dir, language)
+        if not os.path.isfile(path):
+            continue
+        with open(path, 'r', encoding='utf-8') as profile_file:
+            profile = json.load(profile_file)
+
+        freq = {}
+        for ngram, count in profile['freq'].items():
+            ngram = ngram.lower()
+            if 0 < len(ngram) <= MAX_NGRAM:
+                freq[ngram] = freq.get(ngram, 0) + count
+
+        # Profiles are pruned, so an unseen n-gram is given half the count of
+        # the rarest n-gram of the same size
+        min_count = [math.inf] * MAX_NGRAM
+        for ngram, count in freq.items():
+            min_count[len(ngram) - 1] = min(min_count[len(ngram) - 1], count)
+        log_total = [math.log(total) for total in profile['n_words'][:MAX_NGRAM]]
+        floor = [math.log(0.5 * (count if count != math.inf else 1)) - log_total[i]
+                 for i, count in enumerate(min_count)]
+
+        index = len(loaded)
+        for ngram, count in freq.items():
+            n = len(ngram) - 1
+            table.setdefault(ngram, []).append(
+                (index, math.log(count) - log_total[n] - floor[n]))
+        loaded.append(language)
+        floors.append(floor)
+    return loaded, floors, table
+
+
+LANGUAGES, LOG_PROB_FLOOR, NGRAM_LOG_PROB = _load_profiles(PROFILE_LANGUAGES)
+ENGLISH_INDEX = LANGUAGES.index('en')
+
+
+def _normalize_words(text: str) -> List[str]:
+    """Split text (and embedded camelCase/snake_case identifiers) into lower-case words"""
+    text = CAMEL_CASE_REGEX.sub(' ', text)
+    return NON_LETTER_REGEX.sub(' ', text).lower().split()
+
+
+def _is_latin(char: str) -> bool:
+    """Basic Latin to IPA extensions, and Latin extended additional"""
+    code = ord(char)
+    return code < 0x0250 or 0x1E00 <= code <= 0x1EFF
+
+
+def _detect_script(text: str) -> str:
+    """
+    Return the language of the dominant non-Latin script, `None` if the text
+    is mostly written in Latin script
+    """
+    latin = 0
+    scripts = {}
+    for char in text:
+        if _is_latin(char):
+            if char.isalpha():
+                latin += 1
+            continue
+        code = ord(char)
+        for start, end, language in SCRIPT_RANGES:
+            if start <= code <= end:
+                scripts[language] = scripts.get(language, 0) + 1
+                break
+
+    if not scripts:
+        return None
+    language, count = max(scripts.items(), key=lambda item: item[1])
+    if count >= SCRIPT_RATIO * (count + latin):
+        return language
+    return None
+
+
+def _score(words: List[str]) -> Tuple[List[float], int]:
+    """Sum n-gram log probability for each profile language"""
+    scores = [0.0] * len(LANGUAGES)
+    ngram_count = [0] * MAX_NGRAM
+    for word in words:
+        padded = ' ' + word + ' '
+        for n in range(MAX_NGRAM):
+            for i in range(len(padded) - n):
+                entries = NGRAM_LOG_PROB.get(padded[i:i + n + 1])
+                if entries is None:
+                    continue
+                ngram_count[n] += 1
+                for index, value in entries:
+                    scores[index] += value
+
+    for index, floor in enumerate(LOG_PROB_FLOOR):
+        scores[index] += sum(count * value for count, value in zip(ngram_count, floor))
+    return scores, sum(ngram_count)
+
+
+def _rank(words: List[str]) -> Optional[Tuple[int, float]]:
+    """
+    Best profile language of the words
+
+    Return:
+        Tuple[int, float]: index of the best language (in `LANGUAGES`) and
+            its average log-likelihood gap per n-gram over English, None if
+            no n-gram is known
+    """
+    scores, num_ngrams = _score(words)
+    if num_ngrams == 0:
+        return None
+    best = max(range(len(scores)), key=scores.__getitem__)
+    return best, (scores[best] - scores[ENGLISH_INDEX]) / num_ngrams
+
+
+def _langdetect_fallback(text: str) -> str:
+    """Run `langdetect` with a fixed seed, so results are reproducible"""
+    DetectorFactory.seed = 0
+    try:
+        return langdetect.detect(text)
+    except LangDetectException:
+        return UNKNOWN_LANGUAGE
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def detect_language(text: str) -> str:
+    """
+    Detect natural language of a docstring
+
+    Args:
+        text (str): docstring (comment delimiters should already be removed)
+
+    Return:
+        str: language code as returned by `langdetect` (e.g. "en", "fr",
+            "zh-cn") or "unknown"
+    """
+    if not isinstance(text, str):
+        raise ValueError(f'Expect str, get {type(text)}')
+
+    if not text.isascii():
+        language = _detect_script(text)
+        if language is not None:
+            return language
+
+    words = _normalize_words(text)
+    if not words:
+        return UNKNOWN_LANGUAGE
+
+    if text.isascii():
+        hits = sum(1 for word in words if word in ENGLISH_FUNCTION_WORDS)
+        if hits >= 2 or (hits == 1 and len(words) <= 4):
+            return 'en'
+
+    ranked = _rank(words)
+    if ranked is None:
+        return UNKNOWN_LANGUAGE
+
+    best, margin = ranked
+    if best == ENGLISH_INDEX or margin < ENGLISH_MARGIN:
+        return 'en'
+    if margin < CONFIDENT_MARGIN and len(words) < SHORT_TEXT_WORDS:
+        return _langdetect_fallback(' '.join(words))
+    return LANGUAGES[best]
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def is_english(text: str) -> bool:
+    """
+    Check if a docstring is written in English
+
+    Text in a non-Latin script is not English. Latin script docstrings are
+    English unless they are long enough (at least `SHORT_TEXT_WORDS` Latin
+    words) and another language wins by `CONFIDENT_MARGIN`: short ones
+    ("Merge dicts", "Setter for “name”") have too few n-grams to be told
+    apart from Dutch or Norwegian.
+
+    Args:
+        text (str): docstring
+    Return:
+        bool
+    """
+    if not isinstance(text, str):
+        raise ValueError(f'Expect str, get {type(text)}')
+    if not text.isascii() and _detect_script(text) is not None:
+        return False
+    words = _normalize_words(text)
+    latin_words = sum(1 for word in words if any(char.isalpha() and _is_latin(char) for char in word))
+    if latin_words < SHORT_TEXT_WORDS:
+        return True
+    ranked = _rank(words)
+    return ranked is None or ranked[0] == ENGLISH_INDEX or ranked[1] < CONFIDENT_MARGIN
@@ -1,7 +1,9 @@
 import re
 import sys
+import time
 import warnings
 from collections import Counter
+from functools import lru_cache
 from itertools import permutations
 from typing import Any, Dict, List, Union
 
@@ -10,7 +12,11 @@ from bs4 import BeautifulSoup
 import Levenshtein as lev
 
 from tree_sitter import Node
-from ..parser.language_parser import tokenize_docstring, get_node_by_kind
+from ..parser.language_parser import tokenize_docstring
+from .language_id import is_english
+from .filter_stats import FilterStats
+from ..utils.profiler import profile_stage
+from ..utils.deadline import check_deadline
 warnings.filterwarnings("ignore", category=UserWarning, module='bs4')
 
 
@@ -62,11 +68,17 @@ def check_is_node_error(node: Node) -> bool:
     if not isinstance(node, Node):
         raise ValueError("Expect type tree_sitter.Node, get %i", type(node))
 
-    error_node = get_node_by_kind(node, ['ERROR'])
-    if len(error_node) > 0:
-        return True
-    else:
+    # `has_error` is also set by MISSING nodes, only follow the flagged
+    # subtrees to find an actual ERROR node
+    if not node.has_error:
         return False
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if current.type == 'ERROR':
+            return True
+        stack.extend(child for child in current.children if child.has_error)
+    return False
 
 
 def get_node_length(node: Node) -> int:
@@ -86,6 +98,7 @@ def get_node_length(node: Node) -> int:
     return int(line_end - line_start)
     
     
+@profile_stage('remove_comment_delimiters')
 def remove_comment_delimiters(docstring: str, remove_whitespace: bool=True) -> str:
     """
     Remove comment delimiters.
@@ -114,6 +127,7 @@ def remove_comment_delimiters(docstring: str, remove_whitespace: bool=True) -> s
     return '\n'.join(new_docstring)
 
 
+@profile_stage('remove_special_tag')
 def remove_special_tag(docstring: str) -> str:
     """
     Remove all special tag (html tag, e.g. <p>docstring</p>)
@@ -332,6 +346,7 @@ def remove_specific_pattern(docstring: str) -> str:
     return docstring
 
 
+@profile_stage('remove_unrelevant')
 def remove_unrelevant(docstring: str) -> str:
     flag = True
     while flag:
@@ -364,6 +379,31 @@ def remove_unrelevant(docstring: str) -> str:
 
 # =================== Check code ======================
 
+BLACK_KEYWORDS = ('test_', 'Test_', '_test', 'toString', 'constructor', 'Constructor')
+
+
+@lru_cache(maxsize=64)
+def _compile_black_list(exclude_list: tuple):
+    keywords = sorted(set(BLACK_KEYWORDS + exclude_list), key=len, reverse=True)
+    pattern = r'\A(?:__(?:.*__|_?)\Z|set|get)'
+    if keywords:
+        pattern += '|' + '|'.join(re.escape(keyword) for keyword in keywords)
+    return re.compile(pattern, flags=re.S)
+
+
+def get_black_list_filter(exclude_list: List = None):
+    """
+    Compile the black list (see `check_is_black_node`) into one alternation
+    regex, built once per exclude list. Use `.search(name)` to test a name
+
+    Args:
+        exclude_list (List): extra black keywords, e.g. `BLACKLISTED_FUNCTION_NAMES`
+    Return:
+        re.Pattern: matches any black listed name
+    """
+    return _compile_black_list(tuple(exclude_list or ()))
+
+
 def check_is_black_node(node_name: str, exclude_list: List = None):
     """
     Check if node belongs to black list. E.g:
@@ -371,19 +411,9 @@ def check_is_black_node(node_name: str, exclude_list: List = None):
         - Test function, test class
         - Constructor
     """
-    black_keywords = ['test_', 'Test_', '_test', 'toString', 'constructor', 'Constructor']
-    black_keywords.extend(exclude_list)
-    
     if not isinstance(node_name, str):
         raise ValueError(f'Expect str, get {type(node_name)}')
-    if node_name.startswith('__') and node_name.endswith('__'):
-        return True
-    if node_name.startswith('set') or node_name.startswith('get'):
-        return True
-    if any(keyword in node_name for keyword in black_keywords):
-        return True
-    
-    return False
+    return get_black_list_filter(exclude_list).search(node_name) is not None
 
 
 def check_is_empty_function(node):
@@ -420,27 +450,16 @@ def check_docstring_length(docstring: str):
     return False
 
 
+@profile_stage('check_docstring_literal')
 def check_docstring_literal(docstring: str):
     """
-    Check if docstring is EN
-    TODO: "Ce n'est pas en anglais" -> Fr
+    Check if docstring is not EN (e.g. "Ce n'est pas en anglais" -> Fr)
     """
     p = re.compile('[a-zA-Z0-9]')
-    if not docstring.isascii():
-        return True
     if not p.search(docstring):
         return True
-    # TODO: uncomment this
-    # try:
-    #     _docstring = re.sub(r'[^a-zA-Z0-9]', ' ', docstring)
-    #     _docstring = ' '.join(split_all_sepcial_case(_docstring))
-            
-    #     print(_docstring)
-    #     if detect(_docstring) != 'en':
-    #         print(detect_langs(_docstring))
-    #         return True
-    # except:
-    #     pass
+    if not is_english(docstring):
+        return True
     return False
 
 
@@ -731,6 +750,34 @@ def check_contain_url(docstring: str):
 
 # =================== End checking ======================
 
+def check_function_node(node: Node) -> bool:
+    """
+    Pre-filter a function node on native node flags only (no text is
+    decoded): reject functions containing an ERROR node or spanning 3 lines
+    or less. `check_function` also applies the name black list
+
+    Args:
+        node (tree_sitter.Node): function node
+    Return:
+        bool: pass the check or not
+    """
+    if check_is_empty_function(node):
+        return False
+    return not check_is_node_error(node)
+
+
+def filter_function_nodes(nodes: List[Node]) -> List[Node]:
+    """
+    Batch `check_function_node`
+
+    Args:
+        nodes (List[tree_sitter.Node]): function nodes
+    Return:
+        List[tree_sitter.Node]: nodes passing the check, in order
+    """
+    return [node for node in nodes if check_function_node(node)]
+
+
 def check_function(node, node_metadata: Dict[str, Any], exclude_list: List = None, is_class=False):
     """
     Check function if
@@ -749,39 +796,23 @@ def check_function(node, node_metadata: Dict[str, Any], exclude_list: List = Non
     node_identifier = node_metadata['identifier']
     
     # Check node/code
-    if check_is_node_error(node):
-        return False
     if check_is_black_node(node_identifier, exclude_list):
         return False
-    if check_is_empty_function(node):
-        return False
-    
-    return True
+    return check_function_node(node)
 
 
-def check_docstring(docstring: str, loosen_filter: bool = False):
+@profile_stage('check_docstring')
+def check_docstring(docstring: str, loosen_filter: bool = False, stats: FilterStats = None):
     """
     Check docstring is valid or not
+
+    Args:
+        docstring (str): docstring (line)
+        loosen_filter (bool): apply less rules
+        stats (FilterStats): optional, record per-rule calls, rejections and time
+    Return:
+        bool: True if the docstring fails any rule
     """
-    check_funcs_mapping = [
-        # 'check_docstring_literal',
-        'check_docstring_contain_question',
-        'check_docstring_underdevelopment',
-        'check_docstring_autogenerated',
-        'check_docstring_contain_specific_pattern',
-        'check_contain_little_alphabet_char',
-        'check_contain_many_special_char',
-        'check_contain_little_unique_chars',
-        'check_contain_little_unique_words',
-        # 'check_contain_many_special_case',
-        'check_contain_too_many_variables',
-        'check_contain_too_many_method_call',
-        # 'check_contain_many_repeated_word',
-        'check_contain_many_uppercase_word',
-        'check_contain_many_long_word',
-        'check_contain_url',
-    ]
-    
     check_docstring_funcs = [
         # check_docstring_literal,
         check_docstring_contain_question,
@@ -823,30 +854,51 @@ def check_docstring(docstring: str, loosen_filter: bool = False):
     # docstring_list = docstring.split('.')
     # print(f'\nAfter split {docstring_list}')
     
-    applied_res = []
-    result = False
-    for i, check_condition in zip(check_funcs_mapping, check_docstring_funcs):
-        # for comment in docstring_list:
-        if docstring == '' or not docstring:
-            return True #, []
-        # if True then docstring have fail
-        if check_condition(docstring):
+    if docstring == '' or not docstring:
+        if stats is not None:
+            stats.record('empty_docstring', True)
+        return True
+
+    if stats is None:
+        for check_condition in check_docstring_funcs:
+            # if True then docstring have fail
+            if check_condition(docstring):
+                return True
+        return False
+
+    for check_condition in check_docstring_funcs:
+        start = time.perf_counter()
+        not_pass = check_condition(docstring)
+        stats.record(check_condition.__name__, not_pass, time.perf_counter() - start)
+        if not_pass:
             return True
-            # return True
-            # applied_res.append(f"<{i}> {docstring}")
-    
-    return result #, applied_res
+    return False
 
 
-def clean_docstring(docstring: str, loosen_filter: bool = False):
+@profile_stage('clean_docstring')
+def clean_docstring(docstring: str, loosen_filter: bool = False, stats: FilterStats = None):
     """
     Clean docstring by removing special tag/url, characters, unrelevant information
+
+    Args:
+        docstring (str): raw docstring
+        loosen_filter (bool): apply less rules (see `check_docstring`)
+        stats (FilterStats): optional, record per-rule calls, rejections and time
+    Return:
+        str: cleaned docstring or None if rejected
     """
     cleaned_docstring = []
     if docstring == '' or docstring == None:
         return None
+    check_deadline('clean')
     _docstring = remove_comment_delimiters(docstring)
-    if check_docstring_literal(_docstring):  # True is not pass
+    if stats is None:
+        not_pass = check_docstring_literal(_docstring)
+    else:
+        start = time.perf_counter()
+        not_pass = check_docstring_literal(_docstring)
+        stats.record('check_docstring_literal', not_pass, time.perf_counter() - start)
+    if not_pass:  # True is not pass
         return None #, [f"<check_docstring_literal> {docstring}"]
 
     # _docstring = '\n'.join(remove_comment_delimiters(docstring))
@@ -864,7 +916,7 @@ def clean_docstring(docstring: str, loosen_filter: bool = False):
                 return None
             
             # not_pass, res = check_docstring(line, loosen_filter)
-            not_pass = check_docstring(line, loosen_filter)
+            not_pass = check_docstring(line, loosen_filter, stats)
             if not not_pass:
                 clean_line.append(line)
             else:
@@ -878,7 +930,13 @@ def clean_docstring(docstring: str, loosen_filter: bool = False):
     cleaned_docstring = '\n\n'.join(cleaned_docstring)
 
     
-    if check_docstring_length(cleaned_docstring):
+    if stats is None:
+        not_pass = check_docstring_length(cleaned_docstring)
+    else:
+        start = time.perf_counter()
+        not_pass = check_docstring_length(cleaned_docstring)
+        stats.record('check_docstring_length', not_pass, time.perf_counter() - start)
+    if not_pass:
         # if not res:
         #     return None #, [f"<check_docstring_length> {docstring}"]
         # else:
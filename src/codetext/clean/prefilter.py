@@ -0,0 +1,157 @@
+"""Pre-parse classification of source files
+
+Minified bundles, generated code (protobuf, thrift, `@generated` files),
+lockfiles and binary blobs named like sources yield no useful pairs but cost
+a full parse. `classify_source` looks at the file name and at most the first
+and last `SAMPLE_BYTES` of the content (generator markers only at the start of
+the comment lines of the file header, not in docstrings), and returns the
+reason to skip the file (one of `SKIP_REASONS`), before `parse_code` is
+called. It is off by default in `build_dataset`.
+"""
+import os
+import re
+import math
+from collections import Counter
+from typing import List, Optional
+
+
+# Bytes inspected at the start and at the end of the content
+SAMPLE_BYTES = 4096
+# Bytes of each end used for the character entropy (the most costly check)
+ENTROPY_BYTES = 1024
+
+# Average line length above which the file is considered minified
+MAX_AVERAGE_LINE_LENGTH = 200
+# Bits per byte above which the content is considered encoded data (base64 is
+# close to 6) or binary, source code is usually between 4 and 5
+MAX_ENTROPY = 5.6
+
+SKIP_REASONS = ('binary', 'lockfile', 'generated', 'minified', 'high_entropy')
+
+# Lockfiles named like sources (e.g. `yarn.lock.js`), not any `*lock.<ext>`
+LOCKFILE_NAME_REGEX = re.compile(
+    r'(?i)^(package-lock(\.json)?|npm-shrinkwrap(\.json)?|yarn\.lock|pnpm-lock(\.yaml)?'
+    r'|composer\.lock|gemfile\.lock|cargo\.lock|pipfile\.lock|poetry\.lock)\.[a-z]+$')
+GENERATED_NAME_REGEX = re.compile(
+    r'(?i)(\.pb\.(go|cc|c|h)|_pb2(_grpc)?\.py|_grpc\.pb\.go|\.pb\.gw\.go'
+    r'|\.g\.cs|\.designer\.cs|[._]generated\.[a-z]+)$')
+MINIFIED_NAME_REGEX = re.compile(r'(?i)[.-]min\.js$')
+# Header markers of generated files (protoc, thrift, Go `Code generated ... DO NOT EDIT.`,
+# `@generated`), matched at the start of the comment lines of the file header
+GENERATED_HEADER_REGEX = re.compile(
+    rb'(?i)^(code\s+generated\b.*\bdo\s+not\s+edit|generated\s+by\b.*\bdo\s+not\s+edit|do\s+not\s+edit\b'
+    rb'|@[a-z]*generated\b|(auto[-\s]?|automatically\s+)generated\s+(by|from|with|using)\b'
+    rb'|this\s+(file|code)\s+(is|was)\s+(@|auto[-\s]?|automatically\s+)?generated\b)')
+
+LINE_COMMENT_PREFIXES = (b'//', b'#', b'--', b';')
+# (start, end) of block comments
+BLOCK_COMMENTS = ((b'/*', b'*/'), (b'<!--', b'-->'), (b'=begin', b'=end'))
+# (start, end) of module docstrings, skipped: their prose is not a header
+DOCSTRINGS = ((b'"""', b'"""'), (b"'''", b"'''"))
+# Lines skipped before the leading comment
+PREAMBLES = (b'<?php', b'<?')
+# Stripped from the start of comment lines
+COMMENT_DECORATION = b' 	*/#!-;'
+
+
+# Removed before computing the entropy (see `classify_source`)
+NON_ASCII_BYTES = bytes(range(0x80, 0x100))
+
+
+def byte_entropy(data: bytes) -> float:
+    """Shannon entropy of the byte distribution, in bits per byte"""
+    if not data:
+        return 0.0
+    size = len(data)
+    return -sum(count / size * math.log2(count / size) for count in Counter(data).values())
+
+
+def leading_comment(head: bytes) -> List[bytes]:
+    """
+    Text of the comment lines at the top of a file (shebang, license,
+    generator header), up to the first line of code, without their comment
+    syntax. Module docstrings are skipped.
+    """
+    lines = []
+    block_end = None
+    in_docstring = False
+    for line in head.split(b'\n'):
+        stripped = line.strip()
+        if block_end is not None:
+            if block_end in stripped:
+                stripped = stripped[:stripped.index(block_end)]
+                block_end = None
+            if not in_docstring:
+                lines.append(stripped.lstrip(COMMENT_DECORATION))
+            continue
+        if not stripped or stripped in PREAMBLES:
+            continue
+        if stripped.startswith(LINE_COMMENT_PREFIXES):
+            lines.append(stripped.lstrip(COMMENT_DECORATION))
+            continue
+        for start, end in BLOCK_COMMENTS + DOCSTRINGS:
+            if stripped.startswith(start):
+                in_docstring = (start, end) in DOCSTRINGS
+                text = stripped[len(start):]
+                if end in text:
+                    text = text[:text.index(end)]
+                else:
+                    block_end = end
+                if not in_docstring:
+                    lines.append(text.lstrip(COMMENT_DECORATION))
+                break
+        else:
+            break
+    return lines
+
+
+def average_line_length(head: bytes, tail: bytes = b'') -> float:
+    """
+    Average length of the complete lines of the sampled ends (the line cut
+    by the end of `head` and by the start of `tail` are not counted, unless
+    the sample has no other line)
+    """
+    lines = head.split(b'\n')
+    if tail:
+        lines = lines[:-1] + tail.split(b'\n')[1:]
+    lines = lines or [head]
+    return sum(len(line) for line in lines) / len(lines)
+
+
+def classify_source(content: bytes, path: str = None) -> Optional[str]:
+    """
+    Classify a source file before parsing it
+
+    Args:
+        content (bytes): file content
+        path (str): file path, optional, its name is checked first
+    Return:
+        str: skip reason (see `SKIP_REASONS`) or None to parse the file
+    """
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    if path:
+        name = os.path.basename(path)
+        if LOCKFILE_NAME_REGEX.search(name):
+            return 'lockfile'
+        if GENERATED_NAME_REGEX.search(name):
+            return 'generated'
+        if MINIFIED_NAME_REGEX.search(name):
+            return 'minified'
+
+    if len(content) > 2 * SAMPLE_BYTES:
+        head, tail = content[:SAMPLE_BYTES], content[-SAMPLE_BYTES:]
+    else:
+        head, tail = content, b''
+    if b'\0' in head or b'\0' in tail:
+        return 'binary'
+    if any(GENERATED_HEADER_REGEX.match(line) for line in leading_comment(head)):
+        return 'generated'
+    if average_line_length(head, tail) > MAX_AVERAGE_LINE_LENGTH:
+        return 'minified'
+    # over the ASCII bytes: encoded data is ASCII, while the multi-byte UTF-8
+    # of non-English comments (e.g. CJK) would look random
+    sample = (head[:ENTROPY_BYTES] + tail[-ENTROPY_BYTES:]).translate(None, NON_ASCII_BYTES)
+    if byte_entropy(sample) > MAX_ENTROPY:
+        return 'high_entropy'
+    return None
@@ -1,25 +1,23 @@
 import os
-from typing import List, Dict
+from typing import List, Dict, Iterator, Set
 
 from tabulate import tabulate
 
 from .parser import *
 from .utils import parse_code
+from .utils.profiler import PROFILER
 
 
-def parse_file(file_path: str, language: str = None, verbose: bool = False) -> List:
-    assert language != None, "Auto detect is not implemented, please specify language"
-    language = str(language).lower()
-    # assert (language in SUPPORT_LANGUAGE) == True, f"{language} is not supported"
-    assert os.path.isfile(file_path) == True, "File not found"
-
-    if verbose:
-        print(50 * "=")
-        print("Parse code into tree-sitter node")
-
-    content: str = open(file_path, "r").read()
-    root_node = parse_code(raw_code=content, language=language).root_node
+def get_language_parser(language: str) -> LanguageParser:
+    """
+    Get `LanguageParser` class of a language
 
+    Args:
+        language (str): language name (e.g. python, java, c++, c#)
+    Return:
+        LanguageParser
+    """
+    language = str(language).lower()
     if language == "python":
         parser: LanguageParser = PythonParser
     elif language == "java":
@@ -28,9 +26,9 @@ def parse_file(file_path: str, language: str = None, verbose: bool = False) -> L
         parser: LanguageParser = JavascriptParser
     elif language == "go":
         parser: LanguageParser = GoParser
-    elif language in ["c", "c++"]:
+    elif language in ["c", "c++", "cpp"]:
         parser: LanguageParser = CppParser
-    elif language == "c#":
+    elif language in ["c#", "c_sharp"]:
         parser: LanguageParser = CsharpParser
     elif language == "rust":
         parser: LanguageParser = RustParser
@@ -40,43 +38,249 @@ def parse_file(file_path: str, language: str = None, verbose: bool = False) -> L
         parser: LanguageParser = PhpParser
     else:
         raise KeyError(f"{language} is not supported")
+    return parser
+
+
+def get_file_language(file_path: str) -> str:
+    """
+    Get language of a file from its extension (see `PL_MATCHING`)
+
+    Args:
+        file_path (str): path to the file
+    Return:
+        str: language name (key of `PL_MATCHING`) or None if not supported
+    """
+    _, file_extension = os.path.splitext(file_path)
+    return PL_EXTENSIONS.get(file_extension)
+
+
+def parse_file(file_path: str, language: str = None, verbose: bool = False,
+               fields: Set[str] = None, code_spans: bool = False) -> List:
+    """
+    Extract classes, methods and functions of a file
+
+    Args:
+        file_path (str): path to the file
+        language (str): language name
+        verbose (bool): print progress
+        fields (Set[str]): only compute these metadata fields (see
+            `codetext.parser.language_parser.METADATA_FIELDS`, e.g.
+            `{"identifier", "span"}`), default all fields, plus the `code` of
+            classes and methods
+        code_spans (bool): store `code_span` (`[start_byte, end_byte]` into
+            the `source` of the file, stored once) instead of `code`, so the
+            code of methods is not stored twice (no `source` without class),
+            see `materialize_code`
+    Return:
+        Dict: `class` (with their `method`) and `function` metadata
+    """
+    assert language != None, "Auto detect is not implemented, please specify language"
+    # assert (language in SUPPORT_LANGUAGE) == True, f"{language} is not supported"
+    assert os.path.isfile(file_path) == True, "File not found"
+
+    with PROFILER.use_language(str(language).lower()), PROFILER.stage("read"):
+        content: str = open(file_path, "r").read()
+    return parse_source(content, language, verbose, fields, code_spans)
+
+
+def parse_source(content, language: str, verbose: bool = False,
+                 fields: Set[str] = None, code_spans: bool = False) -> Dict:
+    """
+    Same as `parse_file` for a source already read (e.g. an archive member)
+
+    Args:
+        content (str or bytes): source code
+        language (str): language name
+    Return:
+        Dict: `class` (with their `method`) and `function` metadata
+    """
+    assert language != None, "Auto detect is not implemented, please specify language"
+    language = str(language).lower()
 
     if verbose:
         print(50 * "=")
-        print("Get node detail")
+        print("Parse code into tree-sitter node")
+
+    with PROFILER.use_language(language), PROFILER.stage("parse_file"):
+        with PROFILER.stage("parse_code"):
+            source = SourceText(content)
+            root_node = parse_code(raw_code=source.source, language=language).root_node
+        parser: LanguageParser = get_language_parser(language)
+
+        if verbose:
+            print(50 * "=")
+            print("Get node detail")
+
+        output_metadata = _get_file_metadata(parser, root_node, fields, source, code_spans)
+        if PROFILER.enabled:
+            PROFILER.count("files")
+            PROFILER.count("bytes", len(source))
+            PROFILER.count("classes", len(output_metadata["class"]))
+            PROFILER.count("methods", sum(len(c["method"]) for c in output_metadata["class"]))
+            PROFILER.count("functions", len(output_metadata["function"]))
 
+    return output_metadata
+
+
+def iter_file_records(file_path: str, language: str = None,
+                      fields: Set[str] = None) -> Iterator[Dict]:
+    """
+    Lazily extract a file, one metadata record at a time: each class
+    (`"type": "class"`) is followed by its methods (`"type": "method"`, with
+    the `"class"` identifier), then come the stand-alone functions
+    (`"type": "function"`). The content is the same as `parse_file`, but
+    nothing is listed up front, so the first record comes right after parsing.
+
+    Args:
+        file_path (str): path to the file
+        language (str): language name, guessed from the extension if not given
+        fields (Set[str]): only compute these metadata fields, see `parse_file`
+    Yield:
+        Dict: metadata record (with its `code` if `fields` is not given)
+    """
+    if language is None:
+        language = get_file_language(file_path)
+    assert language is not None, f"Unable to guess the language of {file_path}"
+    parser: LanguageParser = get_language_parser(language)
+    with open(file_path, "rb") as f:
+        source = SourceText(f.read())
+    root_node = parse_code(raw_code=source.source, language=language).root_node
+
+    for _cls in parser.iter_classes(root_node):
+        cls_info = parser.get_class_metadata(_cls, fields=fields)
+        cls_info["type"] = "class"
+        if fields is None:
+            cls_info["code"] = source.get_node_text(_cls)
+        yield cls_info
+        for method in parser.iter_functions(_cls):
+            method_info = parser.get_function_metadata(method, fields=fields)
+            method_info["type"] = "method"
+            method_info["class"] = cls_info.get("identifier")
+            if fields is None:
+                method_info["code"] = source.get_node_text(method)
+            yield method_info
+
+    class_types = parser.CLASS_TYPES
+    for fn in parser.iter_functions(root_node):
+        # methods were yielded with their class
+        parent = fn.parent
+        while parent is not None and parent.type not in class_types:
+            parent = parent.parent
+        if parent is not None:
+            continue
+        fn_info = parser.get_function_metadata(fn, fields=fields)
+        fn_info["type"] = "function"
+        if fields is None:
+            fn_info["code"] = source.get_node_text(fn)
+        yield fn_info
+
+
+# Fields read from the headers only, without scanning function bodies
+HEADER_FIELDS = frozenset(["identifier", "parameters", "span"])
+
+
+def iter_file_headers(file_path: str, language: str = None, max_depth: int = 0,
+                      fields: Set[str] = HEADER_FIELDS) -> Iterator[Dict]:
+    """
+    Signature only extraction for symbol indexing: yield a record for each
+    class, method and function header, without walking function bodies (see
+    `LanguageParser.iter_headers`)
+
+    Args:
+        file_path (str): path to the file
+        language (str): language name, guessed from the extension if not given
+        max_depth (int): also find functions nested up to this depth in
+            function bodies
+        fields (Set[str]): metadata fields, `return_type` and `code` read the
+            function bodies
+    Yield:
+        Dict: metadata record with its `type` and `depth`
+    """
+    if language is None:
+        language = get_file_language(file_path)
+    assert language is not None, f"Unable to guess the language of {file_path}"
+    parser: LanguageParser = get_language_parser(language)
+    with open(file_path, "rb") as f:
+        root_node = parse_code(raw_code=f.read(), language=language).root_node
+
+    for kind, node, depth in parser.iter_headers(root_node, max_depth):
+        if kind == "class":
+            info = parser.get_class_metadata(node, fields=fields)
+        else:
+            info = parser.get_function_metadata(node, fields=fields)
+        info["type"] = kind
+        info["depth"] = depth
+        yield info
+
+
+def _get_file_metadata(parser: LanguageParser, root_node, fields: Set[str] = None,
+                       source: SourceText = None, code_spans: bool = False) -> Dict:
+    if code_spans:
+        assert source is not None, "`code_spans` needs the `source` of the file"
+        code_key = "code_span"
+        get_text = _get_code_span
+    else:
+        code_key = "code"
+        get_text = source.get_node_text if source is not None else get_node_text
     cls_list = parser.get_class_list(root_node)
     method_list = []
     cls_metadata = []
     for _cls in cls_list:
-        cls_info = parser.get_class_metadata(_cls)
-        cls_info["code"] = get_node_text(_cls)
+        cls_info = parser.get_class_metadata(_cls, fields=fields)
+        if fields is None:
+            cls_info[code_key] = get_text(_cls)
 
         cls_method = []
         current_class_methods = parser.get_function_list(_cls)
         for method in current_class_methods:
-            method_info = parser.get_function_metadata(method)
-            method_info['code'] = get_node_text(method)
+            method_info = parser.get_function_metadata(method, fields=fields)
+            if fields is None:
+                method_info[code_key] = get_text(method)
             cls_method.append(method_info)
 
         cls_info["method"] = cls_method
         cls_metadata.append(cls_info)
         method_list.extend(current_class_methods)
 
-    fn_list: List = parser.get_function_list(root_node)
-    for node in fn_list[:]:
-        if node in method_list:
-            fn_list.remove(node)
+    method_set = set(method_list)
+    fn_list: List = [node for node in parser.get_function_list(root_node)
+                     if node not in method_set]
 
     fn_metadata = []
     for fn in fn_list:
-        fn_metadata.append(parser.get_function_metadata(fn))
+        fn_metadata.append(parser.get_function_metadata(fn, fields=fields))
 
     output_metadata = {"class": cls_metadata, "function": fn_metadata}
+    if code_spans and fields is None and cls_metadata:
+        output_metadata["source"] = source.span(0, len(source))
 
     return output_metadata
 
 
+def _get_code_span(node) -> List[int]:
+    return [node.start_byte, node.end_byte]
+
+
+def materialize_code(output: Dict) -> Dict:
+    """
+    Replace the `code_span` of the records of a `parse_file(...,
+    code_spans=True)` output by their `code`, in place
+
+    Args:
+        output (Dict): `parse_file` output of one file, with its `source`
+    Return:
+        Dict: `output` without `source`, same as `parse_file(...)`
+    """
+    if "source" not in output:
+        return output
+    source = SourceText(output.pop("source"))
+    for record in output["class"]:
+        for item in [record] + record["method"]:
+            if "code_span" in item:
+                item["code"] = source.span(*item.pop("code_span"))
+    return output
+
+
 def print_result(res: Dict, file_name: str = "no_name_file"):
     # ======== Print file name ========
     print("File {name} analyzed:".format(name=file_name))
@@ -168,6 +372,58 @@ def print_result(res: Dict, file_name: str = "no_name_file"):
         print("\n")
 
 
+def print_profile(summary: Dict):
+    """
+    Print a stage profile summary (see `codetext.utils.profiler.StageProfiler.summary`)
+    """
+    print("Stage profile (stages may be nested, times are inclusive):")
+    print(50 * "=")
+    headers = ["Language", "Stage", "Calls", "Total (s)", "Mean (ms)"]
+    rows = []
+    for language, item in summary.items():
+        stages = sorted(item["stages"].items(), key=lambda x: x[1]["seconds"], reverse=True)
+        for idx, (stage, record) in enumerate(stages):
+            rows.append([
+                language if idx < 1 else "",
+                stage,
+                record["calls"],
+                "{:.4f}".format(record["seconds"]),
+                "{:.4f}".format(1000 * record["seconds"] / max(record["calls"], 1)),
+            ])
+    print(tabulate(rows, headers=headers, tablefmt="outline"))
+
+    counter_rows = []
+    for language, item in summary.items():
+        for idx, (name, value) in enumerate(sorted(item["counters"].items())):
+            counter_rows.append([language if idx < 1 else "", name, value])
+    if counter_rows:
+        print(tabulate(counter_rows, headers=["Language", "Counter", "Value"], tablefmt="outline"))
+    print("\n")
+
+
+def print_filter_stats(stats: Dict):
+    """
+    Print per-rule filter statistics (see `codetext.clean.filter_stats.FilterStats`)
+    """
+    if not isinstance(stats, dict):
+        stats = stats.to_dict()
+    print("Filter rules:")
+    print(50 * "=")
+    headers = ["Rule", "Calls", "Rejections", "Reject (%)", "Total (s)", "Mean (us)"]
+    rows = []
+    for rule, record in sorted(stats.items(), key=lambda x: x[1]["rejections"], reverse=True):
+        rows.append([
+            rule,
+            record["calls"],
+            record["rejections"],
+            "{:.2f}".format(100 * record["rejections"] / max(record["calls"], 1)),
+            "{:.4f}".format(record["seconds"]),
+            "{:.2f}".format(1e6 * record["seconds"] / max(record["calls"], 1)),
+        ])
+    print(tabulate(rows, headers=headers, tablefmt="outline"))
+    print("\n")
+
+
 PL_MATCHING = {
     "Java": [".java"],
     "JavaScript": [
@@ -243,3 +499,10 @@ PL_MATCHING = {
         ".H",
     ],
 }
+
+# extension -> language index of `PL_MATCHING` (the first language listing an
+# extension wins)
+PL_EXTENSIONS = {}
+for _language, _extensions in PL_MATCHING.items():
+    for _extension in _extensions:
+        PL_EXTENSIONS.setdefault(_extension, _language)
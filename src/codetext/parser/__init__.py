@@ -10,8 +10,8 @@ from .python_parser import PythonParser
 from .cpp_parser import CppParser
 from .c_sharp_parser import CsharpParser
 from .rust_parser import RustParser
-from .language_parser import LanguageParser, get_node_by_kind, get_node_text, \
-    tokenize_code, tokenize_docstring, nodes_are_equal
+from .language_parser import LanguageParser, get_node_by_kind, find_node_by_kind, \
+    get_node_text, tokenize_code, tokenize_docstring, nodes_are_equal, METADATA_FIELDS, SourceText
     
 SUPPORT_LANGUAGE = [
     "go", "php", "ruby", "java", "javascript", 
@@ -21,6 +21,6 @@ SUPPORT_LANGUAGE = [
 __all__ = [
     'GoParser', 'PhpParser', 'RubyParser', 'JavaParser', 'JavascriptParser',
     'PythonParser', 'CppParser', 'CsharpParser', 'RustParser', 'LanguageParser',
-    'get_node_by_kind', 'get_node_text', 'tokenize_code', 'tokenize_docstring',
-    'nodes_are_equal'
+    'get_node_by_kind', 'find_node_by_kind', 'get_node_text', 'tokenize_code',
+    'tokenize_docstring', 'nodes_are_equal', 'METADATA_FIELDS', 'SourceText'
 ]
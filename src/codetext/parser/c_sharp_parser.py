@@ -2,14 +2,21 @@ from typing import List, Dict, Any
 import tree_sitter
 import logging
 
-from .language_parser import LanguageParser, get_node_by_kind, get_node_text
+from .language_parser import LanguageParser, get_node_by_kind, get_node_text, \
+    wants_field, project_metadata
 
 logger = logging.getLogger(name=__name__)
 
 
 class CsharpParser(LanguageParser):
     
+    LANGUAGE = 'c#'
+
     BLACKLISTED_FUNCTION_NAMES = []
+
+    FUNCTION_TYPES = ['local_function_statement', 'method_declaration']  # We don't use "constructor_declaration"
+    CLASS_TYPES = ['class_declaration']
+    COMMENT_TYPES = ['comment']
     
     @staticmethod
     def get_docstring(node, blob=None):
@@ -90,22 +97,21 @@ class CsharpParser(LanguageParser):
         Return:
             List: list of comment nodes
         """
-        comment_node = get_node_by_kind(node, kind=['comment'])
+        comment_node = list(CsharpParser.iter_comments(node))
         return comment_node
     
     @staticmethod
     def get_function_list(node):
-        res = get_node_by_kind(node, ['local_function_statement', 'method_declaration'])
-        # We don't use "constructor_declaration"
+        res = list(CsharpParser.iter_functions(node))
         return res
 
     @staticmethod
     def get_class_list(node):
-        res = get_node_by_kind(node, ['class_declaration'])
+        res = list(CsharpParser.iter_classes(node))
         return res
 
     @staticmethod
-    def get_function_metadata(function_node, blob: str = None) -> Dict[str, Any]:
+    def get_function_metadata(function_node, blob: str = None, fields=None) -> Dict[str, Any]:
         """
         Function metadata contains:
             - identifier (str): function name
@@ -127,7 +133,7 @@ class CsharpParser(LanguageParser):
                     metadata['return_type'] = get_node_text(child)
                 else:
                     metadata['identifier'] = get_node_text(child)
-            elif child.type == 'parameter_list':
+            elif child.type == 'parameter_list' and wants_field(fields, 'parameters'):
                 for param_node in child.children:
                     param_nodes = get_node_by_kind(param_node, ['parameter'])
                     for param in param_nodes:
@@ -149,10 +155,10 @@ class CsharpParser(LanguageParser):
                                 
                         # param_type = get_node_text(param.child_by_field_name('type'))
                         # param_identifier = get_node_text(param.child_by_field_name('name'))
-        return metadata
+        return project_metadata(metadata, function_node, fields)
 
     @staticmethod
-    def get_class_metadata(class_node, blob: str=None) -> Dict[str, str]:
+    def get_class_metadata(class_node, blob: str=None, fields=None) -> Dict[str, str]:
         """
         Class metadata contains:
             - identifier (str): class's name
@@ -169,12 +175,12 @@ class CsharpParser(LanguageParser):
         for child in class_node.children:
             if child.type == 'identifier':
                 metadata['identifier'] = get_node_text(child)
-            elif child.type == 'base_list':
+            elif child.type == 'base_list' and wants_field(fields, 'parameters'):
                 for arg in child.children:
                     if arg.type == 'identifier':
                         metadata['parameters'][get_node_text(arg)] = None
                         # argument_list.append(get_node_text(arg))
                 # metadata['parameters'] = argument_list
 
-        return metadata
+        return project_metadata(metadata, class_node, fields)
     
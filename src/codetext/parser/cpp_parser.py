@@ -3,14 +3,21 @@ from typing import List, Dict, Any
 import tree_sitter
 import logging
 
-from .language_parser import LanguageParser, get_node_text, get_node_by_kind
+from .language_parser import LanguageParser, get_node_text, get_node_by_kind, \
+    wants_field, project_metadata
 
 logger = logging.getLogger(name=__name__)
 
 
 class CppParser(LanguageParser):
     
+    LANGUAGE = 'c++'
+
     BLACKLISTED_FUNCTION_NAMES = ['main', 'constructor']
+
+    FUNCTION_TYPES = ['function_definition']
+    CLASS_TYPES = ['class_specifier']
+    COMMENT_TYPES = ['comment']
     
     @staticmethod
     def get_docstring(node, blob=None):
@@ -79,12 +86,12 @@ class CppParser(LanguageParser):
     
     @staticmethod
     def get_function_list(node):
-        res = get_node_by_kind(node, ['function_definition'])
+        res = list(CppParser.iter_functions(node))
         return res
 
     @staticmethod
     def get_class_list(node):
-        res = get_node_by_kind(node, ['class_specifier'])
+        res = list(CppParser.iter_classes(node))
         return res
         
     @staticmethod
@@ -96,11 +103,11 @@ class CppParser(LanguageParser):
         Return:
             List: list of comment nodes
         """
-        comment_node = get_node_by_kind(node, kind=['comment'])
+        comment_node = list(CppParser.iter_comments(node))
         return comment_node
     
     @staticmethod
-    def get_function_metadata(function_node, blob: str=None) -> Dict[str, Any]:
+    def get_function_metadata(function_node, blob: str=None, fields=None) -> Dict[str, Any]:
         """
         Function metadata contains:
             - identifier (str): function name
@@ -128,7 +135,7 @@ class CppParser(LanguageParser):
                 for subchild in child.children:
                     if subchild.type in ['qualified_identifier', 'identifier', 'field_identifier']:
                         metadata['identifier'] = get_node_text(subchild)
-                    elif subchild.type == 'parameter_list':
+                    elif subchild.type == 'parameter_list' and wants_field(fields, 'parameters'):
                         param_nodes = get_node_by_kind(subchild, ['parameter_declaration'])
                         for param in param_nodes:
                             param_type = param.child_by_field_name('type')
@@ -145,10 +152,10 @@ class CppParser(LanguageParser):
                             #     elif item.type == 'identifier':
                             #         param_identifier = get_node_text(item)
 
-        return metadata
+        return project_metadata(metadata, function_node, fields)
 
     @staticmethod
-    def get_class_metadata(class_node, blob: str=None) -> Dict[str, str]:
+    def get_class_metadata(class_node, blob: str=None, fields=None) -> Dict[str, str]:
         """
         Class metadata contains:
             - identifier (str): class's name
@@ -165,7 +172,7 @@ class CppParser(LanguageParser):
         for child in class_node.children:
             if child.type == 'type_identifier':
                 metadata['identifier'] = get_node_text(child)
-            elif child.type == 'base_class_clause':
+            elif child.type == 'base_class_clause' and wants_field(fields, 'parameters'):
                 argument_list = []
                 for param in child.children:
                     if param.type == 'type_identifier':
@@ -173,4 +180,4 @@ class CppParser(LanguageParser):
                         # argument_list.append(get_node_text(param))
                 # metadata['parameters'] = argument_list
 
-        return metadata
+        return project_metadata(metadata, class_node, fields)
@@ -1,7 +1,8 @@
 from typing import List, Dict, Any
 import logging
 
-from .language_parser import LanguageParser, get_node_by_kind, get_node_text
+from .language_parser import LanguageParser, get_node_by_kind, get_node_text, \
+    wants_field, project_metadata
 
 
 logger = logging.getLogger(__name__)
@@ -9,7 +10,12 @@ logger = logging.getLogger(__name__)
 
 class GoParser(LanguageParser):
 
+    LANGUAGE = 'go'
+
     BLACKLISTED_FUNCTION_NAMES = ['test', 'vendor']
+
+    FUNCTION_TYPES = ['method_declaration', 'function_declaration']
+    COMMENT_TYPES = ['comment']
     
     @staticmethod
     def get_comment_node(function_node):
@@ -20,7 +26,7 @@ class GoParser(LanguageParser):
         Return:
             List: list of comment nodes
         """
-        comment_node = get_node_by_kind(function_node, kind='comment')
+        comment_node = list(GoParser.iter_comments(function_node))
         return comment_node
     
     @staticmethod
@@ -89,11 +95,11 @@ class GoParser(LanguageParser):
     
     @staticmethod
     def get_function_list(node):
-        res = get_node_by_kind(node, ['method_declaration', 'function_declaration'])
+        res = list(GoParser.iter_functions(node))
         return res
     
     @staticmethod
-    def get_function_metadata(function_node, blob: str=None) -> Dict[str, str]:
+    def get_function_metadata(function_node, blob: str=None, fields=None) -> Dict[str, str]:
         if blob:
             logger.info('From version `0.0.6` this function will update argument in the API')
         metadata = {
@@ -107,7 +113,7 @@ class GoParser(LanguageParser):
                 metadata['identifier'] = get_node_text(child)
             elif child.type == 'type_identifier':
                 metadata['return_type'] = get_node_text(child)
-            elif child.type == 'parameter_list':
+            elif child.type == 'parameter_list' and wants_field(fields, 'parameters'):
                 for subchild in child.children:
                     if subchild.type in ['parameter_declaration', 'variadic_parameter_declaration']:
                         identifier_node = subchild.child_by_field_name('name')
@@ -120,14 +126,15 @@ class GoParser(LanguageParser):
                         if identifier and param_type:
                             metadata['parameters'][identifier] = param_type
         
-        return metadata
+        return project_metadata(metadata, function_node, fields)
 
     @staticmethod
     def get_class_list(node):
-        pass
+        # Go does not have class
+        return []
     
     @staticmethod
-    def get_class_metadata(class_node, blob=None) -> Dict[str, str]:
+    def get_class_metadata(class_node, blob=None, fields=None) -> Dict[str, str]:
         if blob:
             logger.info('From version `0.0.6` this function will update argument in the API')
         pass
@@ -2,7 +2,8 @@ import re
 from typing import List, Dict, Any
 import logging
 
-from .language_parser import LanguageParser, get_node_by_kind, get_node_text
+from .language_parser import LanguageParser, get_node_by_kind, get_node_text, \
+    wants_field, project_metadata
 
 
 logger = logging.getLogger(__name__)
@@ -10,10 +11,16 @@ logger = logging.getLogger(__name__)
 
 class JavaParser(LanguageParser):
 
+    LANGUAGE = 'java'
+
     FILTER_PATHS = ('test', 'tests')
 
     BLACKLISTED_FUNCTION_NAMES = ['toString', 'hashCode', 'equals', 'finalize', 'notify', 'notifyAll', 'clone']
 
+    FUNCTION_TYPES = ['method_declaration']
+    CLASS_TYPES = ['class_declaration']
+    COMMENT_TYPES = ['line_comment']
+
     @staticmethod
     def get_docstring_node(node):
         """
@@ -62,17 +69,17 @@ class JavaParser(LanguageParser):
         Return:
             List: list of comment nodes
         """
-        comment_node = get_node_by_kind(function_node, kind=['line_comment'])
+        comment_node = list(JavaParser.iter_comments(function_node))
         return comment_node
     
     @staticmethod
     def get_class_list(node):
-        res = get_node_by_kind(node, ['class_declaration'])
+        res = list(JavaParser.iter_classes(node))
         return res
     
     @staticmethod
     def get_function_list(node):
-        res = get_node_by_kind(node, ['method_declaration'])
+        res = list(JavaParser.iter_functions(node))
         return res
     
     @staticmethod
@@ -83,7 +90,7 @@ class JavaParser(LanguageParser):
                     return True
     
     @staticmethod
-    def get_class_metadata(class_node, blob: str=None) -> Dict[str, str]:
+    def get_class_metadata(class_node, blob: str=None, fields=None) -> Dict[str, str]:
         if blob:
             logger.info('From version `0.0.6` this function will update argument in the API')
         metadata = {
@@ -94,17 +101,17 @@ class JavaParser(LanguageParser):
         for child in class_node.children:
             if child.type == 'identifier':
                 metadata['identifier'] = get_node_text(child)
-            elif child.type == 'superclass' or child.type == 'super_interfaces':
+            elif child.type in ['superclass', 'super_interfaces'] and wants_field(fields, 'parameters'):
                 for subchild in child.children:
                     if subchild.type == 'type_list' or subchild.type == 'type_identifier':
                         metadata['parameters'][get_node_text(subchild)] = None
                         # argument_list.append(get_node_text(subchild))
                     
         # metadata['parameters'] = argument_list
-        return metadata
+        return project_metadata(metadata, class_node, fields)
 
     @staticmethod
-    def get_function_metadata(function_node, blob: str = None) -> Dict[str, str]:
+    def get_function_metadata(function_node, blob: str = None, fields=None) -> Dict[str, str]:
         metadata = {
             'identifier': '',
             'parameters': {},
@@ -129,7 +136,7 @@ class JavaParser(LanguageParser):
                 for subchild in child.children:
                     if 'identifier' in subchild.type:
                         metadata['throws'] = get_node_text(subchild)
-            elif child.type == 'formal_parameters':
+            elif child.type == 'formal_parameters' and wants_field(fields, 'parameters'):
                 param_list = get_node_by_kind(child, ['formal_parameter'])  # speed_parameter
                 for param in param_list:
                     param_type = get_node_text(param.child_by_field_name('type'))
@@ -137,4 +144,4 @@ class JavaParser(LanguageParser):
                     metadata['parameters'][identifier] = param_type
         
         
-        return metadata
\ No newline at end of file
+        return project_metadata(metadata, function_node, fields)
\ No newline at end of file
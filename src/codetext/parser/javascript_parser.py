@@ -1,7 +1,8 @@
 from typing import List, Dict, Any
 import logging
 
-from .language_parser import LanguageParser, get_node_text, get_node_by_kind
+from .language_parser import LanguageParser, get_node_text, get_node_by_kind, find_node_by_kind, \
+    iter_node_by_kind, has_children, wants_field, project_metadata
 
 
 logger = logging.getLogger(__name__)
@@ -9,10 +10,22 @@ logger = logging.getLogger(__name__)
 
 class JavascriptParser(LanguageParser):
 
+    LANGUAGE = 'javascript'
+
     FILTER_PATHS = ('test', 'node_modules')
 
     BLACKLISTED_FUNCTION_NAMES = ['toString', 'toLocaleString', 'valueOf', 'constructor']
 
+    FUNCTION_TYPES = ['function_declaration', 'function', 'method_definition',
+                      'generator_function_declaration', 'arrow_function', 'generator_function']
+    CLASS_TYPES = ['class_declaration', 'class']
+    COMMENT_TYPES = ['comment']
+
+    # Returns inside these nodes do not belong to the enclosing function
+    RETURN_SCOPE_TYPES = ['function_declaration', 'function', 'method_definition',
+                          'generator_function_declaration', 'arrow_function', 'generator_function',
+                          'class_declaration', 'class']
+
     @staticmethod
     def get_docstring_node(node):
         docstring_node = []
@@ -43,35 +56,30 @@ class JavascriptParser(LanguageParser):
     
     @staticmethod
     def get_comment_node(function_node):
-        comment_node = get_node_by_kind(function_node, kind=['comment'])
+        comment_node = list(JavascriptParser.iter_comments(function_node))
         return comment_node
     
     @staticmethod
-    def get_function_list(node):
-        function_types = ['function_declaration',
-                    'function',
-                    'method_definition',
-                    'generator_function_declaration',
-                    'arrow_function',
-                    'generator_function']
-        res = get_node_by_kind(node, function_types)
-        for node in res[:]:
-            if not node.children:
-                res.remove(node)
+    def iter_functions(node):
+        # skip keyword tokens (e.g. `function`) sharing the node type
+        return iter_node_by_kind(node, JavascriptParser.FUNCTION_TYPES, predicate=has_children)
 
+    @staticmethod
+    def get_function_list(node):
+        res = list(JavascriptParser.iter_functions(node))
         return res
     
     @staticmethod
-    def get_class_list(node):
-        res = get_node_by_kind(node, ['class_declaration', 'class'])
-        for node in res[:]:
-            if not node.children:
-                res.remove(node)
+    def iter_classes(node):
+        return iter_node_by_kind(node, JavascriptParser.CLASS_TYPES, predicate=has_children)
 
+    @staticmethod
+    def get_class_list(node):
+        res = list(JavascriptParser.iter_classes(node))
         return res
 
     @staticmethod
-    def get_function_metadata(function_node, blob: str=None) -> Dict[str, str]:
+    def get_function_metadata(function_node, blob: str=None, fields=None) -> Dict[str, str]:
         if blob:
             logger.info('From version `0.0.6` this function will update argument in the API')
         metadata = {
@@ -83,15 +91,17 @@ class JavascriptParser(LanguageParser):
         for child in function_node.children:
             if child.type in ['identifier', 'property_identifier']:
                 metadata['identifier'] = get_node_text(child)
-            elif child.type == 'formal_parameters':
+            elif child.type == 'formal_parameters' and wants_field(fields, 'parameters'):
                 params = get_node_by_kind(child, ['identifier'])
                 for param in params:
                     identifier = get_node_text(param)
                     metadata['parameters'][identifier] = None  # JS not have type define
         
-        return_statement = get_node_by_kind(function_node, ['return_statement'])
-        if len(return_statement) > 0:
-            metadata['return_type'] = '<not_specific>'
+        if wants_field(fields, 'return_type'):
+            return_statement = find_node_by_kind(function_node, ['return_statement'],
+                                                 JavascriptParser.RETURN_SCOPE_TYPES)
+            if return_statement is not None:
+                metadata['return_type'] = '<not_specific>'
             
         if function_node.type in ["function",
                                   "arrow_function",
@@ -102,10 +112,10 @@ class JavascriptParser(LanguageParser):
                 if identifier.type in ["identifier"]:
                     metadata["identifier"] = identifier.text.decode()
         
-        return metadata
+        return project_metadata(metadata, function_node, fields)
 
     @staticmethod
-    def get_class_metadata(class_node, blob=None):
+    def get_class_metadata(class_node, blob=None, fields=None):
         if blob:
             logger.info('From version `0.0.6` this function will update argument in the API')
         metadata = {
@@ -116,11 +126,11 @@ class JavascriptParser(LanguageParser):
         for child in class_node.children:
             if child.type == 'identifier':
                 metadata['identifier'] = get_node_text(child)
-            elif child.type == 'class_heritage':
+            elif child.type == 'class_heritage' and wants_field(fields, 'parameters'):
                 for subchild in child.children:
                     if subchild.type == 'identifier':
                         metadata['parameters'][get_node_text(subchild)] = None
                         # param.append(get_node_text(subchild))
                         
         # metadata['parameters'] = param
-        return metadata
+        return project_metadata(metadata, class_node, fields)
@@ -1,14 +1,20 @@
 import re
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Set, Optional
+from typing import List, Dict, Any, Set, Optional, Callable, Iterator, Tuple
 
 import tree_sitter
 
 import logging
 
+from ..utils.profiler import profile_stage
+from ..utils.deadline import check_deadline
+
 DOCSTRING_REGEX = re.compile(r"(['\"])\1\1(.*?)\1{3}", flags=re.DOTALL)
 DOCSTRING_REGEX_TOKENIZER = re.compile(r"[^\s,'\"`.():\[\]=*;>{\}+-/\\]+|\\+|\.+|\(\)|{\}|\[\]|\(+|\)+|:+|\[+|\]+|{+|\}+|=+|\*+|;+|>+|\++|-+|/+|\'|\"|`")
 logger = logging.getLogger()
+# walkers check the deadline of the thread (see `check_deadline`) once per
+# this many visited nodes with children
+DEADLINE_CHECK_INTERVAL = 256
 
 def remove_words_in_string(words, string):
     new_string = string
@@ -120,13 +126,46 @@ def traverse_type(node, results, kind:List) -> None:
         traverse_type(n, results, kind)
 
 
-def get_node_by_kind(root: tree_sitter.Node, kind: List[str]) -> List:
+def iter_node_by_kind(root: tree_sitter.Node, kind: List[str],
+                      predicate: Callable[[tree_sitter.Node], bool] = None) -> Iterator[tree_sitter.Node]:
+    """
+    Lazily yield nodes with specific type (in pre-order), see `get_node_by_kind`
+    
+    Args:
+        root (tree_sitter.Node): Tree sitter root node
+        kind (List[str]): (node's) type that want to get
+        predicate (Callable): only yield the nodes for which `predicate(node)`
+            is true
+    
+    Yield:
+        tree_sitter.Node
+    """
+    # iterative walk, minified code can be nested deeper than the recursion limit
+    to_visit = [root]
+    countdown = DEADLINE_CHECK_INTERVAL
+    while to_visit:
+        node = to_visit.pop()
+        if node.type in kind and (predicate is None or predicate(node)):
+            yield node
+        children = node.children
+        if children:
+            countdown -= 1
+            if not countdown:
+                check_deadline()
+                countdown = DEADLINE_CHECK_INTERVAL
+            to_visit.extend(reversed(children))
+
+
+def get_node_by_kind(root: tree_sitter.Node, kind: List[str],
+                     predicate: Callable[[tree_sitter.Node], bool] = None) -> List:
     """
-    Get all nodes with specific type
+    Get all nodes with specific type (in pre-order)
     
     Args:
         root (tree_sitter.Node): Tree sitter root node
         kind (List[str]): (node's) type that want to get
+        predicate (Callable): only keep the nodes for which `predicate(node)`
+            is true, applied during the traversal
     
     Return:
         List[tree_sitter.Node]: List of all 
@@ -135,9 +174,92 @@ def get_node_by_kind(root: tree_sitter.Node, kind: List[str]) -> List:
     assert type(kind) in [list, str], f"Expect `kind` to be `list` of string or `str`, get {type(kind)}"
     assert all(isinstance(s, str) for s in kind) == True, f"Expect search kind to be `str`"
 
-    node_list = []
-    traverse_type(root, node_list, kind=kind)
-    return node_list
+    return list(iter_node_by_kind(root, kind, predicate))
+
+
+def has_children(node: tree_sitter.Node) -> bool:
+    """Predicate skipping keyword tokens which share their type with a node (e.g. `class`)"""
+    return node.child_count > 0
+
+
+def find_node_by_kind(root: tree_sitter.Node, kind: List[str],
+                      stop_kind: List[str] = ()) -> Optional[tree_sitter.Node]:
+    """
+    Find one node with specific type, without descending into nodes of
+    `stop_kind` (e.g. nested functions or classes). Unlike `get_node_by_kind`,
+    the search stops at the first match. Last children are searched first, so
+    a trailing statement (e.g. the final `return`) is found right away.
+    
+    Args:
+        root (tree_sitter.Node): Tree sitter root node, searched even if its
+            type is in `stop_kind`
+        kind (List[str]): (node's) type that want to get
+        stop_kind (List[str]): (node's) type that are not searched
+    
+    Return:
+        tree_sitter.Node: a matching node or None
+    """
+    if root.type in kind:
+        return root
+    # `children` is cached by tree-sitter, copy it before popping
+    to_visit = list(root.children)
+    countdown = DEADLINE_CHECK_INTERVAL
+    while to_visit:
+        node = to_visit.pop()
+        node_type = node.type
+        if node_type in kind:
+            return node
+        if node_type not in stop_kind:
+            countdown -= 1
+            if not countdown:
+                check_deadline()
+                countdown = DEADLINE_CHECK_INTERVAL
+            to_visit.extend(node.children)
+    return None
+
+
+# Fields accepted by the `fields` projection of `get_*_metadata`
+METADATA_FIELDS = frozenset(['identifier', 'parameters', 'return_type', 'throws', 'span', 'code'])
+
+
+def wants_field(fields: Optional[Set[str]], name: str) -> bool:
+    """Check if a metadata field is requested (`fields=None` requests all of them)"""
+    return fields is None or name in fields
+
+
+def project_metadata(metadata: Dict, node: tree_sitter.Node, fields: Optional[Set[str]]) -> Dict:
+    """
+    Keep the requested fields of a metadata dict, and add the fields computed
+    from the node itself:
+        - span (Dict): `start_byte`, `end_byte`, `start_point`, `end_point`
+        - code (str): text of the node
+    
+    Args:
+        metadata (Dict): metadata computed by `get_*_metadata`
+        node (tree_sitter.Node): function or class node
+        fields (Set[str]): requested fields, None to return `metadata` untouched
+    
+    Return:
+        Dict: projected metadata
+    """
+    if fields is None or metadata is None:
+        return metadata
+    assert METADATA_FIELDS.issuperset(fields), \
+        f"Unknown fields {set(fields) - METADATA_FIELDS}, expect {sorted(METADATA_FIELDS)}"
+    projected = {}
+    for name in fields:
+        if name == 'span':
+            projected['span'] = {
+                'start_byte': node.start_byte,
+                'end_byte': node.end_byte,
+                'start_point': node.start_point,
+                'end_point': node.end_point,
+            }
+        elif name == 'code':
+            projected['code'] = get_node_text(node)
+        elif name in metadata:
+            projected[name] = metadata[name]
+    return projected
 
 
 def get_node_text(root: tree_sitter.Node) -> str:
@@ -156,6 +278,65 @@ def get_node_text(root: tree_sitter.Node) -> str:
     return text
 
 
+class SourceText:
+    """
+    Node text accessor over the source buffer of one file, a replacement of
+    `get_node_text` when many spans of the same file are read (e.g. class and
+    method code). Spans are sliced from a `memoryview` of the source by
+    `start_byte`/`end_byte` (no copy of the node bytes), decoded lazily and
+    at most once (memoised). ASCII sources are decoded once as a whole and
+    spans are sliced from the decoded text.
+
+    Args:
+        source (str or bytes): source code the tree was parsed from
+        encoding (str): encoding of `source` (tree-sitter offsets are bytes)
+    """
+    def __init__(self, source, encoding: str = 'utf-8'):
+        if isinstance(source, str):
+            text = source
+            source = source.encode(encoding)
+        else:
+            text = None
+        self.source: bytes = source
+        self.encoding = encoding
+        self._view = memoryview(source)
+        self._cache: Dict[Tuple[int, int], str] = {}
+        # byte offsets are character offsets when the source is ASCII
+        self._ascii_text = None
+        if text is not None and len(text) == len(source):
+            self._ascii_text = text
+        elif text is None and source.isascii():
+            self._ascii_text = source.decode('ascii')
+
+    def __len__(self) -> int:
+        return len(self.source)
+
+    def span(self, start_byte: int, end_byte: int) -> str:
+        """
+        Text between two byte offsets
+
+        Return:
+            str: decoded text, cached by span
+        """
+        if self._ascii_text is not None:
+            return self._ascii_text[start_byte:end_byte]
+        key = (start_byte, end_byte)
+        text = self._cache.get(key)
+        if text is None:
+            text = str(self._view[start_byte:end_byte], self.encoding)
+            self._cache[key] = text
+        return text
+
+    def get_node_text(self, node: tree_sitter.Node) -> str:
+        """
+        Same as `get_node_text(node)` for a node of this source
+
+        Return:
+            str: text of `node`
+        """
+        return self.span(node.start_byte, node.end_byte)
+
+
 def match_from_span(node, blob: str) -> str:
     # logger.warn('From version 0.0.6, we move `match_from_span` to `get_node_text`')
     lines = blob.split('\n')
@@ -205,8 +386,113 @@ def match_from_spans(nodes, blob: str) -> str:
 
 
 class LanguageParser(ABC):
+    # Language name (lowercased key of `PL_MATCHING`), the profile key of the
+    # stages timed outside of a `PROFILER.use_language` scope
+    LANGUAGE: str = None
+
     BLACKLISTED_FUNCTION_NAMES = []
     
+    # Node types listed by `iter_functions`, `iter_classes` and `iter_comments`
+    FUNCTION_TYPES: List[str] = []
+    CLASS_TYPES: List[str] = []
+    COMMENT_TYPES: List[str] = []
+    
+    # Entry points timed by `codetext.utils.profiler` (when enabled)
+    PROFILED_METHODS = ['get_function_list', 'get_class_list', 'get_docstring',
+                        'get_docstring_node', 'get_comment_node',
+                        'get_function_metadata', 'get_class_metadata']
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        language = cls.__dict__.get('LANGUAGE') or cls.__name__.replace('Parser', '').lower()
+        for name in LanguageParser.PROFILED_METHODS:
+            method = cls.__dict__.get(name)
+            if isinstance(method, staticmethod):
+                setattr(cls, name, staticmethod(profile_stage(name, language)(method.__func__)))
+    
+    @classmethod
+    def iter_functions(cls, node) -> Iterator[tree_sitter.Node]:
+        """
+        Lazily yield function nodes inside `node`, in the order of
+        `get_function_list`. Stop iterating early to skip the rest of the walk.
+        """
+        if not cls.FUNCTION_TYPES:
+            return iter(cls.get_function_list(node))
+        return iter_node_by_kind(node, cls.FUNCTION_TYPES)
+
+    @classmethod
+    def iter_classes(cls, node) -> Iterator[tree_sitter.Node]:
+        """Lazily yield class nodes inside `node`, see `iter_functions`"""
+        if not cls.CLASS_TYPES:
+            return iter(cls.get_class_list(node))
+        return iter_node_by_kind(node, cls.CLASS_TYPES)
+
+    @classmethod
+    def iter_comments(cls, node) -> Iterator[tree_sitter.Node]:
+        """Lazily yield comment nodes inside `node`, see `iter_functions`"""
+        if not cls.COMMENT_TYPES:
+            return iter(cls.get_comment_node(node))
+        return iter_node_by_kind(node, cls.COMMENT_TYPES)
+
+    @classmethod
+    def iter_headers(cls, node, max_depth: int = 0) -> Iterator[Tuple[str, tree_sitter.Node, int]]:
+        """
+        Headers only walk: yield class and function nodes without descending
+        into function bodies (the cursor jumps to the next sibling instead).
+        Class bodies are walked, so methods are found.
+        
+        Args:
+            node (tree_sitter.Node): root node
+            max_depth (int): also search the bodies of functions nested up to
+                this depth (0: top-level functions and methods only)
+        
+        Yield:
+            Tuple[str, tree_sitter.Node, int]: kind (`class`, `method` or
+                `function`), node, and number of enclosing functions
+        """
+        if not cls.FUNCTION_TYPES:
+            # fallback for parsers without node types, walk everything
+            for class_node in cls.get_class_list(node):
+                yield 'class', class_node, 0
+            for function_node in cls.get_function_list(node):
+                yield 'function', function_node, 0
+            return
+
+        function_types, class_types = cls.FUNCTION_TYPES, cls.CLASS_TYPES
+        cursor = node.walk()
+        # enclosing definition kind and function depth, saved per tree level
+        owner, depth = None, 0
+        levels = []
+        countdown = DEADLINE_CHECK_INTERVAL
+        while True:
+            current = cursor.node
+            node_type = current.type
+            kind = None
+            # `child_count` skips keyword tokens sharing the type (e.g. `class`)
+            if node_type in function_types and current.child_count:
+                kind = 'method' if owner == 'class' else 'function'
+            elif node_type in class_types and current.child_count:
+                kind = 'class'
+            if kind is not None:
+                yield kind, current, depth
+
+            if (kind is None or kind == 'class' or depth < max_depth) and cursor.goto_first_child():
+                countdown -= 1
+                if not countdown:
+                    check_deadline()
+                    countdown = DEADLINE_CHECK_INTERVAL
+                levels.append((owner, depth))
+                if kind == 'class':
+                    owner = 'class'
+                elif kind is not None:
+                    owner, depth = 'function', depth + 1
+                continue
+            while not cursor.goto_next_sibling():
+                if not levels:
+                    return
+                cursor.goto_parent()
+                owner, depth = levels.pop()
+
     @staticmethod
     @abstractmethod
     def get_function_list(node):
@@ -229,12 +515,17 @@ class LanguageParser(ABC):
     
     @staticmethod
     @abstractmethod
-    def get_class_metadata(class_node, blob=None):
+    def get_class_metadata(class_node, blob=None, fields=None):
+        """
+        `fields` (e.g. `{"identifier", "span"}`) restricts the metadata to the
+        requested `METADATA_FIELDS`, the others are not computed
+        """
         pass
 
     @staticmethod
     @abstractmethod
-    def get_function_metadata(function_node, blob=None) -> Dict[str, str]:
+    def get_function_metadata(function_node, blob=None, fields=None) -> Dict[str, str]:
+        """See `get_class_metadata` for `fields`"""
         pass
     
     
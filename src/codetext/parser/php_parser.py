@@ -3,7 +3,8 @@ from typing import List, Dict, Any
 import tree_sitter
 import logging
 
-from .language_parser import LanguageParser, get_node_text, get_node_by_kind
+from .language_parser import LanguageParser, get_node_text, get_node_by_kind, find_node_by_kind, \
+    wants_field, project_metadata
 
 
 logger = logging.getLogger(__name__)
@@ -11,6 +12,8 @@ logger = logging.getLogger(__name__)
 
 class PhpParser(LanguageParser):
 
+    LANGUAGE = 'php'
+
     FILTER_PATHS = ('test', 'tests')
 
     BLACKLISTED_FUNCTION_NAMES = ['__construct', '__destruct', '__call', '__callStatic',
@@ -19,6 +22,14 @@ class PhpParser(LanguageParser):
                                   '__set_state', '__clone', '__debugInfo', '__serialize',
                                   '__unserialize']
 
+    FUNCTION_TYPES = ['function_definition', 'method_declaration']
+    CLASS_TYPES = ['class_declaration', 'trait_declaration', 'interface_declaration']
+    COMMENT_TYPES = ['comment']
+
+    # Returns inside these nodes do not belong to the enclosing function
+    RETURN_SCOPE_TYPES = ['function_definition', 'method_declaration', 'anonymous_function_creation_expression',
+                          'arrow_function', 'class_declaration', 'interface_declaration', 'trait_declaration']
+
     @staticmethod
     def get_docstring(node, blob: str=None) -> str:
         if blob:
@@ -44,23 +55,21 @@ class PhpParser(LanguageParser):
     
     @staticmethod
     def get_comment_node(function_node):
-        comment_node = get_node_by_kind(function_node, kind='comment')
+        comment_node = list(PhpParser.iter_comments(function_node))
         return comment_node
     
     @staticmethod
     def get_class_list(node):
-        res = get_node_by_kind(node, ['class_declaration', 
-                                      'trait_declaration',
-                                      'interface_declaration'])
+        res = list(PhpParser.iter_classes(node))
         return res
     
     @staticmethod
     def get_function_list(node):
-        res = get_node_by_kind(node, ['function_definition', 'method_declaration'])
+        res = list(PhpParser.iter_functions(node))
         return res
     
     @staticmethod
-    def get_function_metadata(function_node, blob: str=None) -> Dict[str, str]:
+    def get_function_metadata(function_node, blob: str=None, fields=None) -> Dict[str, str]:
         if blob:
             logger.info('From version `0.0.6` this function will update argument in the API')
         metadata = {
@@ -74,7 +83,7 @@ class PhpParser(LanguageParser):
                 metadata['identifier'] = get_node_text(n)
             if n.type in ['union_type', 'intersection_type']:
                 metadata['return_type'] = get_node_text(n)
-            elif n.type == 'formal_parameters':
+            elif n.type == 'formal_parameters' and wants_field(fields, 'parameters'):
                 for param_node in n.children:
                     if param_node.type in ['simple_parameter', 'variadic_parameter', 'property_promotion_parameter']:
                         identifier = get_node_text(param_node.child_by_field_name('name'))
@@ -85,18 +94,19 @@ class PhpParser(LanguageParser):
                         else:
                             metadata['parameters'][identifier] = None
                         
-        if not metadata['return_type']:
-            return_statement = get_node_by_kind(function_node, ['return_statement'])
-            if len(return_statement) > 0:
+        if not metadata['return_type'] and wants_field(fields, 'return_type'):
+            return_statement = find_node_by_kind(function_node, ['return_statement'],
+                                                 PhpParser.RETURN_SCOPE_TYPES)
+            if return_statement is not None:
                 metadata['return_type'] = '<not_specific>'
             else:
                 metadata['return_type'] = None
 
-        return metadata
+        return project_metadata(metadata, function_node, fields)
 
     
     @staticmethod
-    def get_class_metadata(class_node, blob: str=None):
+    def get_class_metadata(class_node, blob: str=None, fields=None):
         if blob:
             logger.info('From version `0.0.6` this function will update argument in the API')
         metadata = {
@@ -108,7 +118,7 @@ class PhpParser(LanguageParser):
         for child in class_node.children:
             if child.type == 'name':
                 metadata['identifier'] = get_node_text(child)
-            elif child.type == 'base_clause':
+            elif child.type == 'base_clause' and wants_field(fields, 'parameters'):
                 argument_list = []
                 for param in child.children:
                     if param.type == 'name':
@@ -117,4 +127,4 @@ class PhpParser(LanguageParser):
                         # argument_list.append(get_node_text(param))
                 # metadata['parameters'] = argument_list 
     
-        return metadata
+        return project_metadata(metadata, class_node, fields)
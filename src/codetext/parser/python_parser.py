@@ -2,7 +2,8 @@ import re
 from typing import List, Dict, Iterable, Optional, Iterator, Any
 import logging
 
-from .language_parser import LanguageParser, get_node_by_kind, get_node_text
+from .language_parser import LanguageParser, get_node_by_kind, find_node_by_kind, get_node_text, \
+    iter_node_by_kind, wants_field, project_metadata
 
 
 logger = logging.getLogger(__name__)
@@ -10,7 +11,16 @@ logger = logging.getLogger(__name__)
 
 class PythonParser(LanguageParser):
     
+    LANGUAGE = 'python'
+
     BLACKLISTED_FUNCTION_NAMES = ['__init__', '__name__', '__main__']
+
+    FUNCTION_TYPES = ['function_definition']
+    CLASS_TYPES = ['class_definition']
+    COMMENT_TYPES = ['comment', 'expression_statement']
+
+    # Returns inside these nodes do not belong to the enclosing function
+    RETURN_SCOPE_TYPES = ['function_definition', 'lambda', 'class_definition']
     
     @staticmethod
     def get_docstring(node, blob:str=None):
@@ -26,12 +36,12 @@ class PythonParser(LanguageParser):
     
     @staticmethod
     def get_function_list(node):
-        res = get_node_by_kind(node, ['function_definition'])
+        res = list(PythonParser.iter_functions(node))
         return res
 
     @staticmethod
     def get_class_list(node):
-        res = get_node_by_kind(node, ['class_definition'])
+        res = list(PythonParser.iter_classes(node))
         return res
     
     @staticmethod
@@ -52,16 +62,20 @@ class PythonParser(LanguageParser):
 
         return None
     
+    @staticmethod
+    def iter_comments(node):
+        # only keep string expressions (i.e. docstrings)
+        return iter_node_by_kind(
+            node, PythonParser.COMMENT_TYPES,
+            predicate=lambda x: x.type == 'comment' or x.children[0].type == 'string')
+
     @staticmethod
     def get_comment_node(node):
-        comment_node = get_node_by_kind(node, kind=['comment', 'expression_statement'])
-        for node in comment_node[:]:
-            if node.type == 'expression_statement' and node.children[0].type != 'string':
-                comment_node.remove(node)
+        comment_node = list(PythonParser.iter_comments(node))
         return comment_node
     
     @staticmethod
-    def get_function_metadata(function_node, blob: str=None) -> Dict[str, str]:
+    def get_function_metadata(function_node, blob: str=None, fields=None) -> Dict[str, str]:
         if blob:
             logger.info('From version `0.0.6` this function will update argument in the API')
         metadata = {
@@ -73,7 +87,7 @@ class PythonParser(LanguageParser):
         for child in function_node.children:
             if child.type == 'identifier':
                 metadata['identifier'] = get_node_text(child)
-            elif child.type == 'parameters':
+            elif child.type == 'parameters' and wants_field(fields, 'parameters'):
                 for subchild in child.children:
                     if subchild.type == 'identifier':
                         metadata['parameters'][get_node_text(subchild)] = None
@@ -90,17 +104,18 @@ class PythonParser(LanguageParser):
             elif child.type == 'type':
                 metadata['return_type'] = get_node_text(child)
                 
-        if not metadata['return_type']:
-            return_statement = get_node_by_kind(function_node, ['return_statement'])
-            if len(return_statement) > 0:
+        if not metadata['return_type'] and wants_field(fields, 'return_type'):
+            return_statement = find_node_by_kind(function_node, ['return_statement'],
+                                                 PythonParser.RETURN_SCOPE_TYPES)
+            if return_statement is not None:
                 metadata['return_type'] = '<not_specific>'
             else:
                 metadata['return_type'] = None
                 
-        return metadata
+        return project_metadata(metadata, function_node, fields)
 
     @staticmethod
-    def get_class_metadata(class_node, blob: str=None) -> Dict[str, str]:
+    def get_class_metadata(class_node, blob: str=None, fields=None) -> Dict[str, str]:
         if blob:
             logger.info('From version `0.0.6` this function will update argument in the API')
         metadata = {
@@ -110,7 +125,7 @@ class PythonParser(LanguageParser):
         for child in class_node.children:
             if child.type == 'identifier':
                 metadata['identifier'] = get_node_text(child)
-            elif child.type == 'argument_list':
+            elif child.type == 'argument_list' and wants_field(fields, 'parameters'):
                 argument_list = get_node_text(child).split(',')
                 for arg in argument_list:
                     item = re.sub(r'[^a-zA-Z0-9\_]', ' ', arg).split()
@@ -119,4 +134,4 @@ class PythonParser(LanguageParser):
                         metadata['parameters'][item[0].strip()] = None
 
         # get __init__ function
-        return metadata
+        return project_metadata(metadata, class_node, fields)
@@ -4,7 +4,8 @@ from typing import List, Dict, Any
 import tree_sitter
 import logging
 
-from .language_parser import LanguageParser, get_node_text, get_node_by_kind
+from .language_parser import LanguageParser, get_node_text, get_node_by_kind, find_node_by_kind, \
+    iter_node_by_kind, has_children, wants_field, project_metadata
 # from function_parser.parsers.commentutils import get_docstring_summary
 
 
@@ -13,26 +14,33 @@ logger = logging.getLogger(__name__)
 
 class RubyParser(LanguageParser):
 
+    LANGUAGE = 'ruby'
+
     FILTER_PATHS = ('test', 'vendor')
 
     BLACKLISTED_FUNCTION_NAMES = ['initialize', 'to_text', 'display', 'dup', 'clone', 'equal?', '==', '<=>',
                                   '===', '<=', '<', '>', '>=', 'between?', 'eql?', 'hash']
 
+    FUNCTION_TYPES = ['method', 'singleton_method']
+    CLASS_TYPES = ['class', 'module']
+    COMMENT_TYPES = ['comment']
+
+    # Returns inside these nodes do not belong to the enclosing function
+    RETURN_SCOPE_TYPES = ['method', 'singleton_method', 'lambda', 'class', 'module']
+
     @staticmethod
     def get_function_list(node):
-        res = get_node_by_kind(node, ['method',
-                                      'singleton_method'])
+        res = list(RubyParser.iter_functions(node))
         return res
     
     @staticmethod
-    def get_class_list(node):
-        res = get_node_by_kind(node, ['class', 'module'])
-        
-        # remove class keywords
-        for node in res[:]:
-            if not node.children:
-                res.remove(node)
+    def iter_classes(node):
+        # skip class keywords
+        return iter_node_by_kind(node, RubyParser.CLASS_TYPES, predicate=has_children)
 
+    @staticmethod
+    def get_class_list(node):
+        res = list(RubyParser.iter_classes(node))
         return res
 
     @staticmethod
@@ -79,7 +87,7 @@ class RubyParser(LanguageParser):
         return docstring
     
     @staticmethod
-    def get_function_metadata(function_node, blob=None) -> Dict[str, str]:
+    def get_function_metadata(function_node, blob=None, fields=None) -> Dict[str, str]:
         if blob:
             logger.info('From version `0.0.6` this function will update argument in the API')
         metadata = {
@@ -94,22 +102,24 @@ class RubyParser(LanguageParser):
         for child in function_node.children:
             if child.type == 'identifier':
                 metadata['identifier'] = get_node_text(child)
-            elif child.type in ['method_parameters', 'parameters', 'bare_parameters']:
+            elif child.type in ['method_parameters', 'parameters', 'bare_parameters'] \
+                    and wants_field(fields, 'parameters'):
                 params = get_node_by_kind(child, ['identifier'])
                 for item in params:
                     metadata['parameters'][get_node_text(item)] = None
 
-        if not metadata['return_type']:
-            return_statement = get_node_by_kind(function_node, ['return'])
-            if len(return_statement) > 0:
+        if not metadata['return_type'] and wants_field(fields, 'return_type'):
+            return_statement = find_node_by_kind(function_node, ['return'],
+                                                 RubyParser.RETURN_SCOPE_TYPES)
+            if return_statement is not None:
                 metadata['return_type'] = '<not_specific>'
             else:
                 metadata['return_type'] = None
 
-        return metadata
+        return project_metadata(metadata, function_node, fields)
     
     @staticmethod
-    def get_class_metadata(class_node, blob=None):
+    def get_class_metadata(class_node, blob=None, fields=None):
         if blob:
             logger.info('From version `0.0.6` this function will update argument in the API')
         metadata = {
@@ -122,17 +132,17 @@ class RubyParser(LanguageParser):
         for child in class_node.children:
             if child.type == 'constant':
                 metadata['identifier'] = get_node_text(child)
-            if child.type == 'superclass':
+            if child.type == 'superclass' and wants_field(fields, 'parameters'):
                 for subchild in child.children:
                     if subchild.type == 'constant':
                         metadata['parameters'][get_node_text(subchild)] = None
 
-        return metadata
+        return project_metadata(metadata, class_node, fields)
         
 
     @staticmethod
     def get_comment_node(function_node):
-        comment_node = get_node_by_kind(function_node, kind='comment')
+        comment_node = list(RubyParser.iter_comments(function_node))
         return comment_node
     
     @staticmethod
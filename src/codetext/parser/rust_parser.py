@@ -4,7 +4,8 @@ from typing import List, Dict, Any
 import tree_sitter
 import logging
 
-from .language_parser import LanguageParser, get_node_by_kind, get_node_text
+from .language_parser import LanguageParser, get_node_by_kind, find_node_by_kind, get_node_text, \
+    iter_node_by_kind, wants_field, project_metadata
 
 
 logger = logging.getLogger(__name__)
@@ -12,18 +13,27 @@ logger = logging.getLogger(__name__)
 
 class RustParser(LanguageParser):
 
+    LANGUAGE = 'rust'
+
     FILTER_PATHS = ('test', 'vendor')
 
     BLACKLISTED_FUNCTION_NAMES = ['main']
 
+    FUNCTION_TYPES = ['function_item']
+    CLASS_TYPES = ['impl_item', 'mod_item']  # trait is like an interface
+    COMMENT_TYPES = ['comment', 'line_comment', 'block_comment']
+
+    # Returns inside these nodes do not belong to the enclosing function
+    RETURN_SCOPE_TYPES = ['function_item', 'closure_expression', 'impl_item', 'mod_item', 'trait_item']
+
     @staticmethod
     def get_function_list(node):
-        res = get_node_by_kind(node, ['function_item'])
+        res = list(RustParser.iter_functions(node))
         return res
     
     @staticmethod
     def get_class_list(node):
-        res = get_node_by_kind(node, ['impl_item', 'mod_item'])  # trait is like an interface
+        res = list(RustParser.iter_classes(node))
         return res
 
     @staticmethod
@@ -66,7 +76,7 @@ class RustParser(LanguageParser):
         return docstring
     
     @staticmethod
-    def get_function_metadata(function_node, blob=None) -> Dict[str, str]:
+    def get_function_metadata(function_node, blob=None, fields=None) -> Dict[str, str]:
         if blob:
             logger.info('From version `0.0.6` this function will update argument in the API')
         metadata = {
@@ -81,7 +91,7 @@ class RustParser(LanguageParser):
         for child in function_node.children:
             if child.type == 'identifier':
                 metadata['identifier'] = get_node_text(child)
-            elif child.type in ['parameters']:
+            elif child.type in ['parameters'] and wants_field(fields, 'parameters'):
                 params = get_node_by_kind(child, ['parameter', 'variadic_parameter', 'self_parameter'])
                 for item in params:
                     if item.type == 'self_parameter':
@@ -108,17 +118,18 @@ class RustParser(LanguageParser):
             if child.type == 'reference_type':
                 metadata['return_type'] = get_node_text(child)
             
-            if not metadata['return_type']:
-                return_statement = get_node_by_kind(function_node, ['return_expression'])
-                if len(return_statement) > 0:
-                    metadata['return_type'] = '<not_specific>'
-                else:
-                    metadata['return_type'] = None
+        if not metadata['return_type'] and wants_field(fields, 'return_type'):
+            return_statement = find_node_by_kind(function_node, ['return_expression'],
+                                                 RustParser.RETURN_SCOPE_TYPES)
+            if return_statement is not None:
+                metadata['return_type'] = '<not_specific>'
+            else:
+                metadata['return_type'] = None
                 
-        return metadata
+        return project_metadata(metadata, function_node, fields)
     
     @staticmethod
-    def get_class_metadata(class_node, blob=None):
+    def get_class_metadata(class_node, blob=None, fields=None):
         if blob:
             logger.info('From version `0.0.6` this function will update argument in the API')
         metadata = {
@@ -133,6 +144,11 @@ class RustParser(LanguageParser):
                 if child.type ==  'identifier':
                     metadata['identifier'] = get_node_text(child)
         
+        elif not wants_field(fields, 'parameters'):
+            # only the first type identifier is needed, stop there
+            identifier = next(iter_node_by_kind(class_node, ['type_identifier']))
+            metadata['identifier'] = get_node_text(identifier)
+
         else:
             identifier = get_node_by_kind(class_node, ['type_identifier'])
             
@@ -141,10 +157,10 @@ class RustParser(LanguageParser):
                 for param in identifier[1:]:
                     metadata['parameters'][get_node_text(param)] = None
 
-        return metadata
+        return project_metadata(metadata, class_node, fields)
         
 
     @staticmethod
     def get_comment_node(function_node):
-        comment_node = get_node_by_kind(function_node, kind=['comment', 'line_comment', 'block_comment'])
+        comment_node = list(RustParser.iter_comments(function_node))
         return comment_node
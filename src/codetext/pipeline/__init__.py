@@ -0,0 +1,25 @@
+"""Dataset pipeline
+Turn source files into code/docstring pairs
+"""
+from .extract import extract_records
+from .writer import ShardWriter
+from .checkpoint import Checkpoint
+from .dataset import build_dataset, iter_source_files, iter_sources
+from .archive import iter_archive_members, is_archive
+from .jsonl import JsonlFields, split_ranges, iter_jsonl_range
+from .schedule import schedule_by_size
+from .quarantine import Quarantine
+from .supervisor import Supervisor
+from .gitrepo import GitRepo
+from .incremental import IncrementalExtractor, ResultStore, extract_units
+from .history import HistoryWalker, UnitTracker
+from .watch import WatchDaemon
+
+
+__all__ = [
+    'extract_records', 'ShardWriter', 'Checkpoint', 'build_dataset',
+    'iter_source_files', 'iter_sources', 'iter_archive_members', 'is_archive',
+    'JsonlFields', 'split_ranges', 'iter_jsonl_range', 'schedule_by_size',
+    'Quarantine', 'Supervisor', 'GitRepo', 'IncrementalExtractor', 'ResultStore',
+    'extract_units', 'HistoryWalker', 'UnitTracker', 'WatchDaemon'
+]
@@ -0,0 +1,67 @@
+"""Stream source files out of tar and zip archives, without extracting them
+
+Members are read one at a time (tarballs are opened in stream mode, so
+compressed tarballs are decompressed sequentially) and only the members with
+a supported extension (see `PL_MATCHING`) are read. A member is named
+`<archive path>!/<member name>`, see `ARCHIVE_SEPARATOR`.
+"""
+import os
+import tarfile
+import zipfile
+from typing import Iterator, Tuple
+
+from ..codetext_cli import get_file_language
+
+
+ARCHIVE_EXTENSIONS = ('.tar', '.tar.gz', '.tgz', '.tar.xz', '.txz', '.tar.bz2', '.tbz2', '.zip')
+
+# Between the archive path and the member name in member paths
+ARCHIVE_SEPARATOR = '!/'
+
+
+def is_archive(path: str) -> bool:
+    """Return True if `path` has a supported archive extension"""
+    return path.lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+def member_path(archive_path: str, name: str) -> str:
+    return archive_path + ARCHIVE_SEPARATOR + name.lstrip('/')
+
+
+def _iter_tar(path: str) -> Iterator[Tuple[str, object]]:
+    # `r|*`: sequential stream, any compression
+    with tarfile.open(path, mode='r|*') as archive:
+        for member in archive:
+            if not member.isfile():
+                continue
+            yield member.name, lambda: archive.extractfile(member).read()
+
+
+def _iter_zip(path: str) -> Iterator[Tuple[str, object]]:
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            if info.is_dir():
+                continue
+            yield info.filename, lambda: archive.read(info)
+
+
+def iter_archive_members(path: str, language: str = None) -> Iterator[Tuple[str, str, bytes]]:
+    """
+    Stream the supported source files of an archive
+
+    Args:
+        path (str): `.tar`, `.tar.gz`, `.tar.xz`, `.tar.bz2` or `.zip` file
+        language (str): only keep this language (key of `PL_MATCHING`)
+    Yield:
+        Tuple[str, str, bytes]: (member path, language, content)
+    """
+    assert is_archive(path), f"{path} is not a supported archive ({', '.join(ARCHIVE_EXTENSIONS)})"
+    members = _iter_zip(path) if path.lower().endswith('.zip') else _iter_tar(path)
+    for name, read in members:
+        member_language = get_file_language(name)
+        if member_language is None:
+            continue
+        if language and member_language != language:
+            continue
+        # only the kept members are read (decompressed)
+        yield member_path(path, name), member_language, read()
@@ -0,0 +1,75 @@
+"""Warm worker bootstrap
+
+Workers of `build_dataset` would otherwise pay, before their first result, for
+importing the pipeline (tree-sitter, cleaning rules with their compiled
+regexes, language profiles, the `PL_MATCHING` extension index), loading the
+grammars and building the parsers. `preload` does all of it once in a parent
+process, so that workers forked from it start warm:
+
+    - `fork`: `build_dataset` preloads its own process before starting workers
+    - `forkserver`: `set_forkserver_preload` starts the fork server with
+      `PRELOAD_ENV` set, it imports this module, which preloads the listed
+      languages; the variable is restored in the caller and removed in the
+      fork server, so later processes do not preload
+    - `spawn`: nothing is inherited, workers start cold
+"""
+import os
+import logging
+from multiprocessing import forkserver
+from typing import List
+
+from ..utils import load_parser
+from ..codetext_cli import get_language_parser, PL_MATCHING
+# imported for the fork server: cleaning rules compile their regexes and the
+# language profiles at import
+from .extract import extract_records
+
+
+logger = logging.getLogger(__name__)
+
+# Comma separated languages preloaded when the fork server imports this module
+PRELOAD_ENV = 'CODETEXT_PRELOAD_LANGUAGES'
+
+
+def preload(languages: List[str] = None):
+    """
+    Load the grammars and build the parsers of `languages` (default every
+    language of `PL_MATCHING`), in the calling thread
+
+    Args:
+        languages (List[str]): language names (keys of `PL_MATCHING`)
+    """
+    for language in languages or PL_MATCHING:
+        load_parser(language)
+        get_language_parser(language)
+
+
+def set_forkserver_preload(context, languages: List[str] = None):
+    """
+    Start the fork server of a `forkserver` multiprocessing context with
+    `languages` preloaded. The fork server is started once per process, by
+    its first user, so only the languages of the first call are preloaded.
+
+    Args:
+        context: `multiprocessing.get_context('forkserver')`
+        languages (List[str]): language names (default every language)
+    """
+    # `__main__` is the default preload of the fork server
+    context.set_forkserver_preload(['__main__', __name__])
+    previous = os.environ.get(PRELOAD_ENV)
+    os.environ[PRELOAD_ENV] = ','.join(languages or PL_MATCHING)
+    try:
+        # the fork server inherits the environment when it starts
+        forkserver.ensure_running()
+    finally:
+        if previous is None:
+            del os.environ[PRELOAD_ENV]
+        else:
+            os.environ[PRELOAD_ENV] = previous
+
+
+# removed once read: the workers of the fork server and their subprocesses
+# do not preload again
+_preload_languages = os.environ.pop(PRELOAD_ENV, None)
+if _preload_languages:
+    preload(_preload_languages.split(','))
@@ -0,0 +1,130 @@
+"""Resumable checkpoint journal
+
+The journal is an append-only JSONL file in the output directory. Each line
+marks one input file as completed, with the content hash, the number of
+records and the shard position right after its records:
+
+    {"path": ..., "sha1": ..., "records": 3, "error": false,
+     "shard": 0, "offset": 10240, "shard_records": 42}
+
+Entries are committed in groups: the shard is flushed and fsync-ed *before* the
+journal lines are written, so every journaled record is on disk. On restart,
+shards are truncated back to the last journaled position (dropping records of
+files that were not journaled, they are processed again) and journaled files
+are skipped, so a crash at any point neither loses nor duplicates records.
+
+A journaled file is skipped only if its content still has the journaled hash:
+a file edited since is processed again (the records of its previous content
+stay in the shards). Files journaled with an error are retried.
+"""
+import os
+import json
+import time
+import logging
+from typing import Dict, Tuple
+
+from .writer import ShardWriter
+
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_NAME = 'checkpoint.jsonl'
+
+
+class Checkpoint:
+    """
+    Args:
+        output_dir (str): output directory, the journal is `<output_dir>/checkpoint.jsonl`
+        interval (int): commit after this many completed files
+        max_delay (float): commit after this many seconds
+    """
+    def __init__(self, output_dir: str, interval: int = 100, max_delay: float = 10.0):
+        self.path = os.path.join(output_dir, JOURNAL_NAME)
+        self.interval = interval
+        self.max_delay = max_delay
+        self.completed: Dict[str, str] = {}
+        self.position: Tuple[int, int, int] = None
+        self._pending = []
+        self._last_commit = time.monotonic()
+        self._file = None
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def load(self) -> Dict[str, str]:
+        """
+        Read the journal, drop a torn last line, and remember the last shard
+        position
+
+        Return:
+            Dict[str, str]: completed path -> sha1, without the files that
+                failed (`error`), so they are retried
+        """
+        self.completed = {}
+        self.position = None
+        if not self.exists():
+            return self.completed
+
+        valid_size = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    assert line.endswith(b'\n')
+                except (ValueError, AssertionError):
+                    logger.warning(f"Ignore torn entry at the end of {self.path}")
+                    break
+                valid_size += len(line)
+                if entry['error']:
+                    self.completed.pop(entry['path'], None)
+                else:
+                    self.completed[entry['path']] = entry['sha1']
+                self.position = (entry['shard'], entry['offset'], entry['shard_records'])
+
+        if valid_size != os.path.getsize(self.path):
+            with open(self.path, 'r+b') as f:
+                f.truncate(valid_size)
+        return self.completed
+
+    def open_writer(self, output_dir: str, shard_size: int, prefix: str = 'data') -> ShardWriter:
+        """Create a `ShardWriter` positioned right after the last journaled record"""
+        position = self.position if self.position is not None else (-1, 0, 0)
+        return ShardWriter(output_dir, shard_size, prefix, position=position)
+
+    def add(self, path: str, sha1: str, num_records: int, writer: ShardWriter, error: bool = False):
+        """
+        Mark `path` as completed, its records must already be written to `writer`
+        """
+        shard, offset, shard_records = writer.position()
+        self._pending.append({
+            'path': path, 'sha1': sha1, 'records': num_records, 'error': error,
+            'shard': shard, 'offset': offset, 'shard_records': shard_records,
+        })
+        if not error:
+            self.completed[path] = sha1
+        if (len(self._pending) >= self.interval
+                or time.monotonic() - self._last_commit >= self.max_delay):
+            self.commit(writer)
+
+    def commit(self, writer: ShardWriter):
+        """Make the shard durable, then append the pending journal entries"""
+        self._last_commit = time.monotonic()
+        if not self._pending:
+            return
+        writer.flush(fsync=True)
+        if self._file is None:
+            self._file = open(self.path, 'ab')
+        self._file.write(b''.join(
+            (json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8')
+            for entry in self._pending
+        ))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = []
+
+    def close(self, writer: ShardWriter = None):
+        if writer is not None:
+            self.commit(writer)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
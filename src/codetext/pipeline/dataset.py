@@ -0,0 +1,576 @@
+"""`codetext build-dataset`: source files -> code/docstring pairs -> sharded JSONL
+
+Stages run concurrently and only a bounded number of tasks is queued ahead,
+so memory stays flat whatever the corpus size:
+
+    reader --(task queue per worker)--> N worker processes --(pipe per worker)--> writer
+
+The supervisor (see `Supervisor`) replaces the workers that crash or go over
+the memory cap, retries their item in an isolated process and quarantines it
+if it crashes again. The reader walks the input paths (and streams the
+members of tar and zip archives, see `iter_archive_members`; JSONL corpora
+are split into byte ranges read by the workers, see `split_ranges`), the
+workers read, parse, extract, filter (`check_function`) and clean
+(`clean_docstring`) one file at a time, and the writer appends the records to
+sharded JSONL files and journals completed files (see `Checkpoint`), so an
+interrupted run can be resumed with `resume=True`.
+
+With `schedule='size'` the files are listed and stat'ed before dispatch, the
+largest first and small files batched together (see `schedule_by_size`), and
+the summary reports the utilisation of every worker.
+
+With `file_timeout`, every file has a time budget (tree-sitter parse timeout,
+then cooperative checks in the walkers and cleaners, see
+`codetext.utils.deadline`). Files exceeding it are journaled in a
+`Quarantine` and skipped by hash by later runs.
+"""
+import os
+import hashlib
+import time
+import logging
+import argparse
+import multiprocessing as mp
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from ..codetext_cli import get_file_language, print_filter_stats, print_profile, PL_MATCHING
+from ..clean.filter_stats import FilterStats
+from ..clean.prefilter import SKIP_REASONS, classify_source
+from ..utils.profiler import PROFILER
+from ..utils.deadline import DeadlineExceeded, deadline
+from .checkpoint import Checkpoint
+from .archive import is_archive, iter_archive_members
+from .jsonl import JsonlFields, JsonlRange, is_jsonl, split_ranges, iter_jsonl_range
+from .bootstrap import preload as preload_languages, set_forkserver_preload
+from .supervisor import Supervisor
+from .schedule import DEFAULT_BATCH_BYTES, schedule_by_size
+from .quarantine import QUARANTINE_NAME, Quarantine, quarantine_entry
+from .extract import extract_records
+
+
+logger = logging.getLogger(__name__)
+
+SCHEDULES = ('stream', 'size')
+
+
+def _iter_files(paths: List[str]) -> Iterator[str]:
+    for path in paths:
+        assert os.path.exists(path), f"{path} is not valid"
+        if os.path.isfile(path):
+            yield path
+        else:
+            for root, _, names in os.walk(path):
+                for name in sorted(names):
+                    yield os.path.join(root, name)
+
+
+def iter_source_files(paths: List[str], language: str = None) -> Iterator[Tuple[str, str]]:
+    """
+    Recursively list supported source files
+
+    Args:
+        paths (List[str]): files or directories
+        language (str): only keep this language (key of `PL_MATCHING`)
+    Yield:
+        Tuple[str, str]: (file path, language)
+    """
+    for file in _iter_files(paths):
+        file_language = get_file_language(file)
+        if file_language is None:
+            continue
+        if language and file_language != language:
+            continue
+        yield file, file_language
+
+
+def iter_sources(paths: List[str], language: str = None) -> Iterator[Tuple[str, str, bytes]]:
+    """
+    Same as `iter_source_files`, plus the supported members of the tar and
+    zip archives found in `paths`, streamed with their content
+
+    Yield:
+        Tuple[str, str, bytes]: (path, language, content), content is None
+            for regular files (read by the workers)
+    """
+    for file in _iter_files(paths):
+        if is_archive(file):
+            yield from iter_archive_members(file, language)
+            continue
+        file_language = get_file_language(file)
+        if file_language is None:
+            continue
+        if language and file_language != language:
+            continue
+        yield file, file_language, None
+
+
+def read_source(path: str, language: str, content: bytes = None) -> bytes:
+    """Read a source file, `content` is used if already read (archive member)"""
+    with PROFILER.use_language(language), PROFILER.stage('read'):
+        if content is None:
+            with open(path, 'rb') as f:
+                content = f.read()
+    PROFILER.count('files', language=language.lower())
+    PROFILER.count('bytes', len(content), language=language.lower())
+    return content
+
+
+def process_file(path: str, language: str, loosen_filter: bool = False,
+                 stats: FilterStats = None) -> List[Dict]:
+    """Read one file and extract its records (see `extract_records`)"""
+    content = read_source(path, language)
+    return extract_records(content, language, path, loosen_filter, stats)
+
+
+class _Worker:
+    """Per-process state: counters and optional statistics"""
+    def __init__(self, loosen_filter: bool, filter_stats: bool, profile: bool,
+                 language: str = None, jsonl_fields: JsonlFields = None, completed: Dict[str, str] = None,
+                 file_timeout: float = None, quarantined=(), prefilter: bool = False):
+        self.loosen_filter = loosen_filter
+        self.stats = FilterStats() if filter_stats else None
+        self.counters = {'files': 0, 'records': 0, 'errors': 0, 'skipped': 0, 'changed': 0,
+                         'timeouts': 0, 'quarantined': 0}
+        # files skipped before parsing, per reason (see `classify_source`)
+        self.prefilter = prefilter
+        self.counters.update(('prefilter_' + reason, 0) for reason in SKIP_REASONS)
+        # per-file time budget, sha1 of the files quarantined by previous
+        # runs, and new quarantine entries not sent yet
+        self.file_timeout = file_timeout
+        self.quarantined = quarantined
+        self.new_quarantined = []
+        # called with (key, sha1, language, size) before processing an item
+        self.on_start = None
+        # utilisation: time spent processing over the lifetime of the worker
+        self.start = time.perf_counter()
+        self.busy_seconds = 0.0
+        self.tasks = 0
+        # JSONL ranges are read by the workers
+        self.language = language
+        self.jsonl_fields = jsonl_fields or JsonlFields()
+        # key -> sha1 of the items completed by a previous run, skipped if
+        # their content did not change
+        self.completed = completed or {}
+        if profile:
+            PROFILER.enable()
+
+    def _completed(self, key: str, sha1: str) -> bool:
+        """Whether `key` was completed by a previous run with the same content"""
+        completed_sha1 = self.completed.get(key)
+        if completed_sha1 is None:
+            return False
+        if completed_sha1 == sha1:
+            self.counters['skipped'] += 1
+            return True
+        logger.warning(f"{key} changed since the previous run, process it again "
+                       f"(the records of its previous content are kept)")
+        self.counters['changed'] += 1
+        return False
+
+    def process(self, path: str, language: str, content: bytes = None,
+                key: str = None) -> Optional[Tuple[str, str, List[Dict], bool]]:
+        """
+        Return:
+            Tuple: (path, sha1 of the content, records, error), None if the
+                file was completed by a previous run
+        """
+        sha1 = None
+        start = time.perf_counter()
+        try:
+            content = read_source(path, language, content)
+            sha1 = hashlib.sha1(content).hexdigest()
+            if self._completed(key or path, sha1):
+                return None
+            if sha1 in self.quarantined:
+                self.counters['quarantined'] += 1
+                return path, sha1, [], False
+            if self.prefilter:
+                reason = classify_source(content, path)
+                if self.stats is not None:
+                    self.stats.record('classify_source', reason is not None, time.perf_counter() - start)
+                if reason is not None:
+                    self.counters['prefilter_' + reason] += 1
+                    return path, sha1, [], False
+            if self.on_start is not None:
+                self.on_start(key or path, sha1, language, len(content))
+            with deadline(self.file_timeout):
+                records = extract_records(content, language, path, self.loosen_filter, self.stats)
+        except DeadlineExceeded as e:
+            logger.warning(f"Timeout on {path}: {e}")
+            self.counters['timeouts'] += 1
+            self.new_quarantined.append(quarantine_entry(
+                path, sha1, language, len(content), e.stage, e.elapsed, e.budget))
+            return path, sha1, [], True
+        except Exception as e:
+            logger.warning(f"Failed to process {path}: {e!r}")
+            self.counters['errors'] += 1
+            return path, sha1, [], True
+        finally:
+            self.busy_seconds += time.perf_counter() - start
+        self.counters['files'] += 1
+        self.counters['records'] += len(records)
+        return path, sha1, records, False
+
+    def process_range(self, task: JsonlRange, skip=()) -> Iterator[Tuple[str, str, List[Dict], bool]]:
+        """
+        Process the records of a JSONL byte range, records carry the `id` of
+        their input record
+
+        Yield:
+            Tuple: (record key, sha1 of the content, records, error)
+        """
+        for source, error in iter_jsonl_range(task, self.jsonl_fields, self.language):
+            if source is None:
+                logger.warning(f"Invalid record {error}")
+                self.counters['errors'] += 1
+                continue
+            if source.key in skip:
+                continue
+            result = self.process(source.path, source.language, source.content, source.key)
+            if result is None:
+                continue
+            _, sha1, records, error = result
+            for record in records:
+                record['id'] = source.id
+            yield source.key, sha1, records, error
+
+    def run(self, task, skip=()) -> Iterator[Tuple[str, str, List[Dict], bool]]:
+        """
+        Process a file, a JSONL range or a batch (list) of them, except the
+        items whose key (path or JSONL record key) is in `skip`
+        """
+        self.tasks += 1
+        for item in task if isinstance(task, list) else [task]:
+            if isinstance(item, JsonlRange):
+                yield from self.process_range(item, skip)
+            elif item[0] not in skip:
+                result = self.process(*item)
+                if result is not None:
+                    yield result
+
+    def progress(self) -> Dict:
+        """Counters and utilisation so far"""
+        return {
+            'counters': dict(self.counters),
+            'worker': {'pid': os.getpid(), 'tasks': self.tasks, 'busy_seconds': self.busy_seconds,
+                       'seconds': time.perf_counter() - self.start},
+        }
+
+    def report(self) -> Dict:
+        return dict(
+            self.progress(),
+            filter_stats=self.stats.to_dict() if self.stats is not None else None,
+            profile=PROFILER.summary() if PROFILER.enabled else None,
+        )
+
+    def pop_quarantined(self) -> List[Dict]:
+        entries, self.new_quarantined = self.new_quarantined, []
+        return entries
+
+
+def _worker_loop(task_queue, conn, worker_options: Dict):
+    """Worker process, see `Supervisor` for the messages"""
+    worker = _Worker(**worker_options)
+    task_id = None
+
+    def on_start(key, sha1, language, size):
+        conn.send(('start', task_id, key, {'sha1': sha1, 'language': language, 'bytes': size}))
+    worker.on_start = on_start
+
+    while True:
+        message = task_queue.get()
+        if message is None:
+            break
+        task_id, task, skip = message
+        # every file is reported, even without records, to be journaled
+        for result in worker.run(task, skip):
+            for entry in worker.pop_quarantined():
+                conn.send(('quarantine', entry))
+            conn.send(('file', task_id, result, worker.progress()))
+        conn.send(('task', task_id))
+    conn.send(('done', worker.report()))
+
+
+def _write_result(writer, checkpoint: Checkpoint, result: Tuple):
+    path, sha1, records, error = result
+    writer.write_many(records)
+    checkpoint.add(path, sha1, len(records), writer, error)
+
+
+def _merge_report(summary: Dict, report: Dict):
+    for name, value in report['counters'].items():
+        summary['counters'][name] = summary['counters'].get(name, 0) + value
+    if report['filter_stats'] is not None:
+        summary['filter_stats'].merge(report['filter_stats'])
+    if report['profile'] is not None:
+        PROFILER.merge(report['profile'])
+    worker = dict(report['worker'])
+    worker['utilisation'] = worker['busy_seconds'] / worker['seconds'] if worker['seconds'] else 0.0
+    summary['workers'].append(worker)
+
+
+def build_dataset(paths: List[str], output_dir: str, language: str = None,
+                  num_workers: int = None, shard_size: int = 100000,
+                  queue_size: int = 64, loosen_filter: bool = False,
+                  filter_stats: bool = False, profile: bool = False,
+                  resume: bool = False, checkpoint_interval: int = 100,
+                  jsonl_fields: JsonlFields = None, jsonl_ranges: int = None,
+                  start_method: str = None, preload: bool = True,
+                  schedule: str = 'stream', batch_bytes: int = DEFAULT_BATCH_BYTES,
+                  file_timeout: float = None, quarantine_path: str = None,
+                  max_tasks_per_child: int = None, max_rss: int = None,
+                  prefilter: bool = False) -> Dict:
+    """
+    Build a code/docstring pair dataset from source files
+
+    Args:
+        paths (List[str]): files, directories, tar/zip archives (members are
+            streamed to the workers, see `iter_archive_members`) or `.jsonl`
+            corpora (one record per source file, see `iter_jsonl_range`)
+        output_dir (str): directory of the JSONL shards
+        language (str): only process this language (key of `PL_MATCHING`)
+        num_workers (int): worker processes (default cpu count), 0 to run
+            everything in the current process
+        shard_size (int): records per shard
+        queue_size (int): number of tasks prefetched across all workers,
+            each worker has `max(1, queue_size // num_workers)` tasks queued
+            ahead (unused with `num_workers=0`)
+        loosen_filter (bool): see `clean_docstring`
+        filter_stats (bool): collect per-rule filter statistics
+        profile (bool): collect stage timings (merged into `PROFILER`)
+        resume (bool): skip the files journaled by a previous run in
+            `output_dir` if their content did not change (by sha1, files
+            that failed are retried) and append to its shards
+        checkpoint_interval (int): journal completed files in groups of this size
+        jsonl_fields (JsonlFields): field names of the JSONL records
+        jsonl_ranges (int): byte ranges per JSONL corpus (default 4 per worker)
+        start_method (str): multiprocessing start method of the workers
+            (`fork`, `forkserver` or `spawn`, default the platform default)
+        preload (bool): preload the parsers and cleaning rules in the parent
+            (`fork`) or fork server (`forkserver`) process, so workers start
+            warm (see `codetext.pipeline.bootstrap`)
+        schedule (str): `stream` dispatches the files as they are listed,
+            `size` lists them first and dispatches the largest first, with
+            the small files batched (see `schedule_by_size`)
+        batch_bytes (int): size of the batches of small files (`size` schedule)
+        file_timeout (float): time budget per file in seconds (default none),
+            files exceeding it are quarantined
+        quarantine_path (str): quarantine journal (default
+            `<output_dir>/quarantine.jsonl`), the files it lists are skipped
+            by hash
+        max_tasks_per_child (int): replace workers after this many tasks
+            (default never)
+        max_rss (int): kill and replace workers above this resident memory
+            in bytes (default no cap), see `Supervisor`
+        prefilter (bool): skip minified, generated, lockfile and binary files
+            before parsing them (see `classify_source`), counted per reason
+            in the `prefilter_<reason>` counters (default off)
+    Return:
+        Dict: `counters` (of this run, `skipped` counts resumed files,
+            `changed` the resumed files processed again since they changed,
+            `duplicates` the items whose key (e.g. JSONL id) was already seen,
+            `timeouts` newly and `quarantined` previously quarantined files),
+            `shards`, `seconds`, `first_result_seconds` (None without
+            result), `filter_stats` (FilterStats), `workers` (per worker
+            `tasks`, `busy_seconds`, `seconds` and `utilisation`) and
+            `skipped_items` (items given up after crashing workers, see
+            `Supervisor`, with `crashes`, `retries` and `recycled` counters)
+    """
+    assert schedule in SCHEDULES, f"Unknown schedule {schedule}, expect one of {SCHEDULES}"
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    start = time.perf_counter()
+    summary = {'counters': {'skipped': 0, 'duplicates': 0}, 'filter_stats': FilterStats(),
+               'first_result_seconds': None, 'workers': [], 'skipped_items': []}
+
+    os.makedirs(output_dir, exist_ok=True)
+    checkpoint = Checkpoint(output_dir, interval=checkpoint_interval)
+    if checkpoint.exists() and not resume:
+        raise ValueError(f"{output_dir} contains a previous run, use `resume` to continue it")
+    completed = checkpoint.load() if resume else {}
+    if completed:
+        logger.info(f"Resume {output_dir}: skip {len(completed)} completed files if unchanged")
+    quarantine = Quarantine(quarantine_path or os.path.join(output_dir, QUARANTINE_NAME))
+    if quarantine.load():
+        logger.info(f"Skip {len(quarantine)} quarantined files listed in {quarantine.path}")
+
+    jsonl_paths = [path for path in paths if is_jsonl(path)]
+    if jsonl_ranges is None:
+        jsonl_ranges = 4 * max(1, num_workers)
+
+    def iter_tasks():
+        for path in paths:
+            if path in jsonl_paths:
+                yield from split_ranges(path, jsonl_ranges)
+            else:
+                yield from iter_sources([path], language)
+    tasks = iter_tasks()
+    if schedule == 'size':
+        tasks = schedule_by_size(tasks, batch_bytes)
+
+    worker_options = {
+        'loosen_filter': loosen_filter, 'filter_stats': filter_stats, 'profile': profile,
+        'language': language, 'jsonl_fields': jsonl_fields,
+        # the workers skip the completed items whose content did not change
+        'completed': completed,
+        'file_timeout': file_timeout, 'quarantined': frozenset(quarantine.entries),
+        'prefilter': prefilter,
+    }
+    # keys (path or JSONL record key) of the items written by this run
+    written = set()
+    with checkpoint.open_writer(output_dir, shard_size) as writer:
+        def on_result(result):
+            if result[0] in written:
+                # e.g. duplicate JSONL ids, a resumed run only sees one of them
+                logger.warning(f"Duplicate item {result[0]}")
+                summary['counters']['duplicates'] += 1
+            written.add(result[0])
+            _write_result(writer, checkpoint, result)
+            if summary['first_result_seconds'] is None:
+                summary['first_result_seconds'] = time.perf_counter() - start
+
+        if num_workers == 0:
+            worker = _Worker(**worker_options)
+            for task in tasks:
+                for result in worker.run(task):
+                    for entry in worker.pop_quarantined():
+                        quarantine.add(entry)
+                    on_result(result)
+            _merge_report(summary, worker.report())
+        else:
+            context = mp.get_context(start_method)
+            if preload:
+                languages = [language] if language else None
+                if context.get_start_method() == 'forkserver':
+                    set_forkserver_preload(context, languages)
+                elif context.get_start_method() == 'fork':
+                    preload_languages(languages)
+            supervisor = Supervisor(context, _worker_loop, worker_options, num_workers,
+                                    max_tasks_per_child=max_tasks_per_child, max_rss=max_rss,
+                                    prefetch=max(1, queue_size // num_workers))
+            supervisor.run(tasks, on_result, quarantine.add, lambda report: _merge_report(summary, report))
+            for name, value in supervisor.counters.items():
+                summary['counters'][name] = value
+            summary['skipped_items'] = supervisor.skipped
+        checkpoint.close(writer)
+
+    summary['shards'] = writer.shards
+    summary['seconds'] = time.perf_counter() - start
+    return summary
+
+
+def get_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='codetext build-dataset',
+        description='Build code/docstring pairs from source files into sharded JSONL')
+    parser.add_argument('paths', nargs='+',
+                        help='list of the filename/paths, tar and zip archives are streamed, '
+                             '.jsonl files are read as corpora of source records.')
+    parser.add_argument('-o', '--output_dir', required=True,
+                        help='Output directory of the JSONL shards')
+    parser.add_argument('-l', '--language',
+                        help='Only process this language')
+    parser.add_argument('-j', '--num_workers', type=int, default=None,
+                        help='Number of worker processes (default cpu count, 0: no worker)')
+    parser.add_argument('--shard_size', type=int, default=100000,
+                        help='Number of records per shard')
+    parser.add_argument('--queue_size', type=int, default=64,
+                        help='Number of tasks prefetched across all workers '
+                             '(queue_size // num_workers queued per worker, at least 1)')
+    parser.add_argument('--loosen_filter', action='store_true',
+                        help='Apply less docstring filter rules')
+    parser.add_argument('--filter_stats', action='store_true',
+                        help='Print per-rule filter statistics at the end')
+    parser.add_argument('--profile-stages', dest='profile_stages', action='store_true',
+                        help='Print per-stage timings at the end')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue an interrupted run in the output directory')
+    parser.add_argument('--checkpoint_interval', type=int, default=100,
+                        help='Number of completed files per checkpoint journal commit')
+    parser.add_argument('--content_field', default='content',
+                        help='Source code field of the JSONL input records')
+    parser.add_argument('--path_field', default='path',
+                        help='Path field of the JSONL input records')
+    parser.add_argument('--language_field', default='language',
+                        help='Language field of the JSONL input records (else guessed from the path)')
+    parser.add_argument('--id_field', default='id',
+                        help='Id field of the JSONL input records, copied to the output records')
+    parser.add_argument('--start_method', choices=['fork', 'forkserver', 'spawn'], default=None,
+                        help='Start method of the worker processes (default platform default)')
+    parser.add_argument('--no_preload', dest='preload', action='store_false',
+                        help='Do not preload parsers and cleaning rules before forking workers')
+    parser.add_argument('--jsonl_ranges', type=int, default=None,
+                        help='Number of byte ranges per JSONL input (default 4 per worker)')
+    parser.add_argument('--schedule', choices=SCHEDULES, default='stream',
+                        help='stream: dispatch files as they are listed, '
+                             'size: list them first, largest first, batch the small files')
+    parser.add_argument('--batch_bytes', type=int, default=DEFAULT_BATCH_BYTES,
+                        help='Size of the batches of small files (size schedule)')
+    parser.add_argument('--file_timeout', type=float, default=None,
+                        help='Time budget per file in seconds, files exceeding it are quarantined')
+    parser.add_argument('--prefilter', action='store_true',
+                        help='Skip minified, generated, lockfile and binary files before parsing them')
+    parser.add_argument('--max_tasks_per_child', type=int, default=None,
+                        help='Replace workers after this many tasks (default never)')
+    parser.add_argument('--max_rss_mb', type=int, default=None,
+                        help='Kill and replace workers above this resident memory in MB, '
+                             'their item is retried once in isolation, then quarantined')
+    parser.add_argument('--quarantine', dest='quarantine_path', default=None,
+                        help='Quarantine journal, listed files are skipped by hash '
+                             '(default <output_dir>/quarantine.jsonl)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    opt = get_args(argv)
+    if opt.language and opt.language not in PL_MATCHING.keys():
+        raise ValueError(
+            "{language} not supported. Currently support {sp_language}"
+            .format(language=opt.language, sp_language=list(PL_MATCHING.keys())))
+
+    if opt.profile_stages:
+        PROFILER.enable()
+    summary = build_dataset(
+        opt.paths, opt.output_dir, language=opt.language,
+        num_workers=opt.num_workers, shard_size=opt.shard_size,
+        queue_size=opt.queue_size, loosen_filter=opt.loosen_filter,
+        filter_stats=opt.filter_stats, profile=opt.profile_stages,
+        resume=opt.resume, checkpoint_interval=opt.checkpoint_interval,
+        jsonl_fields=JsonlFields(opt.content_field, opt.path_field, opt.language_field, opt.id_field),
+        jsonl_ranges=opt.jsonl_ranges, start_method=opt.start_method, preload=opt.preload,
+        schedule=opt.schedule, batch_bytes=opt.batch_bytes,
+        file_timeout=opt.file_timeout, quarantine_path=opt.quarantine_path,
+        max_tasks_per_child=opt.max_tasks_per_child,
+        max_rss=opt.max_rss_mb << 20 if opt.max_rss_mb else None,
+        prefilter=opt.prefilter)
+
+    counters = summary['counters']
+    print(50 * '=')
+    print("Processed {files} files ({errors} errors, {skipped} skipped), {records} records in {seconds:.2f}s"
+          .format(seconds=summary['seconds'], **counters))
+    print("Save {num} shards to {path}".format(num=len(summary['shards']), path=opt.output_dir))
+    if counters.get('timeouts') or counters.get('quarantined'):
+        print("Quarantined {timeouts} files over the time budget, skipped {quarantined} quarantined files"
+              .format(**counters))
+    prefiltered = ['{} {}'.format(reason, counters.get('prefilter_' + reason, 0))
+                   for reason in SKIP_REASONS if counters.get('prefilter_' + reason)]
+    if prefiltered:
+        print("Skipped before parsing: " + ', '.join(prefiltered))
+    if counters.get('duplicates'):
+        print("{duplicates} duplicate items (same path or JSONL id), a resumed run keeps only one"
+              .format(**counters))
+    if counters.get('crashes'):
+        print("Replaced {crashes} crashed workers, {retries} isolated retries".format(**counters))
+    for item in summary['skipped_items']:
+        print("Skipped {path} ({stage}: {reason})".format(**item))
+    utilisation = [worker['utilisation'] for worker in summary['workers']]
+    if utilisation:
+        print("Worker utilisation: min {:.1%}, mean {:.1%}, max {:.1%}".format(
+            min(utilisation), sum(utilisation) / len(utilisation), max(utilisation)))
+    if opt.filter_stats:
+        print_filter_stats(summary['filter_stats'])
+    if opt.profile_stages:
+        print_profile(PROFILER.summary())
+
+
+if __name__ == '__main__':
+    main()
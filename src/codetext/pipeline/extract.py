@@ -0,0 +1,88 @@
+"""Extract code/docstring pairs from one source file"""
+import time
+from typing import Dict, List, Union
+
+from ..utils import parse_code
+from ..utils.profiler import PROFILER
+from ..utils.deadline import check_deadline
+from ..parser import get_node_text
+from ..codetext_cli import get_language_parser
+from ..clean.noise_removal import check_function_node, clean_docstring, get_black_list_filter
+from ..clean.filter_stats import FilterStats
+
+
+IDENTIFIER_FIELDS = {'identifier'}
+
+
+def extract_records(content: Union[str, bytes], language: str, path: str = None,
+                    loosen_filter: bool = False, stats: FilterStats = None) -> List[Dict]:
+    """
+    Parse a source file and return one record per function (or method) that
+    passes `check_function` and has a docstring surviving `clean_docstring`
+
+    Args:
+        content (str or bytes): source code
+        language (str): language name (e.g. python, c++, c#)
+        path (str): source path, stored in the records
+        loosen_filter (bool): see `clean_docstring`
+        stats (FilterStats): optional, per-rule filter statistics
+    Return:
+        List[Dict]: records with keys `path`, `language`, `identifier`,
+            `parameters`, `return_type`, `class`, `start_point`, `end_point`,
+            `code`, `original_docstring` and `docstring`
+    """
+    language = str(language).lower()
+    parser = get_language_parser(language)
+    with PROFILER.use_language(language):
+        with PROFILER.stage('parse_code'):
+            root_node = parse_code(content, language).root_node
+
+        # innermost class wins, classes are listed in pre-order
+        function_class = {}
+        for class_node in parser.get_class_list(root_node):
+            class_name = parser.get_class_metadata(class_node)['identifier']
+            for method in parser.get_function_list(class_node):
+                function_class[method] = class_name
+
+        records = []
+        black_list = get_black_list_filter(parser.BLACKLISTED_FUNCTION_NAMES)
+        functions = parser.get_function_list(root_node)
+        PROFILER.count('functions', len(functions))
+        for function in functions:
+            check_deadline('extract')
+            # `check_function`, node flags then black listed names, before
+            # paying for the full metadata
+            start = time.perf_counter()
+            with PROFILER.stage('check_function'):
+                passed = check_function_node(function)
+                if passed:
+                    identifier = parser.get_function_metadata(function, fields=IDENTIFIER_FIELDS)['identifier']
+                    passed = black_list.search(identifier) is None
+            if stats is not None:
+                stats.record('check_function', not passed, time.perf_counter() - start)
+            if not passed:
+                continue
+
+            metadata = parser.get_function_metadata(function)
+            original_docstring = parser.get_docstring(function)
+            if not original_docstring:
+                continue
+            docstring = clean_docstring(original_docstring, loosen_filter, stats)
+            if not docstring:
+                continue
+
+            records.append({
+                'path': path,
+                'language': language,
+                'identifier': metadata['identifier'],
+                'parameters': metadata['parameters'],
+                'return_type': metadata.get('return_type'),
+                'class': function_class.get(function),
+                'start_point': list(function.start_point),
+                'end_point': list(function.end_point),
+                'code': get_node_text(function),
+                'original_docstring': original_docstring,
+                'docstring': docstring,
+            })
+        PROFILER.count('records', len(records))
+    return records
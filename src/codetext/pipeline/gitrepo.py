@@ -0,0 +1,323 @@
+"""Read files of a local git repository through the `git` command
+
+Everything is read from the object database of the repository (no checkout,
+no network): trees are listed with `git ls-tree`, the index with
+`git ls-files -s`, changes between two revisions with `git diff --raw` (the
+`--name-status` output with the blob ids of both sides) and blob contents are
+streamed with a single `git cat-file --batch` process. The changes of a whole
+history, with the line ranges of every hunk, are streamed by one `git log`.
+"""
+import os
+import re
+import codecs
+import threading
+import subprocess
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+
+# `git hash-object -t tree /dev/null`, to diff against before the first commit
+EMPTY_TREE = '4b825dc642cb6eb9a060e54bf8d69288fbee4904'
+
+# Regular files (executable or not), symbolic links and submodules are skipped
+FILE_MODES = ('100644', '100755')
+
+
+class GitError(RuntimeError):
+    """A `git` command failed"""
+
+
+class BlobChange(NamedTuple):
+    """
+    One changed path between two revisions: `status` is `A` (added), `M`
+    (modified), `D` (deleted) or `T` (type changed), the blob id is None on
+    the missing side
+    """
+    status: str
+    path: str
+    old_blob: str
+    new_blob: str
+
+
+class Hunk(NamedTuple):
+    """
+    Changed lines of a `git diff -U0` hunk (`@@ -old_start,old_count
+    +new_start,new_count @@`): lines are 1-based, a count of 0 is an
+    insertion (or a deletion) after line `old_start` (or `new_start`)
+    """
+    old_start: int
+    old_count: int
+    new_start: int
+    new_count: int
+
+
+class CommitChanges(NamedTuple):
+    """Changed regular files of a commit against its first parent (None for a root commit)"""
+    commit: str
+    parent: Optional[str]
+    changes: List[BlobChange]
+    hunks: Dict[str, List[Hunk]]
+
+
+HUNK_REGEX = re.compile(rb'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+
+
+def _unquote(path: bytes) -> str:
+    """Path of the non `-z` outputs, C-quoted when it has special characters"""
+    if path.startswith(b'"') and path.endswith(b'"'):
+        path = codecs.escape_decode(path[1:-1])[0]
+    return os.fsdecode(path)
+
+
+def _blob_change(info: bytes, path: bytes) -> Optional[BlobChange]:
+    """Parse a `--raw` entry, None when no side is a regular file"""
+    old_mode, new_mode, old_blob, new_blob, status = info.decode().lstrip(':').split()
+    old_blob = old_blob if old_mode in FILE_MODES else None
+    new_blob = new_blob if new_mode in FILE_MODES else None
+    if old_blob is None and new_blob is None:
+        return None
+    return BlobChange(status[0], _unquote(path), old_blob, new_blob)
+
+
+class BlobReader:
+    """
+    Read blobs one at a time from a long running `git cat-file --batch`
+    process, for callers deciding what to read next from what they read
+
+    Args:
+        path (str): repository
+    """
+    def __init__(self, path: str):
+        self.process = subprocess.Popen(['git', '-C', path, 'cat-file', '--batch'],
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+    def read(self, blob: str) -> bytes:
+        self.process.stdin.write(blob.encode() + b'\n')
+        self.process.stdin.flush()
+        header = self.process.stdout.readline()
+        if not header:
+            raise GitError("`git cat-file` exited")
+        _, kind, *size = header.decode().split()
+        if kind == 'missing':
+            raise GitError(f"Missing object {blob}")
+        content = self.process.stdout.read(int(size[0]))
+        self.process.stdout.read(1)
+        return content
+
+    def close(self):
+        self.process.stdin.close()
+        self.process.stdout.close()
+        self.process.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class GitRepo:
+    """
+    Args:
+        path (str): working tree or bare repository
+    """
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+
+    def run(self, *args: str) -> bytes:
+        """Run a git command in the repository and return its output"""
+        try:
+            process = subprocess.run(['git', '-C', self.path] + list(args),
+                                     stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        except FileNotFoundError:
+            raise GitError("`git` is not installed")
+        if process.returncode != 0:
+            raise GitError("git {}: {}".format(' '.join(args), process.stderr.decode(errors='replace').strip()))
+        return process.stdout
+
+    @property
+    def git_dir(self) -> str:
+        return os.path.join(self.path, self.run('rev-parse', '--git-dir').decode().strip())
+
+    def resolve(self, revision: str) -> str:
+        """Commit id of a revision (branch, tag, `HEAD~3`, ...)"""
+        if revision is None:
+            return EMPTY_TREE
+        return self.run('rev-parse', '--verify', '--end-of-options', revision + '^{commit}').decode().strip()
+
+    def ls_tree(self, revision: str) -> Dict[str, str]:
+        """
+        Return:
+            Dict[str, str]: path -> blob id of the regular files of a revision
+        """
+        files = {}
+        for entry in self.run('ls-tree', '-r', '-z', '--full-tree', revision).split(b'\0'):
+            if not entry:
+                continue
+            info, path = entry.split(b'\t', 1)
+            mode, kind, blob = info.decode().split()
+            if kind == 'blob' and mode in FILE_MODES:
+                files[os.fsdecode(path)] = blob
+        return files
+
+    def ls_files(self) -> Dict[str, str]:
+        """
+        Return:
+            Dict[str, str]: path -> blob id of the regular files of the index
+        """
+        files = {}
+        for entry in self.run('ls-files', '-s', '-z').split(b'\0'):
+            if not entry:
+                continue
+            info, path = entry.split(b'\t', 1)
+            mode, blob, stage = info.decode().split()
+            if mode in FILE_MODES and stage == '0':
+                files[os.fsdecode(path)] = blob
+        return files
+
+    def diff(self, old: str, new: str) -> List[BlobChange]:
+        """
+        Changed regular files between two revisions, renames are reported as
+        a deletion and an addition
+
+        Args:
+            old (str): old revision, None for the empty tree
+            new (str): new revision
+        """
+        output = self.run('diff', '--raw', '-z', '--no-abbrev', '--no-renames', '--no-ext-diff',
+                          old or EMPTY_TREE, new, '--')
+        fields = output.split(b'\0')
+        changes = []
+        # `:<old mode> <new mode> <old blob> <new blob> <status>` NUL `<path>` NUL
+        for info, path in zip(fields[0::2], fields[1::2]):
+            change = _blob_change(info, path)
+            if change is not None:
+                changes.append(change)
+        return changes
+
+    def diff_index(self, old: str) -> List[BlobChange]:
+        """
+        Changed regular files between a revision and the index (the staged
+        content), from the blob ids of `ls_tree` and `ls_files`
+
+        Args:
+            old (str): old revision, None for the empty tree
+        """
+        old_files = self.ls_tree(old) if old else {}
+        new_files = self.ls_files()
+        changes = []
+        for path in sorted(old_files.keys() | new_files.keys()):
+            old_blob, new_blob = old_files.get(path), new_files.get(path)
+            if old_blob == new_blob:
+                continue
+            status = 'A' if old_blob is None else 'D' if new_blob is None else 'M'
+            changes.append(BlobChange(status, path, old_blob, new_blob))
+        return changes
+
+    def log(self, revision: str = 'HEAD', paths: List[str] = None) -> Iterator[CommitChanges]:
+        """
+        Stream the changes of the first-parent history of a revision, oldest
+        commit first, from one `git log --raw -p -U0` process (merges are
+        diffed against their first parent, renames are a deletion and an
+        addition)
+
+        Args:
+            revision (str): revision or range (e.g. `v1.0..main`)
+            paths (List[str]): only report these paths (pathspecs)
+        Yield:
+            CommitChanges: changed files and hunks of each commit
+        """
+        args = ['git', '-C', self.path, '-c', 'core.quotePath=false', 'log', '--reverse',
+                '--first-parent', '-m', '--no-color', '--no-ext-diff', '--no-renames', '--no-abbrev',
+                '--raw', '-p', '-U0', '--format=format:%x00%H %P', '--end-of-options', revision,
+                '--'] + list(paths or [])
+        try:
+            process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        except FileNotFoundError:
+            raise GitError("`git` is not installed")
+        commit = None
+        path = None
+        # lines of the current hunk still to skip, they may look like headers
+        pending = 0
+        try:
+            for line in process.stdout:
+                if pending:
+                    if not line.startswith(b'\\'):
+                        pending -= 1
+                    continue
+                if line.startswith(b'\0'):
+                    if commit is not None:
+                        yield commit
+                    commit_id, *parents = line[1:].decode().split()
+                    commit = CommitChanges(commit_id, parents[0] if parents else None, [], {})
+                elif line.startswith(b':'):
+                    info, name = line.rstrip(b'\n').split(b'\t', 1)
+                    change = _blob_change(info, name)
+                    if change is not None:
+                        commit.changes.append(change)
+                elif line.startswith(b'diff --git '):
+                    path = None
+                elif line.startswith(b'--- a/'):
+                    # git ends the line with a TAB when the path has a space
+                    path = _unquote(line[6:].rstrip(b'\n').rstrip(b'\t'))
+                elif line.startswith(b'--- "a/'):
+                    path = _unquote(b'"' + line[7:].rstrip(b'\n').rstrip(b'\t'))
+                elif line.startswith(b'@@'):
+                    old_start, old_count, new_start, new_count = HUNK_REGEX.match(line).groups()
+                    hunk = Hunk(int(old_start), 1 if old_count is None else int(old_count),
+                                int(new_start), 1 if new_count is None else int(new_count))
+                    # no hunks for added files (`--- /dev/null`), they are read whole
+                    if path is not None:
+                        commit.hunks.setdefault(path, []).append(hunk)
+                    pending = hunk.old_count + hunk.new_count
+            if commit is not None:
+                yield commit
+        finally:
+            process.stdout.close()
+            stderr = process.stderr.read()
+            process.stderr.close()
+            returncode = process.wait()
+        if returncode != 0:
+            raise GitError("git log {}: {}".format(revision, stderr.decode(errors='replace').strip()))
+
+    def blob_reader(self) -> BlobReader:
+        """Long running blob reader, see `BlobReader`"""
+        return BlobReader(self.path)
+
+    def cat_blobs(self, blobs: Iterable[str]) -> Iterator[Tuple[str, bytes]]:
+        """
+        Stream blob contents, in the order of `blobs`, from one
+        `git cat-file --batch` process
+
+        Yield:
+            Tuple[str, bytes]: (blob id, content)
+        """
+        process = subprocess.Popen(['git', '-C', self.path, 'cat-file', '--batch'],
+                                   stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+        def write():
+            try:
+                for blob in blobs:
+                    process.stdin.write(blob.encode() + b'\n')
+                process.stdin.close()
+            except OSError:
+                # the reader stopped early
+                pass
+        # the requests are written from a thread, the output may not fit in
+        # the pipe before they are all sent
+        writer = threading.Thread(target=write, daemon=True)
+        writer.start()
+        try:
+            while True:
+                header = process.stdout.readline()
+                if not header:
+                    break
+                blob, kind, *size = header.decode().split()
+                if kind == 'missing':
+                    raise GitError(f"Missing object {blob}")
+                content = process.stdout.read(int(size[0]))
+                process.stdout.read(1)
+                yield blob, content
+        finally:
+            process.stdout.close()
+            writer.join()
+            process.wait()
@@ -0,0 +1,473 @@
+"""`codetext history`: function versions across the commits of a repository
+
+Re-parsing every changed file at every commit is what makes history mining
+slow. `HistoryWalker` streams the first-parent history (one `git log -p -U0`
+process, see `GitRepo.log`) and keeps, per path, the content, the
+`tree_sitter.Tree` and the functions of its last version. At each commit:
+    - the hunks of the diff are applied to the previous tree as edits
+      (`Tree.edit`) and the new content is parsed incrementally, reusing the
+      unchanged subtrees
+    - the affected ranges are the edited ranges and the `changed_ranges`
+      between the trees (syntax changes around the edits)
+    - only the functions overlapping an affected range are re-extracted, the
+      other ones are carried over, their spans shifted by the edits
+The state of the files is kept by `UnitTracker`, also used by `codetext watch`.
+
+Functions are matched by identity (kind, class, identifier and rank among
+homonyms, see `unit_identities`) and compared by the hash of their code,
+which gives one `add`, `modify` or `delete` record with the old and new spans
+per changed function.
+"""
+import bisect
+import hashlib
+import logging
+import argparse
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..utils import load_parser
+from ..parser import SourceText
+from ..codetext_cli import get_language_parser, get_file_language, PL_MATCHING
+from .gitrepo import GitRepo, Hunk
+from .incremental import unit_identities, _write_jsonl
+
+
+logger = logging.getLogger(__name__)
+
+# (start byte, end byte) of a changed range
+ByteRange = Tuple[int, int]
+# (old start, old end, new start, new end) bytes of an edit
+Edit = Tuple[int, int, int, int]
+
+
+def line_starts(content: bytes) -> List[int]:
+    """Byte offset of the start of every line"""
+    starts = [0]
+    index = content.find(b'\n')
+    while index >= 0:
+        starts.append(index + 1)
+        index = content.find(b'\n', index + 1)
+    return starts
+
+
+def _line_offset(starts: List[int], line: int, size: int) -> int:
+    """Offset of the start of a 0-based line, the end of the content past the last line"""
+    return starts[line] if line < len(starts) else size
+
+
+def _point(starts: List[int], offset: int) -> Tuple[int, int]:
+    row = bisect.bisect_right(starts, offset) - 1
+    return row, offset - starts[row]
+
+
+def hunk_edits(hunks: Iterable[Hunk], old_starts: List[int], old_size: int,
+               new_starts: List[int], new_size: int) -> List[Edit]:
+    """
+    Byte ranges of the hunks of a diff
+
+    Return:
+        List[Edit]: (old start, old end, new start, new end), in file order
+    """
+    edits = []
+    for hunk in hunks:
+        # a count of 0 is an insertion (deletion) after the start line
+        old_line = hunk.old_start if hunk.old_count == 0 else hunk.old_start - 1
+        new_line = hunk.new_start if hunk.new_count == 0 else hunk.new_start - 1
+        edits.append((
+            _line_offset(old_starts, old_line, old_size),
+            _line_offset(old_starts, old_line + hunk.old_count, old_size),
+            _line_offset(new_starts, new_line, new_size),
+            _line_offset(new_starts, new_line + hunk.new_count, new_size),
+        ))
+    return edits
+
+
+def apply_edits(tree, edits: List[Edit], old_starts: List[int], new_starts: List[int]):
+    """
+    Apply the edits to a tree, in file order: the text before an edit is
+    already the new one, the edit is described in new coordinates
+    """
+    for old_start, old_end, new_start, new_end in edits:
+        start_point = _point(new_starts, new_start)
+        old_start_row, old_start_column = _point(old_starts, old_start)
+        old_end_row, old_end_column = _point(old_starts, old_end)
+        if old_end_row == old_start_row:
+            old_end_point = (start_point[0], start_point[1] + old_end_column - old_start_column)
+        else:
+            old_end_point = (start_point[0] + old_end_row - old_start_row, old_end_column)
+        tree.edit(
+            start_byte=new_start, old_end_byte=new_start + old_end - old_start, new_end_byte=new_end,
+            start_point=start_point, old_end_point=old_end_point,
+            new_end_point=_point(new_starts, new_end),
+        )
+
+
+def map_offset(edits: List[Edit], offset: int, end: bool = False) -> int:
+    """
+    New offset of an old one, an offset inside an edit goes to the start (or
+    the `end`) of its new range
+    """
+    shift = 0
+    for old_start, old_end, new_start, new_end in edits:
+        if offset <= old_start:
+            break
+        if offset < old_end:
+            return new_end if end else new_start
+        shift = new_end - old_end
+    return offset + shift
+
+
+def overlaps(start: int, end: int, ranges: List[ByteRange]) -> bool:
+    """
+    Whether a span overlaps or touches one of the ranges: a function next to
+    an edit is re-extracted, whatever side of the edit keeps the boundary
+    """
+    for range_start, range_end in ranges:
+        if range_start <= end and start <= range_end:
+            return True
+    return False
+
+
+def _common_length(old: bytes, new: bytes, limit: int, suffix: bool) -> int:
+    """Length of the common prefix (or suffix) of two contents, by bisection"""
+    low, high = 0, limit
+    while low < high:
+        middle = (low + high + 1) // 2
+        if suffix:
+            same = old[len(old) - middle:] == new[len(new) - middle:]
+        else:
+            same = old[:middle] == new[:middle]
+        if same:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def content_edits(old: bytes, new: bytes) -> List[Edit]:
+    """
+    Edit between two contents without a diff: the range between their
+    common prefix and their common suffix, empty if they are equal
+    """
+    if old == new:
+        return []
+    limit = min(len(old), len(new))
+    prefix = _common_length(old, new, limit, suffix=False)
+    suffix = _common_length(old, new, limit - prefix, suffix=True)
+    return [(prefix, len(old) - suffix, prefix, len(new) - suffix)]
+
+
+class _FileState:
+    """Last version of a path: content, tree and units (in source order)"""
+    __slots__ = ('content', 'starts', 'tree', 'units')
+
+    def __init__(self, content: bytes, starts: List[int], tree, units: List[Dict]):
+        self.content = content
+        self.starts = starts
+        self.tree = tree
+        self.units = units
+
+
+class UnitTracker:
+    """
+    Content, tree and units (functions and methods, and classes if
+    `classes`) of the last version of files, updated incrementally
+
+    Args:
+        classes (bool): also track the classes
+        incremental (bool): reuse the previous tree of each file, False
+            re-parses and re-extracts the whole file at every change
+    """
+    def __init__(self, classes: bool = False, incremental: bool = True):
+        self.classes = classes
+        self.incremental = incremental
+        self.states: Dict[str, _FileState] = {}
+        self.stats = {'full_parses': 0, 'incremental_parses': 0, 'units': 0, 'extracted_units': 0}
+
+    def _collect(self, language: str, root_node, source: SourceText,
+                 ranges: Optional[List[ByteRange]]) -> List[Dict]:
+        """
+        Extract the units overlapping the ranges (all of them if None), only
+        the subtrees overlapping a range are visited
+        """
+        parser = get_language_parser(language)
+        function_types = set(parser.FUNCTION_TYPES)
+        class_types = set(parser.CLASS_TYPES)
+        units = []
+        stack = [root_node]
+        while stack:
+            node = stack.pop()
+            if node.child_count:
+                if node.type in function_types:
+                    units.append(self._function(parser, class_types, node, source))
+                elif self.classes and node.type in class_types:
+                    identifier = parser.get_class_metadata(node)['identifier']
+                    units.append(self._unit('class', None, identifier, node, source))
+            children = node.children
+            if ranges is not None:
+                children = [child for child in children if overlaps(child.start_byte, child.end_byte, ranges)]
+            stack.extend(reversed(children))
+        self.stats['extracted_units'] += len(units)
+        return units
+
+    @staticmethod
+    def _classes(language: str, root_node, ranges: List[ByteRange]) -> List[Tuple[str, int, int]]:
+        """Identifier, start and end byte of the classes (nested ones included) overlapping the ranges"""
+        parser = get_language_parser(language)
+        class_types = set(parser.CLASS_TYPES)
+        classes = []
+        stack = [root_node]
+        while stack:
+            node = stack.pop()
+            if node.type in class_types and node.child_count:
+                classes.append((parser.get_class_metadata(node)['identifier'], node.start_byte, node.end_byte))
+            stack.extend(child for child in node.children if overlaps(child.start_byte, child.end_byte, ranges))
+        return classes
+
+    @staticmethod
+    def _unit(kind: str, class_name: Optional[str], identifier: str, node, source: SourceText) -> Dict:
+        code = source.get_node_text(node)
+        return {
+            'kind': kind, 'class': class_name, 'identifier': identifier,
+            'start_byte': node.start_byte, 'end_byte': node.end_byte,
+            'start_point': list(node.start_point), 'end_point': list(node.end_point),
+            'code': code, 'sha1': hashlib.sha1(code.encode('utf-8')).hexdigest(),
+        }
+
+    @classmethod
+    def _function(cls, parser, class_types, node, source: SourceText) -> Dict:
+        # the innermost class, as `extract_units`
+        class_name = None
+        parent = node.parent
+        while parent is not None:
+            if parent.type in class_types:
+                class_name = parser.get_class_metadata(parent)['identifier']
+                break
+            parent = parent.parent
+        return cls._unit('function' if class_name is None else 'method', class_name,
+                         parser.get_function_metadata(node)['identifier'], node, source)
+
+    def _parse(self, content: bytes, language: str) -> _FileState:
+        """Parse and extract a whole file"""
+        tree = load_parser(language).parse(content)
+        self.stats['full_parses'] += 1
+        units = self._collect(language, tree.root_node, SourceText(content), None)
+        return _FileState(content, line_starts(content), tree, units)
+
+    def _reparse(self, state: _FileState, content: bytes, starts: List[int], edits: List[Edit],
+                 language: str) -> Tuple[_FileState, List[Dict], List[Dict]]:
+        """
+        Reparse a changed file from its previous state
+
+        Return:
+            Tuple[_FileState, List[Dict], List[Dict]]: new state, previous
+                units overlapping the changes and re-extracted units
+        """
+        # read before the edits, the text of an edited tree is stale
+        old_classes = self._classes(language, state.tree.root_node,
+                                    [(old_start, old_end) for old_start, old_end, _, _ in edits])
+        apply_edits(state.tree, edits, state.starts, starts)
+        tree = load_parser(language).parse(content, state.tree)
+        self.stats['incremental_parses'] += 1
+        ranges = [(new_start, new_end) for _, _, new_start, new_end in edits]
+        ranges.extend((r.start_byte, r.end_byte) for r in state.tree.changed_ranges(tree))
+        # the class of a method is part of its identity: all the units of a
+        # renamed (added, removed) class are re-extracted
+        new_classes = self._classes(language, tree.root_node, ranges)
+        old_names = {name for name, _, _ in old_classes}
+        new_names = {name for name, _, _ in new_classes}
+        ranges.extend((start, end) for name, start, end in new_classes if name not in old_names)
+        ranges.extend((map_offset(edits, start), map_offset(edits, end, end=True))
+                      for name, start, end in old_classes if name not in new_names)
+
+        # carry over the units away from the edits and the syntax changes
+        carried, touched = [], []
+        old_edits = [(old_start, old_end) for old_start, old_end, _, _ in edits]
+        shifts = [(old_end, new_end - old_end) for _, old_end, _, new_end in edits]
+        for unit in state.units:
+            start, end = unit['start_byte'], unit['end_byte']
+            if overlaps(start, end, old_edits):
+                touched.append(unit)
+                continue
+            index = bisect.bisect_right(shifts, (start, float('inf')))
+            shift = shifts[index - 1][1] if index else 0
+            if overlaps(start + shift, end + shift, ranges):
+                touched.append(unit)
+                continue
+            carried.append(dict(unit, start_byte=start + shift, end_byte=end + shift,
+                                start_point=list(_point(starts, start + shift)),
+                                end_point=list(_point(starts, end + shift))))
+        extracted = self._collect(language, tree.root_node, SourceText(content), ranges)
+        units = sorted(carried + extracted, key=lambda unit: (unit['start_byte'], -unit['end_byte']))
+        return _FileState(content, starts, tree, units), touched, extracted
+
+    def update(self, path: str, content: Optional[bytes], language: str,
+               hunks: List[Hunk] = None, old_content: bytes = None) -> Tuple:
+        """
+        Update the state of a changed file
+
+        Args:
+            path (str): key of the file
+            content (bytes): new content, None if the file was deleted
+            language (str): language of the file
+            hunks (List[Hunk]): hunks of the diff from the previous content,
+                None to compare the contents (see `content_edits`)
+            old_content (bytes): previous content, parsed if the file has no
+                state yet (None: the file is new)
+        Return:
+            Tuple: old and new units of the file, and the ones to compare
+                (None for all of them), see `records`
+        """
+        state = self.states.pop(path, None)
+        if content is None:
+            return state.units if state else [], [], None, None
+        if state is None and old_content is not None:
+            state = self._parse(old_content, language)
+        touched = extracted = None
+        if state is None or not self.incremental:
+            new_state = self._parse(content, language)
+        else:
+            starts = line_starts(content)
+            if hunks is None:
+                edits = content_edits(state.content, content)
+            else:
+                edits = hunk_edits(hunks, state.starts, len(state.content), starts, len(content))
+            new_state, touched, extracted = self._reparse(state, content, starts, edits, language)
+        self.stats['units'] += len(new_state.units)
+        self.states[path] = new_state
+        return state.units if state else [], new_state.units, touched, extracted
+
+    @classmethod
+    def records(cls, old_units: List[Dict], new_units: List[Dict],
+                touched: List[Dict] = None, extracted: List[Dict] = None) -> Iterator[Dict]:
+        """
+        Compare two versions of a file, only the `touched` old units and the
+        `extracted` new ones (ranks are among all the units of a version)
+
+        Yield:
+            Dict: `change` (`add`, `modify` or `delete`), the identity
+                (`kind`, `class`, `identifier`, `rank`), `old_span` /
+                `new_span` ([start point, end point], None on the missing
+                side), `sha1` and `code` of the new version (None for a deletion)
+        """
+        old = unit_identities(old_units)
+        new = unit_identities(new_units)
+        extracted = None if extracted is None else {id(unit) for unit in extracted}
+        touched = None if touched is None else {id(unit) for unit in touched}
+        for identity, unit in new.items():
+            if extracted is not None and id(unit) not in extracted:
+                continue
+            previous = old.get(identity)
+            if previous is not None and previous['sha1'] == unit['sha1']:
+                continue
+            yield cls._record('add' if previous is None else 'modify', identity, previous, unit)
+        for identity, unit in old.items():
+            if touched is not None and id(unit) not in touched:
+                continue
+            if identity not in new:
+                yield cls._record('delete', identity, unit, None)
+
+    @staticmethod
+    def _record(change: str, identity: Tuple, old: Optional[Dict], new: Optional[Dict]) -> Dict:
+        kind, class_name, identifier, rank = identity
+        return {
+            'change': change, 'kind': kind, 'class': class_name, 'identifier': identifier, 'rank': rank,
+            'old_span': [old['start_point'], old['end_point']] if old else None,
+            'new_span': [new['start_point'], new['end_point']] if new else None,
+            'sha1': new['sha1'] if new else None, 'code': new['code'] if new else None,
+        }
+
+
+class HistoryWalker(UnitTracker):
+    """
+    Args:
+        repo_path (str): local git repository
+        language (str): only extract this language (key of `PL_MATCHING`)
+        incremental (bool): reuse the previous tree of each path, False
+            re-parses and re-extracts the whole file at every change (the
+            baseline of `codetext bench history`)
+    """
+    def __init__(self, repo_path: str, language: str = None, incremental: bool = True):
+        super().__init__(classes=False, incremental=incremental)
+        self.repo = GitRepo(repo_path)
+        self.language = language
+        self.stats.update(commits=0, changed_files=0, records=0)
+
+    def path_language(self, path: str) -> Optional[str]:
+        language = get_file_language(path)
+        if self.language and language != self.language:
+            return None
+        return language
+
+    def walk(self, revision: str = 'HEAD', paths: List[str] = None) -> Iterator[Dict]:
+        """
+        Changed functions of every commit of the first-parent history of a
+        revision, oldest first
+
+        Args:
+            revision (str): revision or range (e.g. `v1.0..main`), files
+                existing before the range are read from the first parent
+            paths (List[str]): only walk these paths (pathspecs)
+        Yield:
+            Dict: `commit`, `parent`, `path`, `language` and the change of a
+                function (see `UnitTracker.records`)
+        """
+        with self.repo.blob_reader() as reader:
+            for commit in self.repo.log(revision, paths):
+                self.stats['commits'] += 1
+                for change in commit.changes:
+                    language = self.path_language(change.path)
+                    if language is None:
+                        continue
+                    self.stats['changed_files'] += 1
+                    try:
+                        content = reader.read(change.new_blob) if change.new_blob else None
+                        old_content = None
+                        if change.path not in self.states and change.old_blob:
+                            # changed before the walked range
+                            old_content = reader.read(change.old_blob)
+                        compared = self.update(change.path, content, language,
+                                               commit.hunks.get(change.path), old_content)
+                    except Exception as e:
+                        logger.warning(f"Failed to extract {change.path} at {commit.commit}: {e!r}")
+                        self.states.pop(change.path, None)
+                        continue
+                    for record in self.records(*compared):
+                        self.stats['records'] += 1
+                        yield dict(record, commit=commit.commit, parent=commit.parent,
+                                   path=change.path, language=language)
+
+
+def get_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='codetext history',
+        description='Function changes of every commit of a local git repository')
+    parser.add_argument('repo', help='Path of the git repository')
+    parser.add_argument('revision', nargs='?', default='HEAD',
+                        help='Revision or range to walk (default HEAD, e.g. v1.0..main)')
+    parser.add_argument('-o', '--output_file',
+                        help='JSONL file of the change records (default stdout)')
+    parser.add_argument('-l', '--language',
+                        help='Only process this language')
+    parser.add_argument('--paths', nargs='+',
+                        help='Only walk these paths')
+    parser.add_argument('--full', action='store_true',
+                        help='Re-parse whole files at every change instead of reusing their previous tree')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    opt = get_args(argv)
+    if opt.language and opt.language not in PL_MATCHING.keys():
+        raise ValueError(
+            "{language} not supported. Currently support {sp_language}"
+            .format(language=opt.language, sp_language=list(PL_MATCHING.keys())))
+
+    walker = HistoryWalker(opt.repo, opt.language, incremental=not opt.full)
+    _write_jsonl(walker.walk(opt.revision, opt.paths), opt.output_file)
+    logger.info("{commits} commits, {changed_files} changed files ({incremental_parses} incremental "
+                "parses, {full_parses} full), {extracted_units} functions extracted, "
+                "{records} change records".format(**walker.stats))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,312 @@
+"""`codetext incremental`: function and class changes between two revisions
+
+Repositories are re-extracted after every push, while most of their files did
+not change. Only the blobs changed between the two revisions (see
+`GitRepo.diff`, or `GitRepo.diff_index` to compare a revision to the staged
+content) are considered, and each blob is parsed at most once: the
+extraction of a blob is kept in a `ResultStore` keyed by its blob id, so the
+old side of a change (extracted by the previous run) and unchanged blobs of a
+snapshot are served from the store.
+
+Each changed blob is extracted into units (classes, methods and functions,
+see `extract_units`), the units of both sides are matched by identity (kind,
+class, identifier and rank among homonyms) and compared by the hash of their
+code, which gives one `add`, `modify` or `delete` record per changed unit.
+Everything runs on the local repository, offline.
+"""
+import os
+import json
+import hashlib
+import logging
+import argparse
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..utils import parse_code
+from ..parser import SourceText
+from ..codetext_cli import get_language_parser, get_file_language, PL_MATCHING
+from .gitrepo import GitRepo
+
+
+logger = logging.getLogger(__name__)
+
+# Bumped when the content of the units changes, older store entries are ignored
+EXTRACTOR_VERSION = 1
+
+UNIT_KINDS = ('class', 'method', 'function')
+
+
+def _unit(kind: str, class_name: Optional[str], metadata: Dict, node, source: SourceText) -> Dict:
+    code = source.get_node_text(node)
+    return dict(
+        metadata, kind=kind, **{'class': class_name},
+        start_point=list(node.start_point), end_point=list(node.end_point),
+        code=code, sha1=hashlib.sha1(code.encode('utf-8')).hexdigest(),
+    )
+
+
+def extract_units(root_node, source: SourceText, language: str) -> List[Dict]:
+    """
+    List the classes, methods (of their innermost class) and stand-alone
+    functions of a parsed file
+
+    Args:
+        root_node (tree_sitter.Node): root of the tree of `source`
+        source (SourceText): source of the tree
+        language (str): language name
+    Return:
+        List[Dict]: metadata (see `get_function_metadata`) with `kind`,
+            `class`, `start_point`, `end_point`, `code` and `sha1` (of the code)
+    """
+    parser = get_language_parser(language)
+    units = []
+    method_class = {}
+    for class_node in parser.get_class_list(root_node):
+        metadata = parser.get_class_metadata(class_node)
+        units.append(_unit('class', None, metadata, class_node, source))
+        # classes are listed in pre-order, the innermost class wins
+        for method in parser.get_function_list(class_node):
+            method_class[method] = metadata['identifier']
+    for function in parser.get_function_list(root_node):
+        class_name = method_class.get(function)
+        kind = 'function' if class_name is None else 'method'
+        units.append(_unit(kind, class_name, parser.get_function_metadata(function), function, source))
+    return units
+
+
+def extract_source_units(content: bytes, language: str) -> List[Dict]:
+    """Parse a source and list its units, see `extract_units`"""
+    source = SourceText(content)
+    root_node = parse_code(source.source, language.lower()).root_node
+    return extract_units(root_node, source, language)
+
+
+def unit_identities(units: Iterable[Dict]) -> Dict[Tuple, Dict]:
+    """
+    Key the units by identity: (kind, class, identifier, rank), the rank
+    tells homonyms (overloads, redefinitions) apart in source order
+    """
+    identities = {}
+    ranks = {}
+    for unit in units:
+        name = (unit['kind'], unit['class'], unit['identifier'])
+        rank = ranks[name] = ranks.get(name, -1) + 1
+        identities[name + (rank,)] = unit
+    return identities
+
+
+def diff_units(old_units: List[Dict], new_units: List[Dict]) -> Iterator[Tuple[str, Dict, Dict]]:
+    """
+    Match the units of two versions of a file
+
+    Yield:
+        Tuple[str, Dict, Dict]: (`add`, `modify` or `delete`, old unit, new
+            unit), the missing side is None, unchanged units are not yielded
+    """
+    old = unit_identities(old_units)
+    new = unit_identities(new_units)
+    for identity, unit in new.items():
+        previous = old.get(identity)
+        if previous is None:
+            yield 'add', None, unit
+        elif previous['sha1'] != unit['sha1']:
+            yield 'modify', previous, unit
+    for identity, unit in old.items():
+        if identity not in new:
+            yield 'delete', unit, None
+
+
+class ResultStore:
+    """
+    Units of already extracted blobs, one JSON file per (language, blob id):
+    `<directory>/v<EXTRACTOR_VERSION>/<language>/<blob[:2]>/<blob[2:]>.json`
+
+    Args:
+        directory (str): root directory of the store
+    """
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, blob: str, language: str) -> str:
+        return os.path.join(self.directory, f'v{EXTRACTOR_VERSION}', language.lower(),
+                            blob[:2], blob[2:] + '.json')
+
+    def get(self, blob: str, language: str) -> Optional[List[Dict]]:
+        try:
+            with open(self._path(blob, language), 'r', encoding='utf-8') as f:
+                units = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return units
+
+    def put(self, blob: str, language: str, units: List[Dict]):
+        path = self._path(blob, language)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # written aside then renamed, readers never see a partial entry
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(units, f)
+        os.replace(temp_path, path)
+
+
+class IncrementalExtractor:
+    """
+    Args:
+        repo_path (str): local git repository
+        store_dir (str): directory of the `ResultStore` (default
+            `<git dir>/codetext/blobs`)
+        language (str): only extract this language (key of `PL_MATCHING`)
+    """
+    def __init__(self, repo_path: str, store_dir: str = None, language: str = None):
+        self.repo = GitRepo(repo_path)
+        self.store = ResultStore(store_dir or os.path.join(self.repo.git_dir, 'codetext', 'blobs'))
+        self.language = language
+        self.stats = {'changed_paths': 0, 'parsed_blobs': 0, 'stored_blobs': 0, 'records': 0}
+
+    def path_language(self, path: str) -> Optional[str]:
+        language = get_file_language(path)
+        if self.language and language != self.language:
+            return None
+        return language
+
+    def get_units(self, blobs: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], List[Dict]]:
+        """
+        Units of (blob id, language) pairs, from the store or parsed (blobs
+        read from one `git cat-file` process) and stored
+
+        Return:
+            Dict[Tuple[str, str], List[Dict]]: (blob id, language) -> units
+        """
+        results = {}
+        missing = {}
+        for blob, language in set(blobs):
+            units = self.store.get(blob, language)
+            if units is None:
+                missing.setdefault(blob, []).append(language)
+            else:
+                self.stats['stored_blobs'] += 1
+                results[blob, language] = units
+        for blob, content in self.repo.cat_blobs(sorted(missing)):
+            for language in missing[blob]:
+                try:
+                    units = extract_source_units(content, language)
+                except Exception as e:
+                    logger.warning(f"Failed to extract blob {blob} ({language}): {e!r}")
+                    units = []
+                self.stats['parsed_blobs'] += 1
+                self.store.put(blob, language, units)
+                results[blob, language] = units
+        return results
+
+    def diff(self, old: str, new: Optional[str] = 'HEAD') -> Iterator[Dict]:
+        """
+        Changed units between two revisions
+
+        Args:
+            old (str): old revision, None for the empty tree (everything added)
+            new (str): new revision, None for the index (`git ls-files -s`)
+        Yield:
+            Dict: `change` (`add`, `modify` or `delete`), `kind`, `class`,
+                `identifier`, `path`, `language`, revisions (the new one is
+                None for the index) and blob ids of both sides, and the
+                `old` / `new` units (None if missing)
+        """
+        old_commit = self.repo.resolve(old) if old else None
+        if new is None:
+            new_commit = None
+            changed = self.repo.diff_index(old_commit)
+        else:
+            new_commit = self.repo.resolve(new)
+            changed = self.repo.diff(old_commit, new_commit)
+        changes = [(change, language) for change in changed
+                   for language in [self.path_language(change.path)] if language]
+        self.stats['changed_paths'] += len(changes)
+        units = self.get_units(
+            (blob, language) for change, language in changes
+            for blob in (change.old_blob, change.new_blob) if blob
+        )
+        for change, language in changes:
+            old_units = units[change.old_blob, language] if change.old_blob else []
+            new_units = units[change.new_blob, language] if change.new_blob else []
+            for kind, old_unit, new_unit in diff_units(old_units, new_units):
+                unit = new_unit or old_unit
+                self.stats['records'] += 1
+                yield {
+                    'change': kind, 'kind': unit['kind'], 'class': unit['class'],
+                    'identifier': unit['identifier'], 'path': change.path, 'language': language,
+                    'old_revision': old_commit, 'new_revision': new_commit,
+                    'old_blob': change.old_blob, 'new_blob': change.new_blob,
+                    'old': old_unit, 'new': new_unit,
+                }
+
+    def snapshot(self, revision: Optional[str] = 'HEAD') -> Iterator[Dict]:
+        """
+        Units of every supported file of a revision (None for the index),
+        unchanged blobs are served from the store
+
+        Yield:
+            Dict: `path`, `language`, `blob` and `units`
+        """
+        tree = self.repo.ls_files() if revision is None else self.repo.ls_tree(self.repo.resolve(revision))
+        files = [(path, blob, language) for path, blob in sorted(tree.items())
+                 for language in [self.path_language(path)] if language]
+        units = self.get_units((blob, language) for _, blob, language in files)
+        for path, blob, language in files:
+            yield {'path': path, 'language': language, 'blob': blob, 'units': units[blob, language]}
+
+
+def get_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='codetext incremental',
+        description='Function and class changes between two revisions of a local git repository')
+    parser.add_argument('repo', help='Path of the git repository')
+    parser.add_argument('old', help='Old revision (commit, branch, tag, ...), "" for the empty tree')
+    parser.add_argument('new', nargs='?', default='HEAD', help='New revision (default HEAD)')
+    parser.add_argument('--index', action='store_true',
+                        help='Compare the old revision to the index (staged content) instead of a new revision')
+    parser.add_argument('-o', '--output_file',
+                        help='JSONL file of the change records (default stdout)')
+    parser.add_argument('--snapshot',
+                        help='Also write the units of every file of the new revision to this JSONL file')
+    parser.add_argument('--store',
+                        help='Directory of the blob result store (default <git dir>/codetext/blobs)')
+    parser.add_argument('-l', '--language',
+                        help='Only process this language')
+    return parser.parse_args(argv)
+
+
+def _write_jsonl(records: Iterable[Dict], output_file: str = None):
+    f = open(output_file, 'w', encoding='utf-8') if output_file else None
+    try:
+        for record in records:
+            line = json.dumps(record)
+            if f is None:
+                print(line)
+            else:
+                f.write(line + '\n')
+    finally:
+        if f is not None:
+            f.close()
+
+
+def main(argv=None):
+    opt = get_args(argv)
+    if opt.language and opt.language not in PL_MATCHING.keys():
+        raise ValueError(
+            "{language} not supported. Currently support {sp_language}"
+            .format(language=opt.language, sp_language=list(PL_MATCHING.keys())))
+
+    extractor = IncrementalExtractor(opt.repo, opt.store, opt.language)
+    new = None if opt.index else opt.new
+    _write_jsonl(extractor.diff(opt.old or None, new), opt.output_file)
+    if opt.snapshot:
+        _write_jsonl(extractor.snapshot(new), opt.snapshot)
+    logger.info("{changed_paths} changed files, {parsed_blobs} blobs parsed, {stored_blobs} served "
+                "from the store, {records} change records".format(**extractor.stats))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""JSONL corpus input: one JSON record per source file
+
+The file is memory-mapped and split into byte ranges aligned to newlines
+(`split_ranges`), each worker parses the records of its own ranges
+(`iter_jsonl_range`), so no central reader decodes the corpus. Field names
+are configurable with `JsonlFields`.
+"""
+import os
+import mmap
+import json
+import logging
+from typing import Iterator, List, NamedTuple, Tuple
+
+from ..codetext_cli import get_file_language, PL_MATCHING
+
+
+logger = logging.getLogger(__name__)
+
+JSONL_EXTENSIONS = ('.jsonl',)
+
+
+class JsonlFields(NamedTuple):
+    """Names of the fields of a JSONL input record"""
+    content: str = 'content'
+    path: str = 'path'
+    language: str = 'language'
+    id: str = 'id'
+
+
+class JsonlRange(NamedTuple):
+    """Records of `path` whose line starts in `[start, end)`"""
+    path: str
+    start: int
+    end: int
+
+
+class JsonlSource(NamedTuple):
+    """
+    One input record: `key` identifies it in the checkpoint journal
+    (`<jsonl path>#id:<id>`, `<jsonl path>#off:<byte offset of the line>`
+    if it has no id)
+    """
+    key: str
+    id: object
+    path: str
+    language: str
+    content: bytes
+
+
+def is_jsonl(path: str) -> bool:
+    """Return True if `path` has a JSONL extension"""
+    return path.lower().endswith(JSONL_EXTENSIONS)
+
+
+def _open_mmap(f):
+    if os.fstat(f.fileno()).st_size == 0:
+        # empty files cannot be mapped
+        return b''
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def split_ranges(path: str, num_ranges: int) -> List[JsonlRange]:
+    """
+    Split a JSONL file into about `num_ranges` byte ranges of the same size,
+    each boundary is moved right after the next newline
+
+    Return:
+        List[JsonlRange]: disjoint ranges covering the whole file
+    """
+    with open(path, 'rb') as f:
+        data = _open_mmap(f)
+        size = len(data)
+        bounds = [0]
+        for index in range(1, max(1, num_ranges)):
+            position = max(size * index // num_ranges, bounds[-1])
+            newline = data.find(b'\n', position)
+            position = size if newline == -1 else newline + 1
+            if position >= size:
+                break
+            if position > bounds[-1]:
+                bounds.append(position)
+        bounds.append(size)
+        if isinstance(data, mmap.mmap):
+            data.close()
+    return [JsonlRange(path, start, end) for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+
+
+def _normalize_language(language: str) -> str:
+    for name in PL_MATCHING:
+        if name.lower() == str(language).lower():
+            return name
+    return None
+
+
+def iter_jsonl_range(task: JsonlRange, fields: JsonlFields = JsonlFields(),
+                     language: str = None) -> Iterator[Tuple[JsonlSource, str]]:
+    """
+    Parse the records of a byte range, the language is read from the
+    `language` field, or guessed from the `path` field
+
+    Args:
+        task (JsonlRange): byte range, see `split_ranges`
+        fields (JsonlFields): field names
+        language (str): only keep this language (key of `PL_MATCHING`)
+    Yield:
+        Tuple[JsonlSource, str]: (record, error), the record is None if the
+            line is not a valid record (error message), records of other or
+            unsupported languages are skipped
+    """
+    with open(task.path, 'rb') as f:
+        data = _open_mmap(f)
+        position = task.start
+        while position < task.end:
+            newline = data.find(b'\n', position, task.end)
+            line_end = task.end if newline == -1 else newline
+            line_start, position = position, line_end + 1
+            line = data[line_start:line_end]
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+                content = item[fields.content]
+                record_id = item.get(fields.id)
+                record_path = item.get(fields.path)
+                record_language = item.get(fields.language)
+                if not isinstance(content, (str, bytes)):
+                    raise TypeError(f"Expect `{fields.content}` to be a string, get {type(content)}")
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                yield None, f"{task.path}:{line_start}: {e!r}"
+                continue
+
+            if record_language is not None:
+                record_language = _normalize_language(record_language)
+            elif record_path is not None:
+                record_language = get_file_language(record_path)
+            if record_language is None:
+                continue
+            if language and record_language != language:
+                continue
+
+            if record_id is None:
+                key = '{}#off:{}'.format(task.path, line_start)
+            else:
+                key = '{}#id:{}'.format(task.path, record_id)
+            if isinstance(content, str):
+                content = content.encode('utf-8')
+            yield JsonlSource(key, record_id, record_path, record_language, content), None
+        if isinstance(data, mmap.mmap):
+            data.close()
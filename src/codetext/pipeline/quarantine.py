@@ -0,0 +1,75 @@
+"""Quarantine of pathological inputs
+
+Files exceeding their time budget (see `codetext.utils.deadline`), or
+crashing their worker twice (see `Supervisor`), are appended to a JSONL
+journal with their timings:
+
+    {"path": ..., "sha1": ..., "language": "JavaScript", "bytes": 4194304,
+     "stage": "parse", "budget": 10.0, "seconds": 10.02}
+
+`stage` is where the budget ran out (`parse`, `walk`, `extract`, `clean`), or
+`crash` / `rss` for the files killing their worker (`budget` is then None).
+
+Later runs load the journal and skip the quarantined contents by hash, whatever
+their path.
+"""
+import os
+import json
+import logging
+from typing import Dict
+
+
+logger = logging.getLogger(__name__)
+
+QUARANTINE_NAME = 'quarantine.jsonl'
+
+
+def quarantine_entry(path: str, sha1: str, language: str, size: int, stage: str,
+                     seconds: float, budget: float = None) -> Dict:
+    """Journal entry of a quarantined file"""
+    return {'path': path, 'sha1': sha1, 'language': language, 'bytes': size,
+            'stage': stage, 'budget': budget, 'seconds': seconds}
+
+
+class Quarantine:
+    """
+    Args:
+        path (str): journal file (e.g. `<output_dir>/quarantine.jsonl`)
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+
+    def load(self) -> Dict[str, Dict]:
+        """
+        Return:
+            Dict[str, Dict]: sha1 -> entry, empty if the journal does not exist
+        """
+        self.entries = {}
+        if not os.path.exists(self.path):
+            return self.entries
+        with open(self.path, 'rb') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    logger.warning(f"Ignore invalid entry in {self.path}")
+                    continue
+                self.entries[entry['sha1']] = entry
+        return self.entries
+
+    def add(self, entry: Dict):
+        """Append an entry, flushed right away"""
+        logger.warning("Quarantine {path}: {stage} after {seconds:.3f}s".format(**entry))
+        self.entries[entry['sha1']] = entry
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+
+    def __contains__(self, sha1: str) -> bool:
+        return sha1 in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
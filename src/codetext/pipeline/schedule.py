@@ -0,0 +1,68 @@
+"""Size-aware scheduling of `build_dataset` tasks
+
+Source sizes have a heavy tail (a few MB large generated files next to
+thousands of small files). Dispatched in walk order, a large file picked up at
+the end of the run keeps one worker busy while the others are idle.
+`schedule_by_size` stats every file up front and dispatches the largest first,
+so the run ends on small files, and packs small files into batch tasks (lists
+of tasks) to amortise the queue round trips.
+"""
+import os
+from typing import Iterator, List, Tuple, Union
+
+from .jsonl import JsonlRange
+
+
+# Batches of small files are closed at this many bytes
+DEFAULT_BATCH_BYTES = 256 * 1024
+
+
+def task_size(task) -> int:
+    """Input bytes of a task: `(path, language, content)` or `JsonlRange`"""
+    if isinstance(task, JsonlRange):
+        return task.end - task.start
+    path, _, content = task
+    if content is not None:
+        return len(content)
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        # reported by the worker
+        return 0
+
+
+def schedule_by_size(tasks: Iterator, batch_bytes: int = DEFAULT_BATCH_BYTES) -> Iterator[Union[Tuple, List]]:
+    """
+    Reorder tasks largest first and batch the small ones. Tasks already
+    holding their content (archive members) are not buffered, they are
+    dispatched as soon as they are read, while the files are listed.
+
+    Args:
+        tasks (Iterator): `(path, language, content)` tuples or `JsonlRange`
+        batch_bytes (int): files smaller than this are packed into batches
+            of about this size (0 disables batching)
+    Yield:
+        Tuple, JsonlRange or List: a task, or a batch (list) of small tasks
+    """
+    sized = []
+    for task in tasks:
+        if not isinstance(task, JsonlRange) and task[2] is not None:
+            yield task
+            continue
+        sized.append((task_size(task), task))
+    sized.sort(key=lambda item: item[0], reverse=True)
+
+    batch = []
+    batch_size = 0
+    for size, task in sized:
+        if size >= batch_bytes or isinstance(task, JsonlRange):
+            yield task
+            continue
+        batch.append(task)
+        batch_size += size
+        if batch_size >= batch_bytes:
+            yield batch
+            batch = []
+            batch_size = 0
+    if batch:
+        yield batch
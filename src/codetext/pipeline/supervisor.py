@@ -0,0 +1,306 @@
+"""Crash-isolated worker pool of `build_dataset`
+
+Every worker has its own task queue and result pipe, so a worker dying
+(native crash in tree-sitter, killed by the OOM killer, ...) cannot corrupt
+the channels of the others. Workers announce each item (file, archive member
+or JSONL record) before processing it, so the supervisor knows the item in
+flight when a worker dies or exceeds the RSS cap (`max_rss`). Then:
+
+    - the worker is replaced, the tasks queued to it are dispatched again
+    - the task in flight is retried in an isolated process (one task, no
+      other work), without the items already written
+    - an item crashing twice is quarantined (see `Quarantine`) and journaled
+      as an error, and the rest of its task goes on in isolation
+
+Workers are also recycled after `max_tasks_per_child` tasks, to bound the
+memory they slowly accumulate.
+
+Worker -> supervisor messages, on the pipe of the worker:
+    ('start', task_id, key, info)    item `key` started, info: sha1, language, bytes
+    ('file', task_id, result, progress)    result of an item, progress: see `on_report`
+    ('quarantine', entry)            item over its time budget
+    ('task', task_id)                task completed
+    ('done', report)                 final report, the worker exits
+"""
+import os
+import time
+import logging
+import multiprocessing.connection
+from collections import deque
+from typing import Callable, Dict, Iterator, List
+
+from ..utils.imports import module_available
+from .quarantine import quarantine_entry
+
+
+logger = logging.getLogger(__name__)
+
+# Seconds between liveness and memory checks of the workers
+POLL_INTERVAL = 0.5
+
+
+def get_rss(pid: int) -> int:
+    """Resident set size of a process in bytes, None if unknown"""
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if module_available('psutil'):
+        import psutil
+        try:
+            return psutil.Process(pid).memory_info().rss
+        except psutil.Error:
+            pass
+    return None
+
+
+class _Task:
+    __slots__ = ('task', 'done', 'attempts')
+
+    def __init__(self, task):
+        self.task = task
+        # keys of the items already written
+        self.done = set()
+        # crashes outside of any item
+        self.attempts = 0
+
+
+class _Slot:
+    """One worker process, its task queue and result pipe"""
+    def __init__(self, context, target: Callable, worker_options: Dict, isolated: bool = False):
+        self.task_queue = context.Queue()
+        self.conn, writer = context.Pipe(duplex=False)
+        self.process = context.Process(target=target, daemon=True,
+                                       args=(self.task_queue, writer, worker_options))
+        self.process.start()
+        # only the worker writes, the pipe reports EOF when it dies
+        writer.close()
+        self.isolated = isolated
+        self.outstanding = deque()
+        self.sent = 0
+        self.closing = False
+        self.finished = False
+        self.current = None
+        self.progress = None
+        self.kill_reason = None
+
+    def send(self, task_id: int, task, skip=frozenset()):
+        self.outstanding.append(task_id)
+        self.sent += 1
+        self.task_queue.put((task_id, task, frozenset(skip)))
+
+    def close(self):
+        if not self.closing:
+            self.closing = True
+            self.task_queue.put(None)
+
+
+class Supervisor:
+    """
+    Args:
+        context: multiprocessing context
+        target (Callable): worker entry point, called with
+            `(task_queue, conn, worker_options)`, see the module docstring
+        worker_options (Dict): options of the workers
+        num_workers (int): number of pool workers
+        max_tasks_per_child (int): recycle workers after this many tasks
+            (default never)
+        max_rss (int): kill and replace workers whose resident memory goes
+            above this many bytes (default no cap)
+        prefetch (int): tasks queued per worker
+    """
+    def __init__(self, context, target: Callable, worker_options: Dict, num_workers: int,
+                 max_tasks_per_child: int = None, max_rss: int = None, prefetch: int = 2):
+        self.context = context
+        self.target = target
+        self.worker_options = worker_options
+        self.num_workers = num_workers
+        self.max_tasks_per_child = max_tasks_per_child
+        self.max_rss = max_rss
+        self.prefetch = prefetch
+        self.counters = {'crashes': 0, 'retries': 0, 'recycled': 0}
+        # items and tasks given up, with the reason
+        self.skipped: List[Dict] = []
+        self._tasks: Dict[int, _Task] = {}
+        self._crashes: Dict[str, int] = {}
+        self._pending = deque()
+        self._isolation = deque()
+        self._slots: List[_Slot] = []
+
+    def run(self, tasks: Iterator, on_result: Callable, on_quarantine: Callable, on_report: Callable):
+        """
+        Process all the tasks
+
+        Args:
+            tasks (Iterator): tasks of the workers
+            on_result (Callable): called with each item result `(key, sha1,
+                records, error)`, also for the items given up
+            on_quarantine (Callable): called with each quarantine entry
+            on_report (Callable): called with the final report of each worker
+                (the last progress of a crashed one, without statistics)
+        """
+        self.on_result = on_result
+        self.on_quarantine = on_quarantine
+        self.on_report = on_report
+        tasks = iter(tasks)
+        next_id = 0
+        exhausted = False
+        last_check = time.monotonic()
+
+        while True:
+            if not exhausted or self._pending:
+                while len(self._pool()) < self.num_workers:
+                    self._slots.append(_Slot(self.context, self.target, self.worker_options))
+            # dispatch to the least loaded pool worker
+            while True:
+                ready = [slot for slot in self._pool() if len(slot.outstanding) < self.prefetch]
+                if not ready:
+                    break
+                slot = min(ready, key=lambda slot: len(slot.outstanding))
+                if self.max_tasks_per_child and slot.sent >= self.max_tasks_per_child:
+                    self.counters['recycled'] += 1
+                    slot.close()
+                    continue
+                if self._pending:
+                    task_id = self._pending.popleft()
+                elif not exhausted:
+                    task = next(tasks, None)
+                    if task is None:
+                        exhausted = True
+                        break
+                    task_id, next_id = next_id, next_id + 1
+                    self._tasks[task_id] = _Task(task)
+                else:
+                    break
+                slot.send(task_id, self._tasks[task_id].task, self._tasks[task_id].done)
+            # one isolated retry at a time
+            if self._isolation and not any(slot.isolated for slot in self._slots):
+                task_id = self._isolation.popleft()
+                self.counters['retries'] += 1
+                slot = _Slot(self.context, self.target, self.worker_options, isolated=True)
+                slot.send(task_id, self._tasks[task_id].task, self._tasks[task_id].done)
+                slot.close()
+                self._slots.append(slot)
+
+            if exhausted and not self._pending:
+                for slot in self._pool():
+                    if not slot.outstanding:
+                        slot.close()
+            if not self._slots and not self._isolation:
+                break
+
+            handles = [slot.conn for slot in self._slots] + [slot.process.sentinel for slot in self._slots]
+            for handle in multiprocessing.connection.wait(handles, timeout=POLL_INTERVAL):
+                for slot in list(self._slots):
+                    if handle is slot.conn:
+                        self._receive(slot)
+                    elif handle == slot.process.sentinel:
+                        self._exit(slot)
+            if self.max_rss and time.monotonic() - last_check > POLL_INTERVAL:
+                last_check = time.monotonic()
+                self._check_rss()
+
+    def _pool(self) -> List[_Slot]:
+        return [slot for slot in self._slots if not slot.isolated and not slot.closing]
+
+    def _receive(self, slot: _Slot):
+        while slot in self._slots and slot.conn.poll():
+            try:
+                message = slot.conn.recv()
+            except (EOFError, OSError):
+                self._exit(slot)
+                return
+            self._handle(slot, message)
+
+    def _handle(self, slot: _Slot, message):
+        kind = message[0]
+        if kind == 'start':
+            _, task_id, key, info = message
+            slot.current = (task_id, key, info, time.monotonic())
+        elif kind == 'file':
+            _, task_id, result, slot.progress = message
+            slot.current = None
+            self._tasks[task_id].done.add(result[0])
+            self.on_result(result)
+        elif kind == 'quarantine':
+            self.on_quarantine(message[1])
+        elif kind == 'task':
+            task_id = message[1]
+            slot.outstanding.remove(task_id)
+            del self._tasks[task_id]
+        elif kind == 'done':
+            slot.finished = True
+            self.on_report(message[1])
+
+    def _exit(self, slot: _Slot):
+        """The worker process exited: drain its pipe, then handle a crash"""
+        while True:
+            try:
+                if not slot.conn.poll():
+                    break
+                self._handle(slot, slot.conn.recv())
+            except (EOFError, OSError):
+                break
+        slot.process.join()
+        slot.conn.close()
+        self._slots.remove(slot)
+        if slot.finished:
+            return
+
+        self.counters['crashes'] += 1
+        reason = slot.kill_reason or f'crash (exit code {slot.process.exitcode})'
+        logger.warning(f"Worker {slot.process.pid} died: {reason}")
+        if slot.progress is not None:
+            self.on_report(dict(slot.progress, filter_stats=None, profile=None))
+        if not slot.outstanding:
+            return
+
+        # the item in flight, else the oldest task, is the suspect
+        if slot.current is not None and slot.current[0] in slot.outstanding:
+            task_id, key, info, started = slot.current
+            crashes = self._crashes[key] = self._crashes.get(key, 0) + 1
+            if crashes >= 2:
+                stage = 'crash' if slot.kill_reason is None else 'rss'
+                entry = quarantine_entry(key, info['sha1'], info['language'], info['bytes'],
+                                         stage, time.monotonic() - started)
+                entry['reason'] = reason
+                self.skipped.append(entry)
+                self.on_quarantine(entry)
+                self._tasks[task_id].done.add(key)
+                self.on_result((key, info['sha1'], [], True))
+        else:
+            task_id = slot.outstanding[0]
+            task = self._tasks[task_id]
+            task.attempts += 1
+            if task.attempts >= 2:
+                logger.warning(f"Give up task {task_id} after {task.attempts} crashes")
+                self.skipped.append({'path': _describe(task.task), 'sha1': None, 'stage': 'crash',
+                                     'reason': reason})
+                slot.outstanding.remove(task_id)
+                del self._tasks[task_id]
+                task_id = None
+
+        for other in slot.outstanding:
+            if other == task_id:
+                self._isolation.append(other)
+            else:
+                self._pending.appendleft(other)
+
+    def _check_rss(self):
+        for slot in self._slots:
+            if slot.kill_reason is not None or slot.process.pid is None:
+                continue
+            rss = get_rss(slot.process.pid)
+            if rss is not None and rss > self.max_rss:
+                slot.kill_reason = f'RSS {rss >> 20} MB above the cap of {self.max_rss >> 20} MB'
+                slot.process.kill()
+
+
+def _describe(task) -> str:
+    if isinstance(task, list):
+        return ', '.join(_describe(item) for item in task)
+    if isinstance(task, tuple) and len(task) == 3 and not isinstance(task[1], int):
+        return task[0]
+    # JsonlRange
+    return '{}[{}:{}]'.format(*task)
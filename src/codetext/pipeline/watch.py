@@ -0,0 +1,342 @@
+"""`codetext watch`: keep the extraction of a working tree up to date
+
+The tree is polled (stat of every supported file, hidden directories are
+skipped); when `watchdog` is installed its inotify (or platform) observer
+wakes the polling loop as soon as something changes, otherwise the stdlib
+polling runs every `interval` seconds.
+
+The daemon is a `UnitTracker`: parsers stay loaded and the content, tree and
+units of every file are kept. A changed file is reparsed incrementally from
+its previous tree (the edit is the range between the common prefix and
+suffix of both contents, see `content_edits`) and only its units touching
+the edit are re-extracted. The changed functions, methods and classes are
+pushed as `add`, `modify` or `delete` records to a JSONL stream and/or to the
+clients of a local (Unix) socket, which first receive the current units.
+
+The latency of every update is kept: processing time (read, reparse,
+extract, publish) and delay since the modification time of the file.
+"""
+import os
+import sys
+import json
+import time
+import socket
+import logging
+import argparse
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from ..utils.imports import module_available
+from ..codetext_cli import get_file_language, PL_MATCHING
+from .history import UnitTracker
+
+
+logger = logging.getLogger(__name__)
+
+# Seconds between two scans of the tree
+DEFAULT_INTERVAL = 0.5
+
+
+def scan_tree(root: str, language: str = None) -> Dict[str, Tuple[int, int]]:
+    """
+    Stat the supported files of a tree, hidden directories (`.git`, ...)
+    are skipped
+
+    Return:
+        Dict[str, Tuple[int, int]]: path relative to `root` -> (mtime in ns, size)
+    """
+    files = {}
+    for directory, names, file_names in os.walk(root):
+        names[:] = [name for name in names if not name.startswith('.')]
+        for name in file_names:
+            file_language = get_file_language(name)
+            if file_language is None or (language and file_language != language):
+                continue
+            path = os.path.join(directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files[os.path.relpath(path, root)] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+def percentile(values: List[float], ratio: float) -> float:
+    """Nearest-rank percentile of unsorted values, None if empty"""
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(ratio * len(values)))]
+
+
+class JsonlPublisher:
+    """
+    Write the records as JSON lines, flushed after every update
+
+    Args:
+        stream: text file object (e.g. `sys.stdout`)
+    """
+    def __init__(self, stream):
+        self.stream = stream
+
+    def publish(self, records: List[Dict]):
+        for record in records:
+            self.stream.write(json.dumps(record) + '\n')
+        self.stream.flush()
+
+    def close(self):
+        if self.stream not in (sys.stdout, sys.stderr):
+            self.stream.close()
+
+
+class SocketPublisher:
+    """
+    Serve the records as JSON lines on a Unix socket: a client connecting
+    first receives the current units (`snapshot`), then every update
+
+    Args:
+        path (str): socket path, a stale socket is replaced
+        snapshot (Callable[[], Iterable[Dict]]): records of the current units
+        lock (threading.Lock): held by the caller while publishing, a client
+            does not miss (or repeat) an update sent during its snapshot
+    """
+    def __init__(self, path: str, snapshot: Callable[[], Iterable[Dict]], lock: threading.Lock):
+        self.path = path
+        self.snapshot = snapshot
+        self.lock = lock
+        self.clients: List[socket.socket] = []
+        if os.path.exists(path):
+            os.remove(path)
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(path)
+        self.server.listen()
+        self.thread = threading.Thread(target=self._accept, daemon=True)
+        self.thread.start()
+
+    def _accept(self):
+        while True:
+            try:
+                client, _ = self.server.accept()
+            except OSError:
+                # the server was closed
+                return
+            with self.lock:
+                data = ''.join(json.dumps(record) + '\n' for record in self.snapshot())
+                try:
+                    client.sendall(data.encode('utf-8'))
+                except OSError:
+                    client.close()
+                    continue
+                self.clients.append(client)
+
+    def publish(self, records: List[Dict]):
+        data = ''.join(json.dumps(record) + '\n' for record in records).encode('utf-8')
+        for client in list(self.clients):
+            try:
+                client.sendall(data)
+            except OSError:
+                # disconnected
+                self.clients.remove(client)
+                client.close()
+
+    def close(self):
+        self.server.close()
+        for client in self.clients:
+            client.close()
+        self.clients = []
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class _Wakeup:
+    """Wake the polling loop on file system events, if `watchdog` is installed"""
+    def __init__(self, root: str):
+        self.event = threading.Event()
+        self.observer = None
+        if module_available('watchdog'):
+            from watchdog.observers import Observer
+            from watchdog.events import FileSystemEventHandler
+
+            event = self.event
+
+            class Handler(FileSystemEventHandler):
+                def on_any_event(self, _):
+                    event.set()
+
+            self.observer = Observer()
+            self.observer.schedule(Handler(), root, recursive=True)
+            self.observer.start()
+
+    def wait(self, timeout: float):
+        self.event.wait(timeout)
+        self.event.clear()
+
+    def close(self):
+        if self.observer is not None:
+            self.observer.stop()
+            self.observer.join()
+
+
+class WatchDaemon(UnitTracker):
+    """
+    Args:
+        root (str): directory to watch
+        language (str): only extract this language (key of `PL_MATCHING`)
+        incremental (bool): reuse the previous tree of each file, False
+            re-parses and re-extracts the whole file at every change
+        publishers (List): receivers of the records of each update, with a
+            `publish(records)` method (see `JsonlPublisher`, `SocketPublisher`)
+    """
+    def __init__(self, root: str, language: str = None, incremental: bool = True, publishers: List = None):
+        super().__init__(classes=True, incremental=incremental)
+        self.root = os.path.abspath(root)
+        self.language = language
+        self.publishers = list(publishers or [])
+        self.files: Dict[str, Tuple[int, int]] = {}
+        self.lock = threading.Lock()
+        # per update after the first scan: processing seconds and delay since
+        # the modification of the file
+        self.latencies: List[Dict] = []
+        self.stats.update(scans=0, updates=0, records=0)
+
+    def snapshot(self) -> Iterable[Dict]:
+        """`add` records of the current units of every file"""
+        for path, state in sorted(self.states.items()):
+            language = get_file_language(path)
+            for record in self.records([], state.units):
+                yield dict(record, path=path, language=language)
+
+    def _read(self, path: str) -> Optional[bytes]:
+        try:
+            with open(os.path.join(self.root, path), 'rb') as f:
+                return f.read()
+        except OSError:
+            # deleted since the scan
+            return None
+
+    def _update_file(self, path: str, content: Optional[bytes]) -> List[Dict]:
+        language = get_file_language(path)
+        try:
+            compared = self.update(path, content, language)
+        except Exception as e:
+            logger.warning(f"Failed to extract {path}: {e!r}")
+            self.states.pop(path, None)
+            return []
+        return [dict(record, path=path, language=language) for record in self.records(*compared)]
+
+    def poll(self) -> List[Dict]:
+        """
+        Scan the tree once, update the changed files and publish their
+        records (one `publish` per file)
+
+        Return:
+            List[Dict]: published records
+        """
+        files = scan_tree(self.root, self.language)
+        changed = sorted([path for path, signature in files.items() if self.files.get(path) != signature]
+                         + [path for path in self.files if path not in files])
+        first_scan = self.stats['scans'] == 0
+        self.stats['scans'] += 1
+        published = []
+        for path in changed:
+            start = time.perf_counter()
+            content = self._read(path) if path in files else None
+            state = self.states.get(path)
+            if state is not None and state.content == content:
+                # touched, not changed
+                continue
+            with self.lock:
+                records = self._update_file(path, content)
+                if records:
+                    for publisher in self.publishers:
+                        publisher.publish(records)
+            self.stats['updates'] += 1
+            self.stats['records'] += len(records)
+            published.extend(records)
+            if not first_scan:
+                latency = {'path': path, 'records': len(records), 'seconds': time.perf_counter() - start}
+                if content is not None:
+                    latency['delay'] = time.time() - files[path][0] / 1e9
+                self.latencies.append(latency)
+                logger.debug(f"{path}: {len(records)} records in {latency['seconds'] * 1000:.1f}ms")
+        self.files = files
+        return published
+
+    def latency_summary(self) -> Dict:
+        """
+        Return:
+            Dict: number of `updates` (after the first scan), median, 95th
+                percentile and maximum of the processing time and of the delay
+                since the modification, in milliseconds
+        """
+        seconds = [latency['seconds'] * 1000 for latency in self.latencies]
+        delays = [latency['delay'] * 1000 for latency in self.latencies if 'delay' in latency]
+        return {
+            'updates': len(self.latencies),
+            'p50_ms': percentile(seconds, 0.5), 'p95_ms': percentile(seconds, 0.95),
+            'max_ms': max(seconds) if seconds else None,
+            'delay_p50_ms': percentile(delays, 0.5), 'delay_p95_ms': percentile(delays, 0.95),
+        }
+
+    def run(self, interval: float = DEFAULT_INTERVAL, stop: threading.Event = None):
+        """
+        Poll until `stop` is set (forever if None)
+
+        Args:
+            interval (float): seconds between two scans without file system events
+            stop (threading.Event): stop signal
+        """
+        stop = stop or threading.Event()
+        wakeup = _Wakeup(self.root)
+        try:
+            while not stop.is_set():
+                self.poll()
+                wakeup.wait(interval)
+        finally:
+            wakeup.close()
+
+
+def get_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='codetext watch',
+        description='Keep the function and class extraction of a working tree up to date')
+    parser.add_argument('root', help='Directory to watch')
+    parser.add_argument('-l', '--language',
+                        help='Only process this language')
+    parser.add_argument('-o', '--output_file',
+                        help='Append the records to this JSONL file (default stdout, unless --socket)')
+    parser.add_argument('--socket',
+                        help='Also serve the records on this Unix socket')
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL,
+                        help='Seconds between two scans of the tree')
+    parser.add_argument('--full', action='store_true',
+                        help='Re-parse whole files at every change instead of reusing their previous tree')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    opt = get_args(argv)
+    if opt.language and opt.language not in PL_MATCHING.keys():
+        raise ValueError(
+            "{language} not supported. Currently support {sp_language}"
+            .format(language=opt.language, sp_language=list(PL_MATCHING.keys())))
+
+    daemon = WatchDaemon(opt.root, opt.language, incremental=not opt.full)
+    if opt.output_file:
+        daemon.publishers.append(JsonlPublisher(open(opt.output_file, 'a', encoding='utf-8')))
+    elif not opt.socket:
+        daemon.publishers.append(JsonlPublisher(sys.stdout))
+    if opt.socket:
+        daemon.publishers.append(SocketPublisher(opt.socket, daemon.snapshot, daemon.lock))
+    try:
+        daemon.run(opt.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for publisher in daemon.publishers:
+            publisher.close()
+    print(f"Update latency: {json.dumps(daemon.latency_summary())}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
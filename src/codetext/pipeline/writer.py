@@ -0,0 +1,101 @@
+"""Sharded JSONL output"""
+import os
+import json
+from typing import Dict, Iterable, List, Tuple
+
+
+class ShardWriter:
+    """
+    Write records to `<output_dir>/<prefix>-00000.jsonl`, `...-00001.jsonl`,
+    rolling to a new shard every `shard_size` records
+
+    .. code-block:: python
+
+        with ShardWriter('output/', shard_size=1000) as writer:
+            writer.write_many(records)
+
+    Args:
+        output_dir (str): output directory
+        shard_size (int): records per shard
+        prefix (str): shard file prefix
+        position (Tuple[int, int, int]): resume after `position()` of a previous
+            writer, shards are truncated to it and later shards are removed
+    """
+    def __init__(self, output_dir: str, shard_size: int = 100000, prefix: str = 'data',
+                 position: Tuple[int, int, int] = None):
+        assert shard_size > 0, "`shard_size` must be positive"
+        os.makedirs(output_dir, exist_ok=True)
+        self.output_dir = output_dir
+        self.shard_size = shard_size
+        self.prefix = prefix
+        self.shards: List[str] = []
+        self.num_records = 0
+        self._file = None
+        self._shard_records = 0
+        if position is not None:
+            self._restore(position)
+
+    def shard_path(self, index: int) -> str:
+        return os.path.join(self.output_dir, '{}-{:05d}.jsonl'.format(self.prefix, index))
+
+    def _restore(self, position: Tuple[int, int, int]):
+        shard, offset, shard_records = position
+        self.shards = [self.shard_path(index) for index in range(shard + 1)]
+        # drop what was written after the position
+        index = shard + 1
+        while os.path.exists(self.shard_path(index)):
+            os.remove(self.shard_path(index))
+            index += 1
+        if shard < 0:
+            return
+        self._file = open(self.shards[-1], 'a+b')
+        self._file.truncate(offset)
+        self._file.seek(offset)
+        self._shard_records = shard_records
+
+    def _open_next(self):
+        if self._file is not None:
+            self._file.close()
+        path = self.shard_path(len(self.shards))
+        self._file = open(path, 'wb')
+        self._shard_records = 0
+        self.shards.append(path)
+
+    def write(self, record: Dict):
+        if self._file is None or self._shard_records >= self.shard_size:
+            self._open_next()
+        self._file.write((json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8'))
+        self._shard_records += 1
+        self.num_records += 1
+
+    def write_many(self, records: Iterable[Dict]):
+        for record in records:
+            self.write(record)
+
+    def position(self) -> Tuple[int, int, int]:
+        """
+        Return:
+            Tuple[int, int, int]: (current shard index, byte offset, number of
+                records in the shard), (-1, 0, 0) before the first write
+        """
+        if self._file is None:
+            return (len(self.shards) - 1, 0, self._shard_records)
+        return (len(self.shards) - 1, self._file.tell(), self._shard_records)
+
+    def flush(self, fsync: bool = False):
+        if self._file is not None:
+            self._file.flush()
+            if fsync:
+                os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
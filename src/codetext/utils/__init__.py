@@ -1,4 +1,4 @@
-from .utils import build_language, parse_code, SUPPORTED_LANGUAGE
+from .utils import build_language, parse_code, load_parser, SUPPORTED_LANGUAGE
 from .imports import module_available
 
-__all__ = ["build_languagem", "parse_code", "module_available"]
\ No newline at end of file
+__all__ = ["build_languagem", "parse_code", "load_parser", "module_available"]
\ No newline at end of file
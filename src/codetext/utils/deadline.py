@@ -0,0 +1,85 @@
+"""Per-file time budgets
+
+A deadline is set for the current thread with `deadline(seconds)`. It bounds
+`parse_code` through the parse timeout of tree-sitter, and the Python walkers
+and cleaners call `check_deadline` at their loop heads, so a pathological file
+raises `DeadlineExceeded` instead of blocking a worker. Without deadline,
+`check_deadline` costs a single attribute check.
+
+.. code-block:: python
+
+    from codetext.utils.deadline import deadline, DeadlineExceeded
+
+    try:
+        with deadline(5.0):
+            records = extract_records(content, 'javascript')
+    except DeadlineExceeded as e:
+        print(e.stage, e.elapsed)
+"""
+import time
+import threading
+from contextlib import contextmanager
+
+
+class DeadlineExceeded(TimeoutError):
+    """
+    Raised when the time budget of the current thread is exhausted
+
+    Args:
+        stage (str): where it was detected (e.g. `parse`, `walk`, `clean`)
+        budget (float): budget in seconds
+        elapsed (float): seconds spent since the deadline was set
+    """
+    def __init__(self, stage: str, budget: float, elapsed: float):
+        super().__init__(f"Time budget of {budget:.3f}s exceeded in {stage} after {elapsed:.3f}s")
+        self.stage = stage
+        self.budget = budget
+        self.elapsed = elapsed
+
+
+class _State(threading.local):
+    # (start, end) of the active deadline, or None
+    window = None
+
+
+_STATE = _State()
+
+
+@contextmanager
+def deadline(seconds: float):
+    """
+    Set a time budget for the current thread, nested budgets cannot extend the
+    enclosing one. `None` or 0 does not set a budget.
+    """
+    previous = _STATE.window
+    if seconds:
+        start = time.monotonic()
+        end = start + seconds
+        if previous is not None and previous[1] < end:
+            start, end = previous
+        _STATE.window = (start, end)
+    try:
+        yield
+    finally:
+        _STATE.window = previous
+
+
+def check_deadline(stage: str = 'walk'):
+    """Raise `DeadlineExceeded` if the budget of the current thread is exhausted"""
+    window = _STATE.window
+    if window is None:
+        return
+    now = time.monotonic()
+    if now > window[1]:
+        raise DeadlineExceeded(stage, window[1] - window[0], now - window[0])
+
+
+def remaining_micros() -> int:
+    """
+    Microseconds left before the deadline of the current thread (at least 1),
+    0 without deadline (the tree-sitter convention for no timeout)
+    """
+    window = _STATE.window
+    if window is None:
+        return 0
+    return max(1, int((window[1] - time.monotonic()) * 1e6))
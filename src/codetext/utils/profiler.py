@@ -0,0 +1,186 @@
+"""Stage-level timing instrumentation
+
+Stages (e.g. `parse_code`, `get_function_metadata`, `clean_docstring`) are
+timed per language, together with counters (files, bytes, functions, ...).
+Profiling is disabled by default: an instrumented call then costs a single
+attribute check. Stages may be nested (e.g. `get_docstring` calls
+`get_docstring_node`), so their times are inclusive and should not be summed.
+
+.. code-block:: python
+
+    from codetext.utils.profiler import PROFILER
+
+    PROFILER.enable()
+    parse_file('sample.py', 'python')
+    print(PROFILER.summary())
+"""
+import time
+import functools
+from typing import Dict
+
+
+ANY_LANGUAGE = 'any'
+
+
+class _NullStage:
+    """No-op context returned while profiling is disabled"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ('profiler', 'language', 'stage', 'start')
+
+    def __init__(self, profiler, language: str, stage: str):
+        self.profiler = profiler
+        self.language = language
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add_time(self.language, self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class _LanguageScope:
+    __slots__ = ('profiler', 'language', 'previous')
+
+    def __init__(self, profiler, language: str):
+        self.profiler = profiler
+        self.language = language
+
+    def __enter__(self):
+        self.previous = self.profiler.language
+        self.profiler.language = self.language
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.language = self.previous
+        return False
+
+
+class StageProfiler:
+    """
+    Aggregate stage timings and counters per language
+
+    Attributes:
+        enabled (bool): record or not
+        language (str): language of stages which do not know their language
+            (e.g. docstring cleaning), see `use_language`
+        timings (Dict): {language: {stage: [calls, seconds]}}
+        counters (Dict): {language: {name: value}}
+    """
+    def __init__(self):
+        self.enabled = False
+        self.language = None
+        self.timings = {}
+        self.counters = {}
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        self.timings = {}
+        self.counters = {}
+
+    def add_time(self, language: str, stage: str, seconds: float, calls: int = 1):
+        language = language or self.language or ANY_LANGUAGE
+        stages = self.timings.setdefault(language, {})
+        record = stages.get(stage)
+        if record is None:
+            stages[stage] = [calls, seconds]
+        else:
+            record[0] += calls
+            record[1] += seconds
+
+    def count(self, name: str, value: int = 1, language: str = None):
+        if not self.enabled:
+            return
+        language = language or self.language or ANY_LANGUAGE
+        counters = self.counters.setdefault(language, {})
+        counters[name] = counters.get(name, 0) + value
+
+    def stage(self, stage: str, language: str = None):
+        """
+        Time a block of code
+
+        .. code-block:: python
+
+            with PROFILER.stage('parse_code', 'python'):
+                tree = parse_code(content, 'python')
+        """
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, language, stage)
+
+    def use_language(self, language: str):
+        """Attribute stages without a language (e.g. cleaning) to `language`"""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _LanguageScope(self, str(language).lower() if language else None)
+
+    def summary(self) -> Dict:
+        """
+        Return:
+            Dict: {language: {"stages": {stage: {"calls", "seconds"}}, "counters": {...}}},
+                plain data that can be pickled or dumped as JSON
+        """
+        summary = {}
+        for language in sorted(set(self.timings) | set(self.counters)):
+            summary[language] = {
+                'stages': {
+                    stage: {'calls': calls, 'seconds': seconds}
+                    for stage, (calls, seconds) in self.timings.get(language, {}).items()
+                },
+                'counters': dict(self.counters.get(language, {})),
+            }
+        return summary
+
+    def merge(self, summary: Dict):
+        """Merge a `summary()` (e.g. from a worker process) into this profiler"""
+        for language, item in summary.items():
+            for stage, record in item['stages'].items():
+                self.add_time(language, stage, record['seconds'], record['calls'])
+            counters = self.counters.setdefault(language, {})
+            for name, value in item['counters'].items():
+                counters[name] = counters.get(name, 0) + value
+
+
+PROFILER = StageProfiler()
+
+
+def profile_stage(stage: str, language: str = None):
+    """
+    Decorator timing every call of a function as `stage`
+
+    Args:
+        stage (str): stage name
+        language (str): language used outside of a `PROFILER.use_language` scope
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not PROFILER.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                PROFILER.add_time(PROFILER.language or language, stage,
+                                  time.perf_counter() - start)
+        return wrapper
+    return decorator
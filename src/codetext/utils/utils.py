@@ -4,12 +4,15 @@ import sys
 import os
 import subprocess
 import logging
+import threading
 from pathlib import Path
 from typing import List, Dict, Any, Union
 
 import tree_sitter
 from tree_sitter import Language, Parser
 
+from .deadline import check_deadline, remaining_micros
+
 
 logger = logging.getLogger('utils')
 logging.basicConfig(level = logging.INFO)
@@ -68,44 +71,81 @@ def build_language(language: str, save_path: str=None):
         logger.info(f"Language already existed!")
         
     
-def parse_code(raw_code: str, language: str='Auto', tree_sitter_path: str=None) -> tree_sitter.Tree:
-    """
-    Auto parse raw code into `tree_sitter.Tree`
-    
-    Args:
-        raw_code (str): Raw source code need to parse
-        language (str): Language to load parser
-    """
-    # TODO: auto detect language
-    if language == 'Auto':
-        raise NotImplemented("This feature is underdevelopment")
+_LOCAL = threading.local()
+
+
+def _normalize_language(language: str) -> str:
     language = str(language).lower()
     if language == 'c#':
         language = 'c_sharp'
     elif language == 'c++':
         language = 'cpp'
     assert language in SUPPORTED_LANGUAGE, f"Expect {language} in {SUPPORTED_LANGUAGE}"
-    
-    if tree_sitter_path:
-        load_path = tree_sitter_path
-    else:
-        calling_script_path = Path(inspect.getframeinfo(sys._getframe(1)).filename)
-        load_path = str(calling_script_path.parent)
+    return language
+
+
+def load_parser(language: str, tree_sitter_path: str = None) -> Parser:
+    """
+    Get a `tree_sitter.Parser` of a language. Parsers (and their `Language`)
+    are built once and cached per thread (parsers are not thread safe)
+
+    Args:
+        language (str): java, python, cpp, c_sharp, etc
+        tree_sitter_path (str): directory of the `tree-sitter/` folder, used
+            when `tree-sitter-languages` is not available (default the
+            directory of the calling script)
+    Return:
+        tree_sitter.Parser
+    """
+    language = _normalize_language(language)
+    cache = getattr(_LOCAL, 'parsers', None)
+    if cache is None:
+        cache = _LOCAL.parsers = {}
+    parser = cache.get((language, tree_sitter_path))
+    if parser is not None:
+        return parser
 
     # Get parser from languages
     parser = Parser()
     try:
-        from tree_sitter_languages import get_language, get_parser
-        language = get_language(language)
+        from tree_sitter_languages import get_language
+        ts_language = get_language(language)
     except ImportError:
+        if tree_sitter_path:
+            load_path = tree_sitter_path
+        else:
+            # first frame outside of this module
+            frame = sys._getframe(1)
+            while frame.f_back is not None and frame.f_code.co_filename == __file__:
+                frame = frame.f_back
+            load_path = str(Path(inspect.getframeinfo(frame).filename).parent)
         # Work-around when pre-built binaries wheels for tree-sitter-languages are not available
         logger.warning(f"Troubled importing 'tree-sitter-languages', attemp to look for pre-built binaries in the workspace")    
         ts_lang_path = os.path.join(load_path, 'tree-sitter', f'{language}.so')
         if not os.path.exists(ts_lang_path):
             logger.warning(f"Not found `{language}.so` in `{load_path}/tree-sitter/`, attemp to build language")
             build_language(language, load_path)    
-        language = Language(load_path + f"/tree-sitter/{language}.so", language)
-    parser.set_language(language)
+        ts_language = Language(load_path + f"/tree-sitter/{language}.so", language)
+    parser.set_language(ts_language)
+    cache[(language, tree_sitter_path)] = parser
+    return parser
+
+
+def parse_code(raw_code: str, language: str='Auto', tree_sitter_path: str=None) -> tree_sitter.Tree:
+    """
+    Auto parse raw code into `tree_sitter.Tree`
+    
+    Args:
+        raw_code (str): Raw source code need to parse
+        language (str): Language to load parser
+    Raise:
+        DeadlineExceeded: the time budget of the thread (see
+            `codetext.utils.deadline`) ran out while parsing
+    """
+    # TODO: auto detect language
+    if language == 'Auto':
+        raise NotImplemented("This feature is underdevelopment")
+    parser = load_parser(language, tree_sitter_path)
     
     if isinstance(raw_code, str):
         raw_code = bytes(raw_code, 'utf8')
@@ -113,5 +153,16 @@ def parse_code(raw_code: str, language: str='Auto', tree_sitter_path: str=None)
         pass
     else:
         raise ValueError(f"Expect `str`, got {type(raw_code)}")
-    tree = parser.parse(raw_code)
-    return tree
+    timeout = remaining_micros()
+    if not timeout:
+        return parser.parse(raw_code)
+    parser.set_timeout_micros(timeout)
+    try:
+        return parser.parse(raw_code)
+    except ValueError:
+        # the parser keeps the state of the aborted parse, drop it
+        parser.reset()
+        check_deadline('parse')
+        raise
+    finally:
+        parser.set_timeout_micros(0)
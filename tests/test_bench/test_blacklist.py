@@ -0,0 +1,18 @@
+import unittest
+
+from src.codetext.bench import blacklist
+
+
+class Test_BlacklistBenchmark(unittest.TestCase):
+    def test_run(self):
+        result = blacklist.run(num_functions=10, test_ratio=0.8, repeat=1)
+        self.assertEqual(set(result['languages']), {'python', 'java', 'javascript'})
+        for item in result['languages'].values():
+            self.assertEqual(item['functions'], 10)
+            self.assertEqual(item['kept'], 2)
+        for key in ['legacy', 'early', 'extract_records']:
+            self.assertIn(key, result['total']['seconds'])
+
+
+if __name__ == '__main__':
+    unittest.main()
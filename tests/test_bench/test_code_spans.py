@@ -0,0 +1,16 @@
+import unittest
+
+from src.codetext.bench import code_spans
+
+
+class Test_CodeSpansBenchmark(unittest.TestCase):
+    def test_run(self):
+        result = code_spans.run(num_files=1, num_classes=2, num_methods=2, repeat=1)
+        self.assertEqual(set(result['corpora']), {'java_classes', 'samples'})
+        java = result['corpora']['java_classes']
+        self.assertEqual(java['files'], 1)
+        self.assertLess(java['output_mb']['spans'], java['output_mb']['code'])
+
+
+if __name__ == '__main__':
+    unittest.main()
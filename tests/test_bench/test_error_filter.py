@@ -0,0 +1,17 @@
+import unittest
+
+from src.codetext.bench import error_filter
+
+
+class Test_ErrorFilterBenchmark(unittest.TestCase):
+    def test_run(self):
+        result = error_filter.run(num_functions=4, body_lines=5, error_ratio=0.5, repeat=1)
+        self.assertEqual(set(result['languages']), {'python', 'java', 'javascript'})
+        for item in result['languages'].values():
+            self.assertEqual(item['functions'], 4)
+            self.assertEqual(item['kept'], 2)
+        self.assertIn('native', result['total']['seconds'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+
+from src.codetext.bench import cli, extraction
+from src.codetext.bench.corpus import load_samples, generate_corpus
+
+
+class Test_ExtractionBenchmark(unittest.TestCase):
+    def test_generate_corpus(self):
+        samples = load_samples()
+        self.assertIn('Python', samples)
+        self.assertIn('C#', samples)
+
+        corpus = generate_corpus(samples, num_files=3, repeat=2)
+        self.assertEqual(len(corpus['Python']), 3)
+        self.assertEqual(corpus['Python'][0], samples['Python'] + '\n' + samples['Python'])
+
+    def test_samples_outside_repo_root(self):
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as directory:
+            os.chdir(directory)
+            try:
+                self.assertIn('Python', load_samples())
+            finally:
+                os.chdir(cwd)
+
+    def test_no_sample_dir(self):
+        # installed without the test samples
+        with self.assertRaises(ValueError):
+            load_samples(None)
+
+    def test_unknown_benchmark(self):
+        with self.assertRaises(SystemExit) as context:
+            cli.main(['unknown'])
+        self.assertEqual(context.exception.code, 2)
+
+    def test_run(self):
+        result = extraction.run(num_files=2, languages=['python', 'java'])
+        self.assertEqual(set(result['languages'].keys()), {'Python', 'Java'})
+
+        stats = result['languages']['Python']
+        self.assertEqual(stats['files'], 2)
+        self.assertEqual(stats['functions'], 6)
+        for stage in extraction.STAGES:
+            self.assertIn(stage, stats['seconds'])
+        for key in ['files_per_sec', 'mb_per_sec', 'functions_per_sec', 'peak_rss_mb']:
+            self.assertIn(key, stats)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,17 @@
+import unittest
+
+from src.codetext.bench import headers
+
+
+class Test_HeadersBenchmark(unittest.TestCase):
+    def test_run(self):
+        result = headers.run(target_mb=0.05, repeat=1)
+        self.assertEqual(len(result['languages']), 10)
+        stats = result['languages']['Python']
+        self.assertEqual(stats['full_definitions'], stats['header_definitions'])
+        for key in ['full_mb_per_sec', 'headers_mb_per_sec', 'extraction_speedup']:
+            self.assertIn(key, result['total'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,19 @@
+import unittest
+
+from src.codetext.bench import history
+
+
+class Test_HistoryBenchmark(unittest.TestCase):
+    def test_run(self):
+        result = history.run(num_files=2, num_functions=5, num_commits=30)
+        self.assertTrue(result['same_records'])
+        incremental = result['modes']['incremental']
+        self.assertEqual(incremental['commits'], 30)
+        self.assertEqual(incremental['full_parses'], 2)
+        self.assertEqual(result['modes']['full']['full_parses'], 31)
+        self.assertLess(incremental['extracted_units'],
+                        result['modes']['full']['extracted_units'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,16 @@
+import unittest
+
+from src.codetext.bench import minified
+
+
+class Test_MinifiedBenchmark(unittest.TestCase):
+    def test_run(self):
+        result = minified.run(sizes=[40], legacy_max=40)
+        stats = result['sizes']['40']
+        self.assertEqual(stats['functions'], 40)
+        self.assertEqual(stats['classes'], 10)
+        self.assertIn('legacy_get_function_list_seconds', stats)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,16 @@
+import unittest
+
+from src.codetext.bench import node_text
+
+
+class Test_NodeTextBenchmark(unittest.TestCase):
+    def test_run(self):
+        result = node_text.run(num_classes=2, num_methods=2, body_lines=1, repeat=1)
+        self.assertEqual(set(result['sources']), {'ascii', 'non_ascii'})
+        for item in result['sources'].values():
+            self.assertGreater(item['code_chars'], 0)
+            self.assertIn('source_text', item['peak_mb'])
+
+
+if __name__ == '__main__':
+    unittest.main()
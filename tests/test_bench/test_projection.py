@@ -0,0 +1,16 @@
+import unittest
+
+from src.codetext.bench import projection
+
+
+class Test_ProjectionBenchmark(unittest.TestCase):
+    def test_run(self):
+        result = projection.run(num_files=1, repeat=1)
+        self.assertEqual(result['fields'], ['identifier', 'span'])
+        self.assertEqual(len(result['languages']), 10)
+        for key in ['full', 'projection', 'file_full', 'file_projection']:
+            self.assertIn(key, result['total']['seconds'])
+
+
+if __name__ == '__main__':
+    unittest.main()
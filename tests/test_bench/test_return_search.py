@@ -0,0 +1,17 @@
+import unittest
+
+from src.codetext.bench import return_search
+
+
+class Test_ReturnSearchBenchmark(unittest.TestCase):
+    def test_run(self):
+        result = return_search.run(num_statements=50, repeat=1)
+        self.assertEqual(set(result['languages'].keys()), {'python', 'javascript', 'rust'})
+        for cases in result['languages'].values():
+            self.assertEqual(cases['no_return']['return_type'], None)
+            self.assertEqual(cases['leading_return']['return_type'], '<not_specific>')
+            self.assertEqual(cases['trailing_return']['return_type'], '<not_specific>')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,21 @@
+import unittest
+
+from src.codetext.bench import schedule
+
+
+class Test_ScheduleBenchmark(unittest.TestCase):
+    def test_simulate(self):
+        self.assertEqual(schedule.simulate([1, 1, 2], 2)['makespan'], 3)
+        self.assertEqual(schedule.simulate([2, 1, 1], 2)['makespan'], 2)
+
+    def test_run(self):
+        result = schedule.run(num_small=2, num_large=1, large_repeat=2, workers=2)
+        self.assertEqual(result['files'], 21)
+        self.assertLessEqual(result['simulated']['lower_bound'],
+                             result['simulated']['size']['makespan'])
+        for item in result['runs'].values():
+            self.assertGreater(item['mean_utilisation'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
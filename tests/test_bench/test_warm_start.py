@@ -0,0 +1,17 @@
+import unittest
+
+from src.codetext.bench import warm_start
+
+
+class Test_WarmStartBenchmark(unittest.TestCase):
+    def test_run(self):
+        result = warm_start.run(num_files=1, workers=[1])
+        self.assertEqual(set(result['modes']),
+                         {'spawn', 'fork', 'fork+preload', 'forkserver', 'forkserver+preload'})
+        for item in result['modes'].values():
+            self.assertEqual(item['1']['files'], 10)
+            self.assertGreater(item['1']['first_result_seconds'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,16 @@
+import unittest
+
+from src.codetext.bench import watch
+
+
+class Test_WatchBenchmark(unittest.TestCase):
+    def test_run(self):
+        result = watch.run(num_files=2, num_functions=20, num_edits=3)
+        incremental, full = result['modes']['incremental'], result['modes']['full']
+        self.assertEqual(incremental['updates'], 3)
+        self.assertEqual(incremental['records'], full['records'])
+        self.assertLess(incremental['extracted_units'], full['extracted_units'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,25 @@
+import unittest
+
+from src.codetext.clean.noise_removal import check_is_black_node, get_black_list_filter
+
+
+class Test_BlackList(unittest.TestCase):
+    def test_check_is_black_node(self):
+        for name in ['__init__', '__', 'setValue', 'getter', 'test_parse', 'parse_test', 'toString']:
+            self.assertTrue(check_is_black_node(name, []), name)
+        for name in ['parse', 'reset', 'attest', '__private']:
+            self.assertFalse(check_is_black_node(name, []), name)
+
+        self.assertTrue(check_is_black_node('equal?', ['equal?', '<=>']))
+        self.assertFalse(check_is_black_node('equal', ['equal?', '<=>']))
+        self.assertFalse(check_is_black_node('parse'))
+        with self.assertRaises(ValueError):
+            check_is_black_node(None, [])
+
+    def test_filter_is_cached(self):
+        self.assertIs(get_black_list_filter(['hash']), get_black_list_filter(['hash']))
+        self.assertIsNot(get_black_list_filter(['hash']), get_black_list_filter([]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+
+from src.codetext.utils import parse_code
+from src.codetext.parser import PythonParser
+from src.codetext.clean.noise_removal import check_is_node_error, check_function, check_function_node, \
+    filter_function_nodes
+
+
+class Test_CheckFunction(unittest.TestCase):
+    def test_check_function_node(self):
+        code_sample = '''
+def short(a):
+    return a
+
+def broken(a):
+    b = a
+    c = (b +* ]
+    d = c
+    return d
+
+def valid(a):
+    b = a
+    c = b
+    d = c
+    return d
+'''
+        root = parse_code(code_sample, 'python').root_node
+        functions = PythonParser.get_function_list(root)
+        self.assertEqual(len(functions), 3)
+        self.assertEqual([check_function_node(node) for node in functions], [False, False, True])
+        self.assertTrue(check_is_node_error(functions[1]))
+        self.assertFalse(check_is_node_error(functions[2]))
+        self.assertEqual(filter_function_nodes(functions), [functions[2]])
+
+        self.assertTrue(check_function(functions[2], {'identifier': 'valid'}, []))
+        self.assertFalse(check_function(functions[2], {'identifier': 'test_valid'}, []))
+
+    def test_missing_node_is_not_error(self):
+        root = parse_code('int f() {\n  int a = 1\n  return a;\n}\n', 'c').root_node
+        # only a MISSING `;`, flagged by `has_error` but no ERROR node
+        self.assertTrue(root.has_error)
+        self.assertFalse(check_is_node_error(root.children[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
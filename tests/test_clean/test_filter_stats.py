@@ -0,0 +1,46 @@
+import pickle
+import unittest
+
+from src.codetext.clean import FilterStats
+from src.codetext.clean.noise_removal import check_docstring, clean_docstring
+
+
+class Test_FilterStats(unittest.TestCase):
+    def test_check_docstring(self):
+        stats = FilterStats()
+        self.assertTrue(check_docstring('Why is he using Math.round?', stats=stats))
+        self.assertFalse(check_docstring('Returns the sum of two numbers', stats=stats))
+
+        rules = stats.to_dict()
+        self.assertEqual(rules['check_docstring_contain_question']['calls'], 2)
+        self.assertEqual(rules['check_docstring_contain_question']['rejections'], 1)
+        self.assertEqual(rules['check_contain_url']['calls'], 1)
+        self.assertEqual(rules['check_contain_url']['rejections'], 0)
+
+    def test_same_result_without_stats(self):
+        samples = [
+            '/* fixme: This function is not in use */',
+            '/* Auto-generated by IDE',
+            '/** Returns the message Id to use as heading text, depending on usage */',
+            '/* Retourne la valeur associée à la clé donnée */',
+        ]
+        stats = FilterStats()
+        for sample in samples:
+            self.assertEqual(clean_docstring(sample), clean_docstring(sample, stats=stats))
+        self.assertEqual(stats.to_dict()['check_docstring_literal']['calls'], len(samples))
+        self.assertEqual(stats.to_dict()['check_docstring_literal']['rejections'], 1)
+
+    def test_merge(self):
+        stats = FilterStats()
+        stats.record('rule_a', True, 0.5)
+        other = pickle.loads(pickle.dumps(stats))
+        other.record('rule_b', False, 0.1)
+
+        stats.merge(other).merge(other.to_dict())
+        self.assertEqual(stats.to_dict()['rule_a'], {'calls': 3, 'rejections': 3, 'seconds': 1.5})
+        self.assertEqual(stats.to_dict()['rule_b']['calls'], 2)
+        self.assertEqual(FilterStats.from_dict(stats.to_dict()).to_dict(), stats.to_dict())
+
+
+if __name__ == '__main__':
+    unittest.main()
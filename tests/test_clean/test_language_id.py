@@ -0,0 +1,60 @@
+import unittest
+
+from src.codetext.clean.language_id import detect_language, is_english
+from src.codetext.clean.noise_removal import check_docstring_literal
+
+
+class Test_LanguageId(unittest.TestCase):
+    def test_detect_english(self):
+        samples = [
+            'Returns the message Id to use as heading text',
+            'Convert java.util.regex.Matcher groups to JavaScript groups',
+            'Calculates checksum',
+            'Computes the “smart” value of π',
+        ]
+        for sample in samples:
+            self.assertEqual(detect_language(sample), 'en', sample)
+
+    def test_detect_non_english(self):
+        samples = {
+            'Retourne la valeur associée à la clé donnée': 'fr',
+            'Gibt den Wert zurück, wenn der Schlüssel existiert': 'de',
+            '将JSONArray转换为Bean的List, 默认为ArrayList': 'zh-cn',
+            'Получить значение': 'ru',
+        }
+        for sample, language in samples.items():
+            self.assertEqual(detect_language(sample), language, sample)
+            self.assertFalse(is_english(sample))
+
+    def test_short_ascii_english(self):
+        # too short for n-gram statistics, they used to be taken for et/de/nl/no
+        for sample in ['Validate input data.', 'Get user', 'Helper', 'Merge dicts', 'Setter']:
+            self.assertTrue(is_english(sample), sample)
+            self.assertFalse(check_docstring_literal(sample), sample)
+
+    def test_short_english_typographic(self):
+        # a single non-ASCII character does not change the short text rule
+        for sample in ['Merge dicts …', 'Setter for “name”', 'Get data →', 'Returns x²']:
+            self.assertTrue(is_english(sample), sample)
+            self.assertFalse(check_docstring_literal(sample), sample)
+
+    def test_long_ascii_non_english(self):
+        samples = [
+            "Ce n'est pas en anglais, mais c'est une phrase assez longue pour la detection",
+            'Gibt den Wert zurueck, wenn der Schluessel in der Tabelle existiert und gueltig ist',
+        ]
+        for sample in samples:
+            self.assertFalse(is_english(sample), sample)
+
+    def test_detect_empty(self):
+        self.assertEqual(detect_language(''), 'unknown')
+        self.assertEqual(detect_language('1234 !!'), 'unknown')
+
+    def test_check_docstring_literal(self):
+        self.assertFalse(check_docstring_literal('Computes the “smart” value of π'))
+        self.assertTrue(check_docstring_literal('Retourne la valeur associée à la clé donnée'))
+        self.assertTrue(check_docstring_literal('===='))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import base64
+import random
+import unittest
+
+from src.codetext.clean import classify_source
+from src.codetext.clean.prefilter import MAX_ENTROPY, average_line_length, byte_entropy
+from src.codetext.codetext_cli import get_file_language
+
+
+SAMPLE_DIR = 'tests/test_parser/test_sample'
+
+
+class Test_Prefilter(unittest.TestCase):
+    def test_samples(self):
+        for name in os.listdir(SAMPLE_DIR):
+            path = os.path.join(SAMPLE_DIR, name)
+            if get_file_language(path) is None:
+                continue
+            with open(path, 'rb') as f:
+                self.assertIsNone(classify_source(f.read(), path), name)
+
+    def test_names(self):
+        self.assertEqual(classify_source(b'', 'vendor/yarn.lock.js'), 'lockfile')
+        self.assertEqual(classify_source(b'', 'api/service.pb.go'), 'generated')
+        self.assertEqual(classify_source(b'', 'proto/service_pb2.py'), 'generated')
+        self.assertEqual(classify_source(b'', 'static/app.min.js'), 'minified')
+        self.assertIsNone(classify_source(b'x = 1\n', 'src/block.py'))
+        self.assertEqual(classify_source(b'', 'package-lock.json.js'), 'lockfile')
+        # source files with `lock` in their name
+        for path in ['lock.py', 'filelock/_lock.py', 'Lock.java', 'spin_lock.c', 'file-lock.go']:
+            self.assertIsNone(classify_source(b'x = 1\n', path), path)
+
+    def test_content(self):
+        random.seed(0)
+        self.assertEqual(classify_source(b'\x7fELF\x02\x01\x01\0\0\0', 'tool.h'), 'binary')
+        self.assertEqual(classify_source(b'// Code generated by protoc-gen-go. DO NOT EDIT.\npackage api\n'),
+                         'generated')
+        self.assertEqual(classify_source(b'/**\n * @generated SignedSource<<abc>>\n */\nclass A {}\n'),
+                         'generated')
+        bundle = b';'.join(b'function f%d(a){return a+%d}' % (i, i) for i in range(5000))
+        self.assertEqual(classify_source(bundle, 'bundle.js'), 'minified')
+        blob = b'\n'.join(base64.b64encode(bytes(random.getrandbits(8) for _ in range(57)))
+                          for _ in range(300))
+        self.assertEqual(classify_source(blob, 'assets.ts'), 'high_entropy')
+
+    def test_generated_header_only(self):
+        self.assertEqual(classify_source(b'#!/usr/bin/env python\n# Generated by the protocol buffer '
+                                         b'compiler.  DO NOT EDIT!\nimport sys\n'), 'generated')
+        self.assertEqual(classify_source(b'/**\n * Autogenerated by Thrift Compiler\n */\n'
+                                         b'package api;\n'), 'generated')
+        # the same words in hand-written code
+        source = (b'"""Session helpers"""\nimport os\n\n\ndef refresh(token):\n'
+                  b'    """Refresh a token generated by the auth server"""\n'
+                  b'    # please do not edit the constants below\n    return token\n')
+        self.assertIsNone(classify_source(source, 'session.py'))
+        # generator phrases in the prose of a module docstring (as in `ast.py`)
+        source = (b'"""\nast\n~~~\n\nThe `ast` module helps Python applications to process trees of\n'
+                  b'the Python abstract syntax grammar.\n\nAn abstract syntax tree can be\n'
+                  b'generated by passing ast.PyCF_ONLY_AST as a flag to the compile()\n'
+                  b'built-in function.\n\nDo not edit the nodes in place.\n"""\nimport sys\n')
+        self.assertIsNone(classify_source(source, 'ast.py'))
+        self.assertIsNone(classify_source(b"'''Code generated by pgen, DO NOT EDIT by hand'''\nx = 1\n",
+                                          'parse.py'))
+        # nor in the middle of a comment line
+        self.assertIsNone(classify_source(b'# The tables are generated by gen.py, do not edit them\n'
+                                          b'x = 1\n', 'tables.py'))
+        self.assertEqual(classify_source(b'// This file is automatically generated.\npackage api\n'),
+                         'generated')
+        self.assertEqual(classify_source(b'"""Token constants."""\n# Auto-generated by generate_token.py\n'
+                                         b'x = 1\n'), 'generated')
+
+    def test_non_ascii_comments(self):
+        # more than MAX_ENTROPY bits per byte over the raw UTF-8
+        text = '计算给定键对应的值如果不存在则返回默认值并记录日志信息读取配置文件中的数据库连接参数解析请求头部字段验证用户身份令牌是否过期'
+        source = ''.join(f'# {text[i * 7 % len(text):]}{text[:i * 7 % len(text)]}\n'
+                         f'def f{i}(a):\n    return a + {i}\n\n' for i in range(40)).encode('utf-8')
+        self.assertGreater(byte_entropy(source[:1024] + source[-1024:]), MAX_ENTROPY)
+        self.assertIsNone(classify_source(source, 'cjk.py'))
+
+    def test_metrics(self):
+        self.assertEqual(average_line_length(b'ab\nabcd'), 3)
+        # lines cut by the sampling are not counted
+        self.assertEqual(average_line_length(b'ab\nabcdef', b'xyz\nabcd'), 3)
+        self.assertEqual(byte_entropy(b'aaaa'), 0)
+        self.assertEqual(byte_entropy(b'abab'), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
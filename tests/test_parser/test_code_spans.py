@@ -0,0 +1,37 @@
+import os
+import json
+import unittest
+
+from src.codetext.codetext_cli import parse_file, materialize_code, get_file_language
+
+
+SAMPLE_DIR = 'tests/test_parser/test_sample'
+
+
+class Test_CodeSpans(unittest.TestCase):
+    def test_materialize_code(self):
+        for name in sorted(os.listdir(SAMPLE_DIR)):
+            path = os.path.join(SAMPLE_DIR, name)
+            language = get_file_language(path)
+            if language is None:
+                continue
+            expected = parse_file(path, language)
+            output = parse_file(path, language, code_spans=True)
+            for record in output['class']:
+                self.assertNotIn('code', record)
+                self.assertEqual(len(record['code_span']), 2)
+            self.assertEqual('source' in output, len(output['class']) > 0)
+
+            # round trip through JSON, as written by `codetext --json --code_spans`
+            output = json.loads(json.dumps(output))
+            self.assertEqual(materialize_code(output), expected, name)
+
+    def test_no_span_with_fields(self):
+        path = os.path.join(SAMPLE_DIR, 'java_test_sample.java')
+        output = parse_file(path, 'java', fields={'identifier'}, code_spans=True)
+        self.assertNotIn('source', output)
+        self.assertNotIn('code_span', output['class'][0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+'''test for the headers only walk'''
+import os
+import unittest
+
+from src.codetext.codetext_cli import get_language_parser, get_file_language, iter_file_headers
+from src.codetext.parser import PythonParser
+from src.codetext.utils import parse_code
+
+
+SAMPLE_DIR = 'tests/test_parser/test_sample'
+
+
+class Test_Headers(unittest.TestCase):
+    def test_same_nodes_as_full_walk(self):
+        for name in sorted(os.listdir(SAMPLE_DIR)):
+            path = os.path.join(SAMPLE_DIR, name)
+            language = get_file_language(path)
+            if language is None:
+                continue
+            parser = get_language_parser(language)
+            with open(path) as f:
+                root = parse_code(f.read(), language).root_node
+            headers = list(parser.iter_headers(root, max_depth=100))
+            self.assertEqual([node for kind, node, _ in headers if kind != 'class'],
+                             parser.get_function_list(root))
+            self.assertEqual([node for kind, node, _ in headers if kind == 'class'],
+                             parser.get_class_list(root))
+
+    def test_max_depth(self):
+        code_sample = '''
+class Sample:
+    def method(self):
+        def nested():
+            def deeper():
+                pass
+        return nested
+
+def function():
+    class Inner:
+        def inner_method(self):
+            pass
+'''
+        root = parse_code(code_sample, 'python').root_node
+        headers = [(kind, node.child_by_field_name('name').text.decode(), depth)
+                   for kind, node, depth in PythonParser.iter_headers(root)]
+        self.assertEqual(headers, [('class', 'Sample', 0), ('method', 'method', 0),
+                                   ('function', 'function', 0)])
+
+        headers = [(kind, node.child_by_field_name('name').text.decode(), depth)
+                   for kind, node, depth in PythonParser.iter_headers(root, max_depth=1)]
+        self.assertEqual(headers, [('class', 'Sample', 0), ('method', 'method', 0),
+                                   ('function', 'nested', 1), ('function', 'function', 0),
+                                   ('class', 'Inner', 1), ('method', 'inner_method', 1)])
+
+    def test_iter_file_headers(self):
+        records = list(iter_file_headers(os.path.join(SAMPLE_DIR, 'py_test_sample.py')))
+        self.assertEqual([r['type'] for r in records], ['function', 'function', 'class', 'method'])
+        for record in records:
+            self.assertIn('span', record)
+            self.assertNotIn('return_type', record)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -97,6 +97,19 @@ class Test_JavascriptParser(unittest.TestCase):
         return_type = metadata['return_type']
         self.assertEqual(return_type, '<not_specific>')
 
+    def test_metadata_with_nested_return_statement(self):
+        code_sample = '''
+        function outer(items) {
+            items.forEach(function (item) { return item; });
+            const square = (x) => { return x * x; };
+        }
+        '''
+        root = parse_code(code_sample, 'javascript').root_node
+        fn = JavascriptParser.get_function_list(root)[0]
+        metadata = JavascriptParser.get_function_metadata(fn)
+        self.assertEqual(metadata['identifier'], 'outer')
+        self.assertEqual(metadata['return_type'], None)
+
     def test_get_class_metadata(self):
         root = self.root_node
         
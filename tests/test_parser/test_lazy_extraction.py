@@ -0,0 +1,61 @@
+'''test for generator-based extraction'''
+import os
+import unittest
+from itertools import islice
+
+from src.codetext.codetext_cli import get_language_parser, parse_file, iter_file_records, \
+    PL_MATCHING
+from src.codetext.utils import parse_code
+
+
+SAMPLE_DIR = 'tests/test_parser/test_sample'
+
+
+class Test_LazyExtraction(unittest.TestCase):
+    def setUp(self) -> None:
+        self.samples = []
+        for name in sorted(os.listdir(SAMPLE_DIR)):
+            path = os.path.join(SAMPLE_DIR, name)
+            language = [k for k, v in PL_MATCHING.items() if os.path.splitext(name)[1] in v]
+            if language:
+                self.samples.append((path, language[0]))
+        return super().setUp()
+
+    def test_iter_nodes(self):
+        for path, language in self.samples:
+            parser = get_language_parser(language)
+            with open(path) as f:
+                root = parse_code(f.read(), language).root_node
+            self.assertEqual(list(parser.iter_functions(root)), parser.get_function_list(root))
+            self.assertEqual(list(parser.iter_classes(root)), parser.get_class_list(root))
+            self.assertEqual(list(parser.iter_comments(root)), parser.get_comment_node(root))
+
+    def test_iter_first_items(self):
+        path, language = os.path.join(SAMPLE_DIR, 'py_test_sample.py'), 'Python'
+        parser = get_language_parser(language)
+        with open(path) as f:
+            root = parse_code(f.read(), language).root_node
+        first = next(parser.iter_functions(root))
+        self.assertEqual(first, parser.get_function_list(root)[0])
+        self.assertEqual(len(list(islice(parser.iter_functions(root), 2))), 2)
+
+    def test_iter_file_records(self):
+        for path, language in self.samples:
+            expected = parse_file(path, language)
+            records = list(iter_file_records(path, language))
+            classes = [r for r in records if r['type'] == 'class']
+            methods = [r for r in records if r['type'] == 'method']
+            functions = [r for r in records if r['type'] == 'function']
+            self.assertEqual([c['identifier'] for c in classes],
+                             [c['identifier'] for c in expected['class']])
+            self.assertEqual([m['identifier'] for m in methods],
+                             [m['identifier'] for c in expected['class'] for m in c['method']])
+            self.assertEqual([f['identifier'] for f in functions],
+                             [f['identifier'] for f in expected['function']])
+
+        record = next(iter_file_records(os.path.join(SAMPLE_DIR, 'py_test_sample.py')))
+        self.assertEqual(record['type'], 'class')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+'''test for the `fields` projection of metadata'''
+import os
+import unittest
+
+from src.codetext.codetext_cli import parse_file, get_file_language
+from src.codetext.parser import PythonParser
+from src.codetext.utils import parse_code
+
+
+SAMPLE_DIR = 'tests/test_parser/test_sample'
+
+
+class Test_Projection(unittest.TestCase):
+    def test_function_metadata(self):
+        code_sample = '''
+        def sum2num(first: int, second: int) -> int:
+            return first + second
+        '''
+        root = parse_code(code_sample, 'python').root_node
+        fn = PythonParser.get_function_list(root)[0]
+
+        metadata = PythonParser.get_function_metadata(fn, fields={'identifier', 'span'})
+        self.assertEqual(set(metadata.keys()), {'identifier', 'span'})
+        self.assertEqual(metadata['identifier'], 'sum2num')
+        self.assertEqual(metadata['span']['start_byte'], fn.start_byte)
+        self.assertEqual(metadata['span']['end_point'], fn.end_point)
+
+        metadata = PythonParser.get_function_metadata(fn, fields={'parameters', 'code'})
+        self.assertEqual(metadata['parameters'], {'first': 'int', 'second': 'int'})
+        self.assertTrue(metadata['code'].startswith('def sum2num'))
+
+        with self.assertRaises(AssertionError):
+            PythonParser.get_function_metadata(fn, fields={'unknown'})
+
+    def test_parse_file(self):
+        for name in sorted(os.listdir(SAMPLE_DIR)):
+            path = os.path.join(SAMPLE_DIR, name)
+            language = get_file_language(path)
+            if language is None:
+                continue
+            full = parse_file(path, language)
+            index = parse_file(path, language, fields={'identifier', 'span'})
+            self.assertEqual([c['identifier'] for c in index['class']],
+                             [c['identifier'] for c in full['class']])
+            self.assertEqual([f['identifier'] for f in index['function']],
+                             [f['identifier'] for f in full['function']])
+            for fn in index['function']:
+                self.assertEqual(set(fn.keys()), {'identifier', 'span'})
+
+
+if __name__ == '__main__':
+    unittest.main()
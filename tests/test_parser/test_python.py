@@ -127,6 +127,19 @@ class Test_PythonParser(unittest.TestCase):
         return_type = metadata['return_type']
         self.assertEqual(return_type, '<not_specific>')
         
+    def test_metadata_with_nested_return_statement(self):
+        code_sample = '''
+        def outer():
+            def inner():
+                return True
+            callback = lambda: 1
+            print(inner())
+        '''
+        root = parse_code(code_sample, 'python').root_node
+        outer, inner = PythonParser.get_function_list(root)
+        self.assertEqual(PythonParser.get_function_metadata(outer)['return_type'], None)
+        self.assertEqual(PythonParser.get_function_metadata(inner)['return_type'], '<not_specific>')
+        
     def test_get_parameter(self):
         code_sample = '''
         def sum2num(a: tree_sitter.Node=None, b=None, c:string) -> int:
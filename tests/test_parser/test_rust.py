@@ -104,6 +104,18 @@ class Test_RustParser(unittest.TestCase):
         return_type = metadata['return_type']
         self.assertEqual(return_type, '<not_specific>')
 
+    def test_metadata_with_nested_return_statement(self):
+        code_sample = '''
+        fn quack(&self) {
+            let square = |x: i32| { return x * x; };
+            println!("{}", square(2));
+        }
+        '''
+        root = parse_code(code_sample, 'Rust').root_node
+        fn = RustParser.get_function_list(root)[0]
+        metadata = RustParser.get_function_metadata(fn)
+        self.assertEqual(metadata['return_type'], None)
+
     def test_get_class_metadata(self):
         root = self.root_node
         
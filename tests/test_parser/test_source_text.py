@@ -0,0 +1,39 @@
+import unittest
+
+from src.codetext.utils import parse_code
+from src.codetext.parser import JavaParser, SourceText, get_node_text
+
+
+class Test_SourceText(unittest.TestCase):
+    def setUp(self) -> None:
+        self.code_sample = """
+class Sample {
+    // résumé → ascii
+    int sum(int a, int b) {
+        return a + b;
+    }
+}
+"""
+
+    def test_same_text_as_get_node_text(self):
+        for source in [self.code_sample, self.code_sample.encode('utf-8'),
+                       self.code_sample.replace('résumé →', 'summary'),
+                       self.code_sample.replace('résumé →', 'summary').encode('utf-8')]:
+            text = SourceText(source)
+            root = parse_code(text.source, 'java').root_node
+            nodes = JavaParser.get_class_list(root) + JavaParser.get_function_list(root)
+            self.assertEqual(len(nodes), 2)
+            for node in nodes:
+                self.assertEqual(text.get_node_text(node), get_node_text(node))
+            self.assertEqual(len(text), len(text.source))
+
+    def test_span_is_memoised(self):
+        text = SourceText(self.code_sample)
+        root = parse_code(text.source, 'java').root_node
+        method = JavaParser.get_function_list(root)[0]
+        self.assertIs(text.get_node_text(method), text.get_node_text(method))
+        self.assertTrue(text.get_node_text(method).startswith('int sum'))
+
+
+if __name__ == '__main__':
+    unittest.main()
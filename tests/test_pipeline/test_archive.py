@@ -0,0 +1,72 @@
+import os
+import json
+import tarfile
+import zipfile
+import tempfile
+import unittest
+
+from src.codetext.pipeline import build_dataset, iter_archive_members, iter_sources, is_archive
+
+
+SAMPLE_DIR = 'tests/test_parser/test_sample'
+
+
+class Test_Archive(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.archives = []
+        for extension, mode in [('.tar', 'w'), ('.tar.gz', 'w:gz'), ('.tar.xz', 'w:xz')]:
+            path = os.path.join(self.tmp_dir.name, 'samples' + extension)
+            with tarfile.open(path, mode) as archive:
+                archive.add(SAMPLE_DIR, arcname='repo')
+            self.archives.append(path)
+        path = os.path.join(self.tmp_dir.name, 'samples.zip')
+        with zipfile.ZipFile(path, 'w') as archive:
+            for name in sorted(os.listdir(SAMPLE_DIR)):
+                archive.write(os.path.join(SAMPLE_DIR, name), 'repo/' + name)
+        self.archives.append(path)
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_iter_archive_members(self):
+        expected = {}
+        for name in os.listdir(SAMPLE_DIR):
+            with open(os.path.join(SAMPLE_DIR, name), 'rb') as f:
+                expected[name] = f.read()
+
+        for path in self.archives:
+            self.assertTrue(is_archive(path))
+            members = list(iter_archive_members(path))
+            self.assertEqual(len(members), 10, path)
+            for member, language, content in members:
+                archive_path, name = member.split('!/')
+                self.assertEqual(archive_path, path)
+                self.assertEqual(content, expected[name[len('repo/'):]])
+
+            members = list(iter_archive_members(path, language='Python'))
+            self.assertEqual([m[0] for m in members], [path + '!/repo/py_test_sample.py'])
+
+    def test_iter_sources(self):
+        sources = list(iter_sources([SAMPLE_DIR, self.archives[0]]))
+        self.assertEqual(len(sources), 20)
+        self.assertTrue(all(content is None for _, _, content in sources[:10]))
+        self.assertTrue(all(content for _, _, content in sources[10:]))
+
+    def test_build_dataset(self):
+        results = []
+        for paths, num_workers in [([SAMPLE_DIR], 0), (self.archives[1:2], 0), (self.archives[3:], 2)]:
+            with tempfile.TemporaryDirectory() as output_dir:
+                summary = build_dataset(paths, output_dir, num_workers=num_workers)
+                records = []
+                for shard in summary['shards']:
+                    with open(shard) as f:
+                        records.extend(json.loads(line) for line in f)
+            self.assertEqual(summary['counters']['files'], 10)
+            results.append(sorted((os.path.basename(r['path']), r['identifier']) for r in records))
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[0], results[2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+from src.codetext.pipeline import build_dataset, Checkpoint, ShardWriter
+
+
+SAMPLE_DIR = 'tests/test_parser/test_sample'
+
+
+def read_records(shards):
+    records = []
+    for shard in shards:
+        with open(shard) as f:
+            records.extend(json.loads(line) for line in f)
+    return sorted((r['path'], r['identifier'], r['start_point']) for r in records)
+
+
+class Test_Checkpoint(unittest.TestCase):
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir)
+
+    def test_journal(self):
+        checkpoint = Checkpoint(self.output_dir, interval=2)
+        with ShardWriter(self.output_dir, shard_size=2) as writer:
+            for i in range(3):
+                writer.write_many([{'index': i}])
+                checkpoint.add(f'file_{i}.py', str(i), 1, writer)
+            # only the first group is committed
+            with open(checkpoint.path, 'a') as f:
+                f.write('{"path": "torn')
+
+        checkpoint = Checkpoint(self.output_dir)
+        completed = checkpoint.load()
+        self.assertEqual(completed, {'file_0.py': '0', 'file_1.py': '1'})
+        self.assertEqual(checkpoint.position[0], 0)
+        with open(checkpoint.path) as f:
+            self.assertEqual(len(f.readlines()), 2)
+
+        # the uncommitted record of `file_2.py` is dropped
+        with checkpoint.open_writer(self.output_dir, shard_size=2) as writer:
+            self.assertEqual(len(writer.shards), 1)
+            writer.write({'index': 2})
+        self.assertEqual(len(writer.shards), 2)
+        with open(writer.shards[1]) as f:
+            self.assertEqual([json.loads(line) for line in f], [{'index': 2}])
+
+    def test_failed_files_are_retried(self):
+        checkpoint = Checkpoint(self.output_dir)
+        with ShardWriter(self.output_dir, shard_size=2) as writer:
+            checkpoint.add('failed.py', None, 0, writer, error=True)
+            checkpoint.add('file_0.py', '0', 0, writer)
+            checkpoint.close(writer)
+        self.assertEqual(Checkpoint(self.output_dir).load(), {'file_0.py': '0'})
+
+    def test_resume(self):
+        with tempfile.TemporaryDirectory() as reference_dir:
+            expected = read_records(build_dataset([SAMPLE_DIR], reference_dir, num_workers=0)['shards'])
+
+        summary = build_dataset([SAMPLE_DIR], self.output_dir, num_workers=0,
+                                shard_size=3, checkpoint_interval=1)
+        self.assertEqual(read_records(summary['shards']), expected)
+        with self.assertRaises(ValueError):
+            build_dataset([SAMPLE_DIR], self.output_dir, num_workers=0)
+
+        # simulate a crash: the last journaled files are lost, and records of
+        # unjournaled files were partially written to the shards
+        checkpoint_path = os.path.join(self.output_dir, 'checkpoint.jsonl')
+        with open(checkpoint_path) as f:
+            lines = f.readlines()
+        with open(checkpoint_path, 'w') as f:
+            f.writelines(lines[:4])
+            f.write(lines[4][:10])
+        with open(summary['shards'][-1], 'a') as f:
+            f.write('{"path": "partial')
+
+        for num_workers in [0, 2]:
+            summary = build_dataset([SAMPLE_DIR], self.output_dir, num_workers=num_workers,
+                                    shard_size=3, resume=True)
+            self.assertEqual(read_records(summary['shards']), expected)
+        self.assertEqual(summary['counters']['skipped'], 10)
+        self.assertEqual(summary['counters']['files'], 0)
+
+    def test_resume_changed_file(self):
+        with tempfile.TemporaryDirectory() as input_dir:
+            for name in ['py_test_sample.py', 'java_test_sample.java']:
+                shutil.copy(os.path.join(SAMPLE_DIR, name), input_dir)
+            build_dataset([input_dir], self.output_dir, num_workers=0)
+
+            path = os.path.join(input_dir, 'py_test_sample.py')
+            with open(path, 'a') as f:
+                f.write('\n\ndef added(a, b):\n    """Add two numbers and return the result"""\n'
+                        '    c = a + b\n    d = c * 2\n    return d\n')
+            summary = build_dataset([input_dir], self.output_dir, num_workers=0, resume=True)
+        self.assertEqual(summary['counters']['skipped'], 1)
+        self.assertEqual(summary['counters']['changed'], 1)
+        self.assertEqual(summary['counters']['files'], 1)
+        self.assertIn((path, 'added'), [record[:2] for record in read_records(summary['shards'])])
+
+
+if __name__ == '__main__':
+    unittest.main()
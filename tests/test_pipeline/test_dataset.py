@@ -0,0 +1,115 @@
+import os
+import json
+import tempfile
+import unittest
+import multiprocessing as mp
+
+from src.codetext.pipeline import extract_records, build_dataset, iter_source_files, ShardWriter
+from src.codetext.pipeline.bootstrap import PRELOAD_ENV, set_forkserver_preload
+
+
+SAMPLE_DIR = 'tests/test_parser/test_sample'
+
+
+class Test_Dataset(unittest.TestCase):
+    def test_extract_records(self):
+        code_sample = '''
+class Sample:
+    def compute_sum(self, first, second):
+        """
+        Compute the sum of two numbers given by the caller
+        """
+        result = first + second
+        result = result * 1
+        result = result + 0
+        return result
+
+    def undocumented(self, first, second):
+        result = first + second
+        result = result * 1
+        result = result + 0
+        return result
+'''
+        records = extract_records(code_sample, 'python', path='sample.py')
+        self.assertEqual(len(records), 1)
+        record = records[0]
+        self.assertEqual(record['identifier'], 'compute_sum')
+        self.assertEqual(record['class'], 'Sample')
+        self.assertEqual(record['path'], 'sample.py')
+        self.assertEqual(record['docstring'], 'Compute the sum of two numbers given by the caller')
+        self.assertTrue(record['code'].startswith('def compute_sum'))
+
+    def test_iter_source_files(self):
+        files = dict(iter_source_files([SAMPLE_DIR]))
+        self.assertEqual(len(files), 10)
+        self.assertEqual(files[os.path.join(SAMPLE_DIR, 'py_test_sample.py')], 'Python')
+
+        files = list(iter_source_files([SAMPLE_DIR], language='Java'))
+        self.assertEqual(files, [(os.path.join(SAMPLE_DIR, 'java_test_sample.java'), 'Java')])
+
+    def test_shard_writer(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            with ShardWriter(output_dir, shard_size=2) as writer:
+                writer.write_many({'index': i} for i in range(5))
+            self.assertEqual(len(writer.shards), 3)
+            with open(writer.shards[-1]) as f:
+                self.assertEqual([json.loads(line) for line in f], [{'index': 4}])
+
+    def test_build_dataset(self):
+        results = []
+        for num_workers in [0, 2]:
+            with tempfile.TemporaryDirectory() as output_dir:
+                summary = build_dataset([SAMPLE_DIR], output_dir, num_workers=num_workers,
+                                        shard_size=5, filter_stats=True)
+                records = []
+                for shard in summary['shards']:
+                    with open(shard) as f:
+                        records.extend(json.loads(line) for line in f)
+            self.assertEqual(summary['counters']['files'], 10)
+            self.assertEqual(summary['counters']['errors'], 0)
+            self.assertEqual(summary['counters']['records'], len(records))
+            self.assertGreater(len(summary['filter_stats']), 0)
+            results.append(sorted((r['path'], r['identifier']) for r in records))
+        self.assertEqual(results[0], results[1])
+
+    def test_build_dataset_size_schedule(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            summary = build_dataset([SAMPLE_DIR], output_dir, num_workers=2,
+                                    schedule='size', batch_bytes=4096)
+        self.assertEqual(summary['counters']['files'], 10)
+        self.assertEqual(len(summary['workers']), 2)
+        # small files are batched: less tasks than files
+        self.assertLess(sum(worker['tasks'] for worker in summary['workers']), 10)
+        for worker in summary['workers']:
+            self.assertTrue(0 <= worker['utilisation'] <= 1)
+
+    def test_forkserver_preload(self):
+        set_forkserver_preload(mp.get_context('forkserver'), ['Python'])
+        # only the fork server preloads, not the later processes of the caller
+        self.assertNotIn(PRELOAD_ENV, os.environ)
+        with tempfile.TemporaryDirectory() as output_dir:
+            summary = build_dataset([SAMPLE_DIR], output_dir, num_workers=1, start_method='forkserver')
+        self.assertEqual(summary['counters']['files'], 10)
+        self.assertNotIn(PRELOAD_ENV, os.environ)
+
+    def test_build_dataset_prefilter(self):
+        with tempfile.TemporaryDirectory() as input_dir:
+            with open(os.path.join(SAMPLE_DIR, 'javascript_test_sample.js'), 'rb') as f:
+                source = f.read()
+            with open(os.path.join(input_dir, 'app.js'), 'wb') as f:
+                f.write(source)
+            with open(os.path.join(input_dir, 'app.min.js'), 'wb') as f:
+                f.write(source)
+            with open(os.path.join(input_dir, 'generated.js'), 'wb') as f:
+                f.write(b'// @generated\n' + source)
+            with tempfile.TemporaryDirectory() as output_dir:
+                summary = build_dataset([input_dir], output_dir, num_workers=0, filter_stats=True,
+                                        prefilter=True)
+            self.assertEqual(summary['counters']['files'], 1)
+            self.assertEqual(summary['counters']['prefilter_minified'], 1)
+            self.assertEqual(summary['counters']['prefilter_generated'], 1)
+            self.assertEqual(summary['filter_stats'].to_dict()['classify_source']['rejections'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
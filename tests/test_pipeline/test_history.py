@@ -0,0 +1,108 @@
+import tempfile
+import unittest
+
+from src.codetext.pipeline.gitrepo import GitRepo, Hunk
+from src.codetext.pipeline.history import HistoryWalker, hunk_edits, line_starts
+from .test_incremental import git, commit
+
+
+FIRST = '''def f(a):
+    return a
+
+
+class K:
+    def m(self):
+        return 1
+
+    def n(self):
+        return 2
+
+
+def g(b):
+    return b
+'''
+
+# method `m` modified, function `h` added before `g`
+SECOND = FIRST.replace('return 1', 'return 10').replace('def g(b):', 'def h(x):\n    return x\n\n\ndef g(b):')
+
+# function `f` deleted, the other ones are moved up
+THIRD = SECOND.split('\n', 3)[3]
+
+
+class Test_History(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.repo = self.temp_dir.name
+        git(self.repo, 'init', '-q')
+        commit(self.repo, {'a.py': FIRST, 'README.md': 'readme'}, 'first')
+        commit(self.repo, {'a.py': SECOND, 'README.md': 'changed'}, 'second')
+        commit(self.repo, {'a.py': THIRD, 'b.py': 'def fresh():\n    pass\n'}, 'third')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_hunk_edits(self):
+        old, new = b'a\nb\nc\n', b'a\nB\nc\nd'
+        edits = hunk_edits([Hunk(2, 1, 2, 1), Hunk(3, 0, 4, 1)],
+                           line_starts(old), len(old), line_starts(new), len(new))
+        self.assertEqual(edits, [(2, 4, 2, 4), (6, 6, 6, 7)])
+
+    def test_log(self):
+        commits = list(GitRepo(self.repo).log())
+        self.assertEqual(len(commits), 3)
+        self.assertIsNone(commits[0].parent)
+        self.assertEqual(commits[1].parent, commits[0].commit)
+        self.assertEqual({change.path: change.status for change in commits[2].changes},
+                         {'a.py': 'M', 'b.py': 'A'})
+        self.assertEqual(commits[2].hunks['a.py'], [Hunk(1, 3, 0, 0)])
+
+    def test_log_spaced_path(self):
+        commit(self.repo, {'my file.py': FIRST}, 'spaced')
+        commit(self.repo, {'my file.py': SECOND}, 'spaced changed')
+        last = list(GitRepo(self.repo).log())[-1]
+        self.assertEqual([change.path for change in last.changes], ['my file.py'])
+        self.assertEqual(list(last.hunks), ['my file.py'])
+
+    def test_walk(self):
+        walker = HistoryWalker(self.repo)
+        records = list(walker.walk())
+        changes = [(record['change'], record['path'], record['identifier']) for record in records]
+        self.assertEqual(changes[4:], [
+            ('modify', 'a.py', 'm'), ('add', 'a.py', 'h'),
+            ('delete', 'a.py', 'f'), ('add', 'b.py', 'fresh'),
+        ])
+        modified = records[4]
+        self.assertEqual((modified['kind'], modified['class']), ('method', 'K'))
+        self.assertEqual(modified['old_span'], [[5, 4], [6, 16]])
+        self.assertEqual(modified['new_span'], [[5, 4], [6, 17]])
+        self.assertIn('return 10', modified['code'])
+        self.assertEqual(walker.stats['incremental_parses'], 2)
+        self.assertLess(walker.stats['extracted_units'], walker.stats['units'])
+
+        # carried over functions have the spans of a full parse
+        full = HistoryWalker(self.repo, incremental=False)
+        self.assertEqual(list(full.walk()), records)
+        self.assertEqual([f['start_point'] for f in walker.states['a.py'].units],
+                         [f['start_point'] for f in full.states['a.py'].units])
+
+    def test_class_rename(self):
+        # the methods are outside the edit, their class is not
+        commit(self.repo, {'c.py': 'class C:\n    def m(self):\n        return 1\n'}, 'class')
+        commit(self.repo, {'c.py': 'class D:\n    def m(self):\n        return 1\n'}, 'rename')
+        commit(self.repo, {'c.py': 'class D:\n    def m(self):\n        return 2\n'}, 'modify')
+        expected = [('add', 'C'), ('add', 'D'), ('delete', 'C'), ('modify', 'D')]
+        for incremental in (True, False):
+            records = [record for record in HistoryWalker(self.repo, incremental=incremental).walk()
+                       if record['path'] == 'c.py']
+            self.assertEqual([(record['change'], record['class']) for record in records], expected)
+            self.assertEqual(len({record['commit'] for record in records}), 3)
+
+    def test_walk_range(self):
+        # the files of the first parent are parsed on their first change
+        records = list(HistoryWalker(self.repo, language='Python').walk('HEAD~1..HEAD'))
+        self.assertEqual([(record['change'], record['identifier']) for record in records],
+                         [('delete', 'f'), ('add', 'fresh')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import os
+import subprocess
+import tempfile
+import unittest
+
+from src.codetext.pipeline.incremental import IncrementalExtractor, diff_units, extract_source_units
+from src.codetext.pipeline.gitrepo import GitRepo
+
+
+OLD_SOURCE = '''
+def removed(a):
+    return a
+
+
+def changed(a):
+    return a + 1
+
+
+class Shape:
+    def area(self):
+        return 0
+'''
+
+NEW_SOURCE = '''
+def changed(a):
+    return a + 2
+
+
+def added(a):
+    return a
+
+
+class Shape:
+    def area(self):
+        return 0
+'''
+
+
+def git(repo, *args):
+    subprocess.run(['git', '-C', repo, '-c', 'user.name=test', '-c', 'user.email=test@example.com']
+                   + list(args), check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def commit(repo, files, message):
+    for path, content in files.items():
+        full_path = os.path.join(repo, path)
+        if content is None:
+            os.remove(full_path)
+            continue
+        with open(full_path, 'w') as f:
+            f.write(content)
+    git(repo, 'add', '-A')
+    git(repo, 'commit', '-q', '-m', message)
+
+
+class Test_Incremental(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.repo = self.temp_dir.name
+        git(self.repo, 'init', '-q')
+        commit(self.repo, {'shapes.py': OLD_SOURCE, 'gone.py': 'def gone():\n    pass\n',
+                           'README.md': 'readme'}, 'first')
+        commit(self.repo, {'shapes.py': NEW_SOURCE, 'gone.py': None,
+                           'new.py': 'def fresh():\n    pass\n', 'README.md': 'changed'}, 'second')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_diff_units(self):
+        changes = {(kind, (new or old)['identifier']) for kind, old, new in
+                   diff_units(extract_source_units(OLD_SOURCE, 'python'),
+                              extract_source_units(NEW_SOURCE, 'python'))}
+        self.assertEqual(changes, {('delete', 'removed'), ('modify', 'changed'), ('add', 'added')})
+
+    def test_git_repo(self):
+        repo = GitRepo(self.repo)
+        self.assertEqual(set(repo.ls_tree('HEAD')), {'shapes.py', 'new.py', 'README.md'})
+        self.assertEqual(repo.ls_files(), repo.ls_tree('HEAD'))
+        changes = {change.path: change.status for change in repo.diff('HEAD~1', 'HEAD')}
+        self.assertEqual(changes, {'shapes.py': 'M', 'gone.py': 'D', 'new.py': 'A', 'README.md': 'M'})
+        blob = repo.ls_tree('HEAD')['new.py']
+        self.assertEqual(list(repo.cat_blobs([blob])), [(blob, b'def fresh():\n    pass\n')])
+
+    def test_incremental(self):
+        extractor = IncrementalExtractor(self.repo)
+        records = list(extractor.diff('HEAD~1', 'HEAD'))
+        changes = sorted((record['change'], record['path'], record['identifier']) for record in records)
+        self.assertEqual(changes, [
+            ('add', 'new.py', 'fresh'), ('add', 'shapes.py', 'added'),
+            ('delete', 'gone.py', 'gone'), ('delete', 'shapes.py', 'removed'),
+            ('modify', 'shapes.py', 'changed'),
+        ])
+        modified = [record for record in records if record['change'] == 'modify'][0]
+        self.assertIn('a + 1', modified['old']['code'])
+        self.assertIn('a + 2', modified['new']['code'])
+        self.assertEqual(extractor.stats['parsed_blobs'], 4)
+
+        # blobs are served from the store
+        extractor = IncrementalExtractor(self.repo)
+        self.assertEqual(len(list(extractor.diff('HEAD~1', 'HEAD'))), len(records))
+        snapshot = {item['path']: item for item in extractor.snapshot('HEAD')}
+        self.assertEqual(set(snapshot), {'shapes.py', 'new.py'})
+        self.assertEqual(extractor.stats['parsed_blobs'], 0)
+        self.assertEqual(extractor.stats['stored_blobs'], 6)
+
+        # from the empty tree, everything is added
+        records = list(IncrementalExtractor(self.repo).diff(None, 'HEAD~1'))
+        self.assertEqual({record['change'] for record in records}, {'add'})
+        self.assertEqual(len(records), 5)
+
+    def test_index(self):
+        # staged, not committed
+        with open(os.path.join(self.repo, 'new.py'), 'w') as f:
+            f.write('def fresh():\n    return 1\n')
+        os.remove(os.path.join(self.repo, 'shapes.py'))
+        git(self.repo, 'add', '-A')
+        repo = GitRepo(self.repo)
+        self.assertEqual({change.path: change.status for change in repo.diff_index('HEAD')},
+                         {'new.py': 'M', 'shapes.py': 'D'})
+        extractor = IncrementalExtractor(self.repo)
+        records = list(extractor.diff('HEAD', None))
+        self.assertEqual(sorted((record['change'], record['identifier']) for record in records),
+                         [('delete', 'Shape'), ('delete', 'added'), ('delete', 'area'),
+                          ('delete', 'changed'), ('modify', 'fresh')])
+        self.assertIsNone(records[0]['new_revision'])
+        self.assertEqual([item['path'] for item in extractor.snapshot(None)], ['new.py'])
+
+
+if __name__ == '__main__':
+    unittest.main()
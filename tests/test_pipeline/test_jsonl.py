@@ -0,0 +1,112 @@
+import os
+import json
+import tempfile
+import unittest
+
+from src.codetext.codetext_cli import get_file_language
+from src.codetext.pipeline import build_dataset, JsonlFields, split_ranges, iter_jsonl_range
+
+
+SAMPLE_DIR = 'tests/test_parser/test_sample'
+
+
+def read_shards(summary):
+    records = []
+    for shard in summary['shards']:
+        with open(shard) as f:
+            records.extend(json.loads(line) for line in f)
+    return records
+
+
+class Test_JsonlInput(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'corpus.jsonl')
+        with open(self.path, 'w') as f:
+            names = [name for name in sorted(os.listdir(SAMPLE_DIR)) if get_file_language(name)]
+            for index, name in enumerate(names):
+                with open(os.path.join(SAMPLE_DIR, name)) as source:
+                    item = {'uid': f'sample-{index}', 'file': name, 'code': source.read()}
+                f.write(json.dumps(item) + '\n')
+            f.write('\n')
+            f.write('{"broken": \n')
+        self.fields = JsonlFields(content='code', path='file', id='uid')
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_split_ranges(self):
+        size = os.path.getsize(self.path)
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        for num_ranges in [1, 3, 7, 100]:
+            ranges = split_ranges(self.path, num_ranges)
+            self.assertLessEqual(len(ranges), num_ranges)
+            self.assertEqual(ranges[0].start, 0)
+            self.assertEqual(ranges[-1].end, size)
+            for previous, current in zip(ranges, ranges[1:]):
+                self.assertEqual(previous.end, current.start)
+                self.assertEqual(data[current.start - 1:current.start], b'\n')
+
+            sources = []
+            errors = []
+            for task in ranges:
+                for source, error in iter_jsonl_range(task, self.fields):
+                    if source is None:
+                        errors.append(error)
+                    else:
+                        sources.append(source)
+            self.assertEqual([s.id for s in sources], [f'sample-{i}' for i in range(10)])
+            self.assertEqual(len(errors), 1)
+
+        source = sources[0]
+        self.assertEqual(source.key, self.path + '#id:sample-0')
+        self.assertIsInstance(source.content, bytes)
+
+    def test_keys(self):
+        path = os.path.join(self.tmp_dir.name, 'ids.jsonl')
+        with open(path, 'w') as f:
+            line = json.dumps({'id': 7, 'path': 'a.py', 'content': 'x = 1'}) + '\n'
+            f.write(line)
+            # without id, keyed by the offset of its line
+            f.write(json.dumps({'path': 'b.py', 'content': ''}) + '\n')
+            f.write(json.dumps({'id': 7, 'path': 'c.py', 'content': 'y = 2'}) + '\n')
+        sources = [s for s, _ in iter_jsonl_range(split_ranges(path, 1)[0])]
+        self.assertEqual([s.key for s in sources],
+                         [path + '#id:7', '{}#off:{}'.format(path, len(line)), path + '#id:7'])
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            summary = build_dataset([path], output_dir, num_workers=0)
+        self.assertEqual(summary['counters']['duplicates'], 1)
+
+    def test_language_filter(self):
+        task = split_ranges(self.path, 1)[0]
+        sources = [s for s, _ in iter_jsonl_range(task, self.fields, language='Python') if s]
+        self.assertEqual([s.path for s in sources], ['py_test_sample.py'])
+
+    def test_build_dataset(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            expected = read_shards(build_dataset([SAMPLE_DIR], output_dir, num_workers=0))
+        expected = sorted((os.path.basename(r['path']), r['identifier']) for r in expected)
+
+        for num_workers in [0, 2]:
+            with tempfile.TemporaryDirectory() as output_dir:
+                summary = build_dataset([self.path], output_dir, num_workers=num_workers,
+                                        jsonl_fields=self.fields, jsonl_ranges=3)
+                records = read_shards(summary)
+                self.assertEqual(summary['counters']['files'], 10)
+                self.assertEqual(summary['counters']['errors'], 1)
+                self.assertEqual(sorted((r['path'], r['identifier']) for r in records), expected)
+                for record in records:
+                    self.assertTrue(record['id'].startswith('sample-'))
+
+                # nothing left to do
+                summary = build_dataset([self.path], output_dir, num_workers=num_workers,
+                                        jsonl_fields=self.fields, resume=True)
+                self.assertEqual(summary['counters']['files'], 0)
+                self.assertEqual(summary['counters']['skipped'], 10)
+                self.assertEqual(len(read_shards(summary)), len(records))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import os
+import tempfile
+import unittest
+
+from src.codetext.pipeline import build_dataset, Quarantine
+
+
+SAMPLE_DIR = 'tests/test_parser/test_sample'
+
+
+class Test_Quarantine(unittest.TestCase):
+    def test_quarantine(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            first_dir = os.path.join(output_dir, 'first')
+            summary = build_dataset([SAMPLE_DIR], first_dir, num_workers=0, file_timeout=1e-9)
+            timeouts = summary['counters']['timeouts']
+            self.assertGreater(timeouts, 0)
+            self.assertEqual(timeouts + summary['counters']['files'], 10)
+
+            quarantine = Quarantine(os.path.join(first_dir, 'quarantine.jsonl'))
+            self.assertEqual(len(quarantine.load()), timeouts)
+            for entry in quarantine.entries.values():
+                self.assertIn(entry['stage'], ['parse', 'walk', 'extract', 'clean'])
+                self.assertGreaterEqual(entry['seconds'], entry['budget'])
+
+            # later runs skip quarantined contents by hash
+            summary = build_dataset([SAMPLE_DIR], os.path.join(output_dir, 'second'), num_workers=1,
+                                    quarantine_path=quarantine.path)
+            self.assertEqual(summary['counters']['quarantined'], timeouts)
+            self.assertEqual(summary['counters']['timeouts'], 0)
+            self.assertEqual(summary['counters']['files'], 10 - timeouts)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import os
+import tempfile
+import unittest
+
+from src.codetext.pipeline import schedule_by_size
+from src.codetext.pipeline.jsonl import JsonlRange
+
+
+class Test_Schedule(unittest.TestCase):
+    def test_schedule_by_size(self):
+        with tempfile.TemporaryDirectory() as input_dir:
+            tasks = []
+            for name, size in [('a.py', 10), ('b.py', 300), ('c.py', 40), ('d.py', 50)]:
+                path = os.path.join(input_dir, name)
+                with open(path, 'wb') as f:
+                    f.write(b'#' * size)
+                tasks.append((path, 'Python', None))
+            member = ('archive.tar!/e.py', 'Python', b'pass')
+            jsonl = JsonlRange('corpus.jsonl', 0, 5)
+
+            scheduled = list(schedule_by_size(tasks + [member, jsonl], batch_bytes=60))
+            self.assertEqual(scheduled[0], member)
+            self.assertEqual(scheduled[1], tasks[1])
+            self.assertEqual(scheduled[2], [tasks[3], tasks[2]])
+            self.assertEqual(scheduled[3], jsonl)
+            self.assertEqual(scheduled[4], [tasks[0]])
+
+            self.assertEqual(list(schedule_by_size(tasks, batch_bytes=0)),
+                             sorted(tasks, key=lambda task: os.path.getsize(task[0]), reverse=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import time
+import unittest
+import multiprocessing as mp
+
+from src.codetext.pipeline import dataset, iter_sources
+from src.codetext.pipeline.supervisor import Supervisor, get_rss
+
+
+SAMPLE_DIR = 'tests/test_parser/test_sample'
+CRASH_NAME = 'java_test_sample.java'
+WORKER_OPTIONS = {'loosen_filter': False, 'filter_stats': False, 'profile': False}
+
+
+def _crashing_worker_loop(task_queue, conn, worker_options):
+    extract_records = dataset.extract_records
+
+    def crash(content, language, path=None, *args):
+        if path.endswith(CRASH_NAME):
+            os._exit(1)
+        return extract_records(content, language, path, *args)
+    dataset.extract_records = crash
+    dataset._worker_loop(task_queue, conn, worker_options)
+
+
+def _slow_worker_loop(task_queue, conn, worker_options):
+    def slow(*args):
+        time.sleep(10)
+    dataset.extract_records = slow
+    dataset._worker_loop(task_queue, conn, worker_options)
+
+
+def _run(supervisor, tasks):
+    results, quarantined, reports = [], [], []
+    supervisor.run(tasks, results.append, quarantined.append, reports.append)
+    return results, quarantined, reports
+
+
+class Test_Supervisor(unittest.TestCase):
+    def test_get_rss(self):
+        self.assertGreater(get_rss(os.getpid()), 0)
+
+    def test_crash(self):
+        tasks = list(iter_sources([SAMPLE_DIR]))
+        # the crashing file is batched with others
+        tasks = [tasks[:4], tasks[4:7]] + tasks[7:]
+        supervisor = Supervisor(mp.get_context('fork'), _crashing_worker_loop, WORKER_OPTIONS,
+                                num_workers=2, max_tasks_per_child=2)
+        results, quarantined, reports = _run(supervisor, tasks)
+
+        self.assertEqual(sorted(result[0] for result in results),
+                         sorted(path for path, _, _ in iter_sources([SAMPLE_DIR])))
+        errors = [result for result in results if result[3]]
+        self.assertEqual([os.path.basename(result[0]) for result in errors], [CRASH_NAME])
+        self.assertEqual(len(quarantined), 1)
+        self.assertEqual(quarantined[0]['stage'], 'crash')
+        self.assertEqual(quarantined[0]['sha1'], errors[0][1])
+        self.assertEqual(supervisor.skipped, quarantined)
+        self.assertEqual(supervisor.counters['crashes'], 2)
+        self.assertGreaterEqual(supervisor.counters['retries'], 1)
+        self.assertGreater(supervisor.counters['recycled'], 0)
+        self.assertEqual(sum(report['counters']['files'] for report in reports), 9)
+
+    def test_max_rss(self):
+        tasks = list(iter_sources([SAMPLE_DIR], language='Python'))
+        supervisor = Supervisor(mp.get_context('fork'), _slow_worker_loop, WORKER_OPTIONS,
+                                num_workers=1, max_rss=1)
+        results, quarantined, _ = _run(supervisor, tasks)
+        self.assertEqual(len(results), 1)
+        self.assertTrue(results[0][3])
+        self.assertEqual(quarantined[0]['stage'], 'rss')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import os
+import json
+import socket
+import tempfile
+import unittest
+
+from src.codetext.pipeline.watch import WatchDaemon, SocketPublisher, scan_tree
+
+
+SOURCE = '''def f(a):
+    return a
+
+
+class K:
+    def m(self):
+        return 1
+'''
+
+
+class Collector:
+    def __init__(self):
+        self.updates = []
+
+    def publish(self, records):
+        self.updates.append(records)
+
+
+class Test_Watch(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+        self.mtime_ns = 1600000000 * 10 ** 9
+        os.makedirs(os.path.join(self.root, '.git'))
+        self.write('.git/hidden.py', SOURCE)
+        self.write('a.py', SOURCE)
+        self.write('README.md', 'readme')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, path, content):
+        # distinct modification times, whatever the file system resolution
+        self.mtime_ns += 10 ** 9
+        path = os.path.join(self.root, path)
+        with open(path, 'w') as f:
+            f.write(content)
+        os.utime(path, ns=(self.mtime_ns, self.mtime_ns))
+
+    def test_scan_tree(self):
+        self.assertEqual(list(scan_tree(self.root)), ['a.py'])
+        self.assertEqual(scan_tree(self.root, 'Java'), {})
+
+    def test_poll(self):
+        collector = Collector()
+        daemon = WatchDaemon(self.root, publishers=[collector])
+        records = daemon.poll()
+        self.assertEqual(sorted((r['change'], r['kind'], r['identifier']) for r in records),
+                         [('add', 'class', 'K'), ('add', 'function', 'f'), ('add', 'method', 'm')])
+        self.assertEqual(daemon.poll(), [])
+
+        # only the method and its class changed, the file is reparsed incrementally
+        self.write('a.py', SOURCE.replace('return 1', 'return 10'))
+        records = daemon.poll()
+        self.assertEqual(sorted((r['change'], r['kind'], r['identifier']) for r in records),
+                         [('modify', 'class', 'K'), ('modify', 'method', 'm')])
+        self.assertEqual(daemon.stats['incremental_parses'], 1)
+        self.assertEqual(len(collector.updates), 2)
+
+        # touched without change
+        self.write('a.py', SOURCE.replace('return 1', 'return 10'))
+        self.assertEqual(daemon.poll(), [])
+
+        self.write('b.py', 'def g():\n    pass\n')
+        os.remove(os.path.join(self.root, 'a.py'))
+        records = daemon.poll()
+        self.assertEqual(sorted((r['change'], r['path'], r['identifier']) for r in records),
+                         [('add', 'b.py', 'g'), ('delete', 'a.py', 'K'),
+                          ('delete', 'a.py', 'f'), ('delete', 'a.py', 'm')])
+
+        summary = daemon.latency_summary()
+        self.assertEqual(summary['updates'], 3)
+        self.assertGreater(summary['p50_ms'], 0)
+        self.assertIsNotNone(summary['delay_p50_ms'])
+
+    def test_socket(self):
+        daemon = WatchDaemon(self.root)
+        daemon.poll()
+        path = os.path.join(self.root, 'watch.sock')
+        publisher = SocketPublisher(path, daemon.snapshot, daemon.lock)
+        daemon.publishers.append(publisher)
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.connect(path)
+        stream = client.makefile('r')
+        try:
+            # the current units first
+            snapshot = [json.loads(stream.readline()) for _ in range(3)]
+            self.assertEqual({record['identifier'] for record in snapshot}, {'f', 'K', 'm'})
+            self.write('a.py', SOURCE.replace('return a', 'return a + 1'))
+            daemon.poll()
+            record = json.loads(stream.readline())
+            self.assertEqual((record['change'], record['identifier']), ('modify', 'f'))
+        finally:
+            stream.close()
+            client.close()
+            publisher.close()
+        self.assertFalse(os.path.exists(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import time
+import unittest
+
+from src.codetext.utils import parse_code
+from src.codetext.utils.deadline import DeadlineExceeded, check_deadline, deadline, remaining_micros
+from src.codetext.parser import get_node_by_kind
+
+
+class Test_Deadline(unittest.TestCase):
+    def test_check_deadline(self):
+        check_deadline()
+        self.assertEqual(remaining_micros(), 0)
+        with deadline(60):
+            check_deadline()
+            self.assertGreater(remaining_micros(), 0)
+            # nested budgets cannot extend the enclosing one
+            with deadline(0.001):
+                time.sleep(0.002)
+                with self.assertRaises(DeadlineExceeded) as context:
+                    with deadline(60):
+                        check_deadline('clean')
+                self.assertEqual(context.exception.stage, 'clean')
+            check_deadline()
+        self.assertEqual(remaining_micros(), 0)
+
+    def test_parse_timeout(self):
+        code = 'def f(x):\n    return [x for x in range(10)]\n' * 50000
+        with self.assertRaises(DeadlineExceeded) as context:
+            with deadline(0.001):
+                parse_code(code, 'python')
+        self.assertEqual(context.exception.stage, 'parse')
+        # the parser is reusable after a timeout
+        tree = parse_code('x = 1', 'python')
+        self.assertFalse(tree.root_node.has_error)
+
+    def test_walk_deadline(self):
+        root = parse_code('def f(x):\n    return x\n' * 2000, 'python').root_node
+        with self.assertRaises(DeadlineExceeded):
+            with deadline(1e-9):
+                get_node_by_kind(root, ['function_definition'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+
+from src.codetext.utils.profiler import StageProfiler, PROFILER
+from src.codetext.codetext_cli import parse_file, get_language_parser, PL_MATCHING
+from src.codetext.utils import parse_code
+from src.codetext.clean.noise_removal import clean_docstring
+
+
+class Test_StageProfiler(unittest.TestCase):
+    def tearDown(self) -> None:
+        PROFILER.disable()
+        PROFILER.reset()
+        return super().tearDown()
+
+    def test_disabled(self):
+        profiler = StageProfiler()
+        with profiler.stage('parse_code', 'python'):
+            pass
+        profiler.count('files', language='python')
+        self.assertEqual(profiler.summary(), {})
+
+    def test_stage_and_merge(self):
+        profiler = StageProfiler()
+        profiler.enable()
+        with profiler.use_language('Python'):
+            with profiler.stage('parse_code'):
+                pass
+            profiler.count('files')
+        with profiler.stage('parse_code', 'java'):
+            pass
+
+        summary = profiler.summary()
+        self.assertEqual(summary['python']['stages']['parse_code']['calls'], 1)
+        self.assertEqual(summary['python']['counters'], {'files': 1})
+        self.assertIn('java', summary)
+
+        profiler.merge(summary)
+        summary = profiler.summary()
+        self.assertEqual(summary['python']['stages']['parse_code']['calls'], 2)
+        self.assertEqual(summary['python']['counters'], {'files': 2})
+
+    def test_parse_file(self):
+        PROFILER.enable()
+        parse_file('tests/test_parser/test_sample/py_test_sample.py', 'python')
+        with PROFILER.use_language('python'):
+            clean_docstring('Returns the sum of two numbers given as input')
+
+        summary = PROFILER.summary()['python']
+        for stage in ['parse_file', 'read', 'parse_code', 'get_class_list',
+                      'get_function_list', 'get_function_metadata', 'clean_docstring']:
+            self.assertIn(stage, summary['stages'])
+        self.assertEqual(summary['counters']['files'], 1)
+        self.assertEqual(summary['counters']['classes'], 1)
+
+    def test_parser_language(self):
+        languages = [language.lower() for language in PL_MATCHING]
+        for language in languages:
+            self.assertIn(get_language_parser(language).LANGUAGE, languages)
+
+        PROFILER.enable()
+        for language in ['c++', 'c#']:
+            parser = get_language_parser(language)
+            root = parse_code('class A { void f() {} }', language).root_node
+            # outside of a `use_language` scope, same key as `parse_file`
+            parser.get_class_list(root)
+            self.assertIn('get_class_list', PROFILER.summary()[language]['stages'])
+        self.assertNotIn('cpp', PROFILER.summary())
+        self.assertNotIn('csharp', PROFILER.summary())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,5 @@
 import unittest
-from src.codetext.utils import build_language, parse_code
+from src.codetext.utils import build_language, parse_code, load_parser
 
 
 class Test_Utils(unittest.TestCase):
@@ -15,6 +15,12 @@ class Test_Utils(unittest.TestCase):
             return a + b
         """
         parse_code(sample, 'python')
+
+    def test_load_parser(self):
+        parser = load_parser('python')
+        self.assertIs(load_parser('Python'), parser)
+        self.assertIs(load_parser('c++'), load_parser('cpp'))
+        self.assertIsNot(load_parser('java'), parser)
     
 
 if __name__ == '__main__':